@@ -1,13 +1,47 @@
+import asyncio
+import json
 import logging
-from typing import Dict, List, Literal, Optional
+import os
+import tempfile
+from typing import Any, AsyncIterator, BinaryIO, Iterable, Iterator, List, Literal, Optional, Set, Tuple
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+import orjson
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
-from api.models import DatasetObject, L1Report, L2Reasoning, StatusEnum, StatusHistoryItem, CreateDatasetRequest
+from api.models import (
+    DatasetObject,
+    ImportDatasetRequest,
+    IngestionJob,
+    JobStatusEnum,
+    L1Report,
+    L1Rules,
+    L2AuditJob,
+    L2Reasoning,
+    RawDataItem,
+    StatusEnum,
+    StatusHistoryItem,
+)
+from api.services.admission import AdmissionController, AdmissionRejected
+from api.services.audit_cache import SingleFlight
+from api.services.audit_scheduler import AuditScheduler
+from api.services.clustering import ClusteringService
+from api.services.event_bus import Event, EventBus, Subscription
 from api.services.gemini_svc import GeminiService
+from api.services.json_stream import NdjsonDecoder, NdjsonError, iter_object_members
+from api.services.ingestion_queue import IngestionQueue, ProgressCallback
+from api.services.ingestor import default_l1_rules
+from api.services.leader import LeaderLock
 from api.services.math_utils import cosine_distance
 from api.services.pipeline import DataPipeline
+from api.services.projection import ProjectionService
+from api.services.raw_store import RawDataStore, RawUpload
+from api.services.registry import DatasetRegistry
+from api.services.sources import ManifestError
 
 app = FastAPI(title="AlignOps Control Plane API")
 
@@ -25,20 +59,76 @@ app.add_middleware(
 )
 
 pipeline = DataPipeline()
-dataset_registry: Dict[str, DatasetObject] = {}
-gemini_svc = GeminiService()
+dataset_registry = DatasetRegistry()
+raw_store = RawDataStore()
+gemini_svc = GeminiService(thumbnail_store=pipeline.embedder.thumbnail_store)
+projection_svc = ProjectionService(pipeline.vdb)
+clustering_svc = ClusteringService(pipeline.vdb)
+l2_single_flight = SingleFlight()
+# uvicorn's --workers defaults to WEB_CONCURRENCY. With several worker processes, events are
+# relayed through a SQLite log so every worker's /events stream sees every change.
+API_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+event_bus = EventBus(
+    log_path=os.getenv("EVENT_LOG_PATH", os.path.join(os.getenv("ALIGNOPS_DATA_DIR", "data"), "events.db"))
+    if API_WORKERS > 1
+    else None
+)
+# Exactly one process (the lock holder) seeds demo data, dispatches L2 audits and runs ingestion.
+leader_lock = LeaderLock()
+LEADER_RETRY_SEC = float(os.getenv("LEADER_RETRY_SEC", "5"))
+_leadership_task: Optional["asyncio.Task[None]"] = None
+# The request loop, for work that ingestion worker threads hand back to it.
+_api_loop: Optional[asyncio.AbstractEventLoop] = None
+EVENT_STREAM_HEARTBEAT_SEC = float(os.getenv("EVENT_STREAM_HEARTBEAT_SEC", "15"))
+# Create-request bodies larger than this are buffered on disk rather than in memory.
+INGEST_SPILL_THRESHOLD_BYTES = int(os.getenv("INGEST_SPILL_THRESHOLD_BYTES", str(1024 * 1024)))
+STATUS_HISTORY_PAGE_MAX = 500
+
+# `view=summary` drops the per-version blobs; `fields=` picks any subset. Both always keep the key fields.
+DATASET_KEY_FIELDS = frozenset({"dataset_id", "version"})
+DATASET_SUMMARY_FIELDS = frozenset(DatasetObject.model_fields) - {"status_history", "l1_report", "l2_reasoning"}
+_dataset_list_adapter = TypeAdapter(List[DatasetObject])
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize demo data on startup"""
+    """Start background work if this process wins the leader lock, else keep trying to take it over."""
+    global _leadership_task, _api_loop
     logging.info("Starting AlignOps API...")
-    
+    _api_loop = asyncio.get_running_loop()
+    event_bus.start()
+    if leader_lock.try_acquire():
+        await start_background_work()
+    else:
+        logging.info("Another process owns background work; this one serves requests")
+        _leadership_task = asyncio.get_running_loop().create_task(wait_for_leadership())
+    logging.info("AlignOps API ready!")
+
+
+async def start_background_work():
     # Seed demo data if not exists
     from api.services.demo_seed import seed_demo_data_if_needed
-    await seed_demo_data_if_needed(pipeline, dataset_registry, apply_status)
-    
-    logging.info("AlignOps API ready!")
+    await seed_demo_data_if_needed(dataset_registry, raw_store, ingestion_queue, apply_status)
+
+    audit_scheduler.standby = False
+    audit_scheduler.ensure_started()
+    ingestion_queue.start()
+
+
+async def wait_for_leadership():
+    # The lock is released when the leader exits, including by crashing.
+    while not leader_lock.try_acquire():
+        await asyncio.sleep(LEADER_RETRY_SEC)
+    logging.info("Taking over background work")
+    await start_background_work()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Running ingestions stop at their next batch boundary and resume from the stored raw data on restart.
+    ingestion_queue.stop(timeout=10)
+    event_bus.stop(timeout=1)
+    leader_lock.release()
 
 
 # Status transition policy:
@@ -55,47 +145,316 @@ def apply_status(
 ):
     ds.status = status
     ds.status_source = source
-    ds.status_history.append(
-        StatusHistoryItem(
-            status=status,
-            source=source,
-            reason=reason,
-        )
+    item = StatusHistoryItem(
+        status=status,
+        source=source,
+        reason=reason,
+    )
+    ds.status_history.append(item)
+    # Write-through: persists the transition (and any report attached just before it) and
+    # updates the dashboard counters, latest-version pointers and recent-activity buffer.
+    dataset_registry.record_transition(ds, item)
+    event_bus.publish(
+        "status",
+        {
+            "dataset_id": ds.dataset_id,
+            "version": ds.version,
+            "status": status,
+            "source": source,
+            "reason": reason,
+            "timestamp": item.timestamp.isoformat(),
+        },
+        dataset_id=ds.dataset_id,
     )
     logging.info("Dataset %s status changed to %s by %s", ds.dataset_id, status, source)
 
 
 def build_l1_reason(report: L1Report) -> str:
-    return (
+    reason = (
         f"schema_passed={report.schema_passed}, "
         f"volume={report.volume_actual}/{report.volume_expected}, "
         f"freshness_delay_sec={report.freshness_delay_sec}"
     )
+    violations = report.details.get("violations")
+    if violations:
+        reason += f", violations: {'; '.join(violations)}"
+    return reason
+
+
+def publish_l1_report(ds: DatasetObject, report: L1Report) -> None:
+    """Attach an L1 report to its version and apply the status it calls for."""
+    ds.l1_report = report
+    target_status = StatusEnum.BLOCK if report.l1_status == StatusEnum.BLOCK else report.l1_status
+    apply_status(ds, target_status, "L1", reason=build_l1_reason(report))
+
+
+def publish_l2_job(job: L2AuditJob) -> None:
+    event_bus.publish("l2_job", job.model_dump(mode="json"), dataset_id=job.dataset_id)
 
 
-async def start_ingestion_task(dataset: DatasetObject, raw_data: List[dict]):
+def stored_rows(dataset: DatasetObject) -> Iterable[dict]:
+    """A version's raw rows: read in place from its manifest file if it was imported, else from the raw data store."""
+    manifest = raw_store.manifest(dataset.dataset_id, dataset.version)
+    if manifest is not None:
+        return pipeline.read_manifest(manifest, default_source_id=dataset.source_id)
+    return raw_store.iter_rows(dataset.dataset_id, dataset.version)
+
+
+def count_stored_rows(dataset: DatasetObject) -> int:
+    manifest = raw_store.manifest(dataset.dataset_id, dataset.version)
+    if manifest is not None:
+        return pipeline.read_manifest(manifest, default_source_id=dataset.source_id).count_rows()
+    return raw_store.count_rows(dataset.dataset_id, dataset.version)
+
+
+async def run_ingestion_job(job: IngestionJob, progress: ProgressCallback) -> L1Report:
+    """Run the pipeline for a queued job from the stored raw data (on an ingestion worker thread)."""
+    dataset = dataset_registry.get(f"{job.dataset_id}:{job.version}")
+    if dataset is None:
+        raise KeyError(f"Dataset version {job.dataset_id}:{job.version} no longer exists")
+
+    dataset.l1_report = await pipeline.process_ingestion(
+        dataset.dataset_id,
+        dataset.version,
+        stored_rows(dataset),
+        parent_version=dataset.lineage_parent_version,
+        on_progress=progress,
+        rules=dataset_registry.l1_rules(dataset.dataset_id) or default_l1_rules(),
+    )
+    if job.rows_total is None:
+        # Streamed uploads only know their size once the last row has been read.
+        job.rows_total = job.rows_fetched
+    # Cached projections and clusters are dropped by invalidate_caches_on_ingestion in every process.
+    dataset_registry.save(dataset)
+    return dataset.l1_report
+
+
+def invalidate_caches_on_ingestion(event: Event) -> None:
+    """Drop cached projections and clusters once a version is (re)ingested, by whichever process ran it."""
+    if event.type == "ingestion" and event.dataset_id and event.data.get("status") == JobStatusEnum.SUCCEEDED:
+        projection_svc.invalidate(event.dataset_id)
+        clustering_svc.invalidate(event.dataset_id)
+
+
+event_bus.add_listener(invalidate_caches_on_ingestion)
+
+
+def handle_ingestion_job_change(job: IngestionJob) -> None:
+    event_bus.publish("ingestion", job.model_dump(mode="json"), dataset_id=job.dataset_id)
+    if job.status not in (JobStatusEnum.SUCCEEDED, JobStatusEnum.FAILED, JobStatusEnum.CANCELLED):
+        return
+    dataset = dataset_registry.get(f"{job.dataset_id}:{job.version}")
+    if dataset is None:
+        return
+    if job.status == JobStatusEnum.SUCCEEDED:
+        if dataset.l1_report is not None:
+            publish_l1_report(dataset, dataset.l1_report)
+            # Called on an ingestion worker thread; the L2 scheduler belongs to the request loop.
+            # Without one (e.g. in tests) the scheduler's periodic scan finds the version instead.
+            if _api_loop is not None and not _api_loop.is_closed():
+                _api_loop.call_soon_threadsafe(schedule_l2_if_eligible, dataset)
+    elif job.status == JobStatusEnum.FAILED:
+        apply_status(dataset, StatusEnum.BLOCK, "L1", reason=f"Ingestion failed: {job.error}")
+    else:
+        apply_status(dataset, StatusEnum.BLOCK, "SYSTEM", reason="Ingestion cancelled")
+
+
+ingestion_queue = IngestionQueue(run_job=run_ingestion_job, on_change=handle_ingestion_job_change)
+admission = AdmissionController(ingestion_queue)
+
+
+def admit_ingestion(rows: int = 0) -> None:
     try:
-        await pipeline.process_ingestion(dataset.dataset_id, dataset.version, raw_data)
-    except Exception as exc:
-        logging.error("Ingestion failed: %s", exc)
-        apply_status(dataset, StatusEnum.BLOCK, "L1", reason=f"Ingestion failed: {exc}")
+        admission.check(rows)
+    except AdmissionRejected as exc:
+        if exc.retry_after_sec is None:
+            raise HTTPException(413, exc.reason)
+        raise HTTPException(429, exc.reason, headers={"Retry-After": str(exc.retry_after_sec)})
+
+
+def _prefixed_errors(exc: ValidationError, *loc: Any) -> List[dict]:
+    return [{**error, "loc": (*loc, *error["loc"])} for error in exc.errors(include_url=False)]
+
+
+def _validated_rows(items: Iterable[Any]) -> Iterator[dict]:
+    for index, item in enumerate(items):
+        try:
+            yield RawDataItem.model_validate(item).model_dump()
+        except ValidationError as exc:
+            raise RequestValidationError(_prefixed_errors(exc, "body", "raw_data", index))
+
+
+def stage_create_request(body: BinaryIO) -> Tuple[DatasetObject, str, int]:
+    """Parse a ``CreateDatasetRequest`` body incrementally, spilling validated rows to the raw data store.
+
+    Returns the dataset, the staged raw data file and its row count. Errors are reported like
+    FastAPI's own body validation (422).
+    """
+    dataset: Optional[DatasetObject] = None
+    staged: Optional[Tuple[str, int]] = None
+    try:
+        for key, value in iter_object_members(body, "raw_data"):
+            if key == "dataset":
+                try:
+                    dataset = DatasetObject.model_validate(value)
+                except ValidationError as exc:
+                    raise RequestValidationError(_prefixed_errors(exc, "body", "dataset"))
+            elif key == "raw_data":
+                if staged is not None:
+                    raw_store.discard(staged[0])
+                staged = raw_store.stage(_validated_rows(value))
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        if staged is not None:
+            raw_store.discard(staged[0])
+        position, reason = (exc.pos, exc.msg) if isinstance(exc, json.JSONDecodeError) else (exc.start, exc.reason)
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body", position), "msg": "JSON decode error", "input": {}, "ctx": {"error": reason}}]
+        )
+    except BaseException:
+        if staged is not None:
+            raw_store.discard(staged[0])
+        raise
+
+    missing = [field for field, value in (("dataset", dataset), ("raw_data", staged)) if value is None]
+    if missing:
+        if staged is not None:
+            raw_store.discard(staged[0])
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body", field), "msg": "Field required", "input": None} for field in missing]
+        )
+    return dataset, staged[0], staged[1]
 
 
 @app.post("/datasets/", response_model=DatasetObject)
-async def create_dataset_version(request: CreateDatasetRequest, background_tasks: BackgroundTasks):
+async def create_dataset_version(request: Request, response: Response):
+    """Create a dataset version and queue its ingestion. The body is a ``CreateDatasetRequest``.
+
+    The body is buffered in memory up to INGEST_SPILL_THRESHOLD_BYTES and on disk beyond that,
+    then parsed incrementally with rows spilled straight to the raw data store, so the rows are
+    never all held in memory. While the ingestion backlog is over its limits the request is
+    answered with 429 and Retry-After, before the body is read when possible.
+    """
+    admit_ingestion()
+    with tempfile.SpooledTemporaryFile(max_size=INGEST_SPILL_THRESHOLD_BYTES) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        dataset, staged_path, rows_total = await run_in_threadpool(stage_create_request, body)
+
+    key = f"{dataset.dataset_id}:{dataset.version}"
+    try:
+        if key in dataset_registry:
+            raise HTTPException(status_code=400, detail="Version already exists")
+        admit_ingestion(rows_total)
+        # Stored before queueing so the job (and any later re-ingestion) reads it from disk.
+        raw_store.commit(staged_path, dataset.dataset_id, dataset.version)
+    except BaseException:
+        raw_store.discard(staged_path)
+        raise
+
+    apply_status(dataset, StatusEnum.VALIDATING, "SYSTEM", reason="Dataset version created")
+    dataset_registry[key] = dataset
+    job = ingestion_queue.enqueue(dataset.dataset_id, dataset.version, trigger="CREATE", rows_total=rows_total)
+    response.headers["Location"] = f"/ingestion-jobs/{job.job_id}"
+    return dataset
+
+
+@app.post("/datasets/import", response_model=DatasetObject)
+async def import_dataset_version(request: ImportDatasetRequest, response: Response):
+    """Create a dataset version from a JSONL, CSV or Parquet manifest on a local or shared volume.
+
+    Only a reference to the manifest is stored; the ingestion job reads it in place, in chunks,
+    and decodes local images straight from disk. Manifests and images must lie under
+    LOCAL_SOURCE_ROOTS.
+    """
+    admit_ingestion()
     dataset = request.dataset
-    raw_data = request.raw_data
-    
     key = f"{dataset.dataset_id}:{dataset.version}"
     if key in dataset_registry:
         raise HTTPException(status_code=400, detail="Version already exists")
+    try:
+        reader = pipeline.read_manifest(request.manifest, default_source_id=dataset.source_id)
+        rows_total = await run_in_threadpool(reader.count_rows)
+    except ManifestError as exc:
+        raise HTTPException(400, str(exc))
+    admit_ingestion(rows_total)
+    raw_store.save_manifest(dataset.dataset_id, dataset.version, request.manifest)
 
-    apply_status(dataset, StatusEnum.VALIDATING, "SYSTEM", reason="Dataset version created")
+    apply_status(dataset, StatusEnum.VALIDATING, "SYSTEM", reason=f"Dataset version imported from {request.manifest.path}")
     dataset_registry[key] = dataset
-    background_tasks.add_task(start_ingestion_task, dataset, raw_data)
+    job = ingestion_queue.enqueue(dataset.dataset_id, dataset.version, trigger="IMPORT", rows_total=rows_total)
+    response.headers["Location"] = f"/ingestion-jobs/{job.job_id}"
     return dataset
 
 
+def append_upload_chunk(decoder: NdjsonDecoder, upload: RawUpload, chunk: Optional[bytes]) -> None:
+    """Validate the rows completed by ``chunk`` (None for the end of the body) and append them to the upload."""
+    try:
+        decoded = decoder.close() if chunk is None else decoder.feed(chunk)
+    except NdjsonError as exc:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body", exc.line), "msg": "JSON decode error", "input": {}, "ctx": {"error": exc.message}}]
+        )
+    rows = []
+    for line, item in decoded:
+        try:
+            rows.append(RawDataItem.model_validate(item).model_dump())
+        except ValidationError as exc:
+            raise RequestValidationError(_prefixed_errors(exc, "body", line))
+    upload.write(rows)
+    if upload.rows > admission.max_inflight_rows:
+        raise HTTPException(413, f"Upload exceeds the ingestion budget of {admission.max_inflight_rows} rows")
+
+
+@app.post("/datasets/{dataset_id}/v/{version}/rows", status_code=202)
+async def upload_dataset_version(
+    dataset_id: str,
+    version: str,
+    request: Request,
+    response: Response,
+    source_id: str,
+    lineage_parent_version: Optional[str] = None,
+    tags: List[str] = Query(default=[]),
+):
+    """Create a dataset version from an NDJSON body of ``RawDataItem`` rows, ingesting them as they arrive.
+
+    The ingestion job is queued before the body is read and follows the version's raw data as
+    rows are validated and appended, so embedding starts while the upload is still running and
+    memory stays flat whatever its size. A malformed row ends the upload with 422 and the job
+    fails, leaving the version BLOCK.
+    """
+    admit_ingestion()
+    key = f"{dataset_id}:{version}"
+    if key in dataset_registry:
+        raise HTTPException(status_code=400, detail="Version already exists")
+    dataset = DatasetObject(
+        dataset_id=dataset_id,
+        version=version,
+        source_id=source_id,
+        lineage_parent_version=lineage_parent_version,
+        tags=tags,
+    )
+    upload = raw_store.open_upload(dataset_id, version)
+    apply_status(dataset, StatusEnum.VALIDATING, "SYSTEM", reason="Dataset version upload started")
+    dataset_registry[key] = dataset
+    job = ingestion_queue.enqueue(dataset_id, version, trigger="UPLOAD")
+    response.headers["Location"] = f"/ingestion-jobs/{job.job_id}"
+
+    decoder = NdjsonDecoder()
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(append_upload_chunk, decoder, upload, chunk)
+        await run_in_threadpool(append_upload_chunk, decoder, upload, None)
+    except BaseException:
+        upload.abort()
+        ingestion_queue.cancel(job.job_id)
+        raise
+    upload.finish()
+    logging.info("Upload of %s received %d rows", key, upload.rows)
+    return {"message": "Upload received", "dataset": dataset, "job": ingestion_queue.get(job.job_id), "rows_received": upload.rows}
+
+
 @app.patch("/datasets/{dataset_id}/v/{version}/validate-l1")
 async def update_l1_result(dataset_id: str, version: str, report: L1Report):
     key = f"{dataset_id}:{version}"
@@ -103,12 +462,30 @@ async def update_l1_result(dataset_id: str, version: str, report: L1Report):
     if not ds:
         raise HTTPException(status_code=404)
 
-    ds.l1_report = report
-    target_status = StatusEnum.BLOCK if report.l1_status == StatusEnum.BLOCK else report.l1_status
-    apply_status(ds, target_status, "L1", reason=build_l1_reason(report))
+    publish_l1_report(ds, report)
+    schedule_l2_if_eligible(ds)
     return ds
 
 
+@app.get("/datasets/{dataset_id}/l1-rules", response_model=L1Rules)
+async def get_l1_rules(dataset_id: str):
+    """The L1 thresholds applied when the dataset's versions are ingested (the defaults if none are set)."""
+    return dataset_registry.l1_rules(dataset_id) or default_l1_rules()
+
+
+@app.put("/datasets/{dataset_id}/l1-rules", response_model=L1Rules)
+async def set_l1_rules(dataset_id: str, rules: L1Rules):
+    """Set the dataset's L1 thresholds; they apply from its next ingestion or re-ingestion."""
+    dataset_registry.set_l1_rules(dataset_id, rules)
+    return rules
+
+
+@app.delete("/datasets/{dataset_id}/l1-rules", response_model=L1Rules)
+async def reset_l1_rules(dataset_id: str):
+    dataset_registry.set_l1_rules(dataset_id, None)
+    return default_l1_rules()
+
+
 @app.patch("/datasets/{dataset_id}/v/{version}/audit-l2")
 async def update_l2_audit(dataset_id: str, version: str, audit: L2Reasoning):
     key = f"{dataset_id}:{version}"
@@ -125,47 +502,237 @@ async def update_l2_audit(dataset_id: str, version: str, audit: L2Reasoning):
     return ds
 
 
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against the current validator."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque_tag(candidate) == _opaque_tag(etag) for candidate in if_none_match.split(","))
+
+
+def not_modified(response: Response, etag: str, if_none_match: Optional[str]) -> Optional[Response]:
+    """Tag the response with ``etag``; return a bodiless 304 if the client already holds it.
+
+    Validators come from the registry change counters, so callers must compute ``etag`` before
+    reading the data it describes (a concurrent write then only makes the tag stale, never wrong).
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def json_response(body: bytes, response: Response) -> Response:
+    """Send JSON serialized by the handler, keeping the headers (ETag) already set on ``response``.
+
+    The hot read endpoints serialize with orjson or pydantic-core directly instead of going
+    through FastAPI's ``jsonable_encoder``, which walks every value in Python.
+    """
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+
+def dataset_projection(view: str, fields: Optional[str]) -> Optional[Set[str]]:
+    """Top-level ``DatasetObject`` fields to return, or None for the whole object."""
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(DatasetObject.model_fields)
+        if unknown:
+            raise HTTPException(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+        return requested | DATASET_KEY_FIELDS
+    if view == "summary":
+        return set(DATASET_SUMMARY_FIELDS)
+    if view != "full":
+        raise HTTPException(400, "view must be 'full' or 'summary'")
+    return None
+
+
 @app.get("/datasets/")
-async def list_all_datasets():
+async def list_all_datasets(response: Response, if_none_match: Optional[str] = Header(default=None)):
     """List all datasets with their latest version information."""
-    dataset_map: Dict[str, Dict] = {}
-    
-    for ds in dataset_registry.values():
-        if ds.dataset_id not in dataset_map:
-            dataset_map[ds.dataset_id] = {
-                "dataset_id": ds.dataset_id,
-                "latest_version": ds.version,
-                "status": ds.status,
-                "status_source": ds.status_source,
-                "last_evaluated": ds.created_at,
-                "total_versions": 1,
-            }
-        else:
-            dataset_map[ds.dataset_id]["total_versions"] += 1
-            # Update if this version is newer
-            if ds.created_at > dataset_map[ds.dataset_id]["last_evaluated"]:
-                dataset_map[ds.dataset_id]["latest_version"] = ds.version
-                dataset_map[ds.dataset_id]["status"] = ds.status
-                dataset_map[ds.dataset_id]["status_source"] = ds.status_source
-                dataset_map[ds.dataset_id]["last_evaluated"] = ds.created_at
-    
-    return list(dataset_map.values())
+    cached = not_modified(response, dataset_registry.etag(), if_none_match)
+    if cached is not None:
+        return cached
+    return json_response(orjson.dumps(dataset_registry.latest_versions()), response)
+
+
+@app.get("/datasets/stats")
+async def get_dataset_statistics(response: Response, if_none_match: Optional[str] = Header(default=None)):
+    """Get overall dataset statistics"""
+    cached = not_modified(response, dataset_registry.etag(), if_none_match)
+    if cached is not None:
+        return cached
+    counts = dataset_registry.status_counts()
+
+    stats = {
+        "total": sum(counts.values()),
+        "by_status": {status.value: counts.get(status.value, 0) for status in StatusEnum},
+        "recent_activity": dataset_registry.recent(limit=10),
+    }
+
+    return json_response(orjson.dumps(stats), response)
 
 
+# Registered after /datasets/stats so the literal path is not captured as a dataset_id.
 @app.get("/datasets/{dataset_id}", response_model=List[DatasetObject])
-async def list_versions(dataset_id: str):
-    return [d for d in dataset_registry.values() if d.dataset_id == dataset_id]
+async def list_versions(
+    dataset_id: str,
+    response: Response,
+    view: str = "full",
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """All versions of a dataset; ``view=summary`` or ``fields=a,b`` trims each version."""
+    include = dataset_projection(view, fields)
+    cached = not_modified(response, dataset_registry.etag(dataset_id), if_none_match)
+    if cached is not None:
+        return cached
+    versions = dataset_registry.list_versions(dataset_id)
+    body = _dataset_list_adapter.dump_json(versions, include={"__all__": include} if include is not None else None)
+    return json_response(body, response)
 
 
-@app.post("/datasets/{dataset_id}/v/{version}/trigger-l2")
-async def trigger_l2_audit(dataset_id: str, version: str):
+@app.get("/datasets/{dataset_id}/v/{version}", response_model=DatasetObject)
+async def get_dataset_version(
+    dataset_id: str,
+    version: str,
+    response: Response,
+    view: str = "full",
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    include = dataset_projection(view, fields)
+    cached = not_modified(response, dataset_registry.etag(dataset_id), if_none_match)
+    if cached is not None:
+        return cached
+    ds = dataset_registry.get(f"{dataset_id}:{version}")
+    if ds is None:
+        raise HTTPException(status_code=404, detail="Dataset version not found")
+    return json_response(ds.model_dump_json(include=include), response)
+
+
+@app.get("/datasets/{dataset_id}/v/{version}/history")
+async def get_status_history(
+    dataset_id: str,
+    version: str,
+    response: Response,
+    offset: int = 0,
+    limit: int = 50,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """A page of the version's full status history, newest first, including compacted items."""
+    if offset < 0 or not 1 <= limit <= STATUS_HISTORY_PAGE_MAX:
+        raise HTTPException(400, f"offset must be >= 0 and limit between 1 and {STATUS_HISTORY_PAGE_MAX}")
+    cached = not_modified(response, dataset_registry.etag(dataset_id), if_none_match)
+    if cached is not None:
+        return cached
+    page = dataset_registry.status_history(f"{dataset_id}:{version}", offset=offset, limit=limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Dataset version not found")
+    total, items = page
+    return json_response(
+        orjson.dumps(
+            {
+                "dataset_id": dataset_id,
+                "version": version,
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+                "items": [item.model_dump(mode="json") for item in items],
+            }
+        ),
+        response,
+    )
+
+
+@app.post("/datasets/{dataset_id}/v/{version}/trigger-l2", response_model=L2AuditJob, status_code=202)
+async def trigger_l2_audit(dataset_id: str, version: str, force_refresh: bool = False):
     if version != "v2":
         raise HTTPException(status_code=400, detail="trigger-l2 only supports version v2")
 
     key = f"{dataset_id}:{version}"
-    if key not in dataset_registry:
+    ds = dataset_registry.get(key)
+    if ds is None:
         raise HTTPException(status_code=404, detail="Dataset version not found")
 
+    # Returns a job handle right away; duplicate triggers share the queued or running job.
+    return audit_scheduler.enqueue(
+        dataset_id,
+        version,
+        trigger="MANUAL",
+        force_refresh=force_refresh,
+        version_created_at=ds.created_at,
+    )
+
+
+@app.get("/l2-jobs")
+async def list_l2_jobs(history: int = 20):
+    """Queued and running L2 audits in dispatch order, plus the most recent finished jobs"""
+    return audit_scheduler.snapshot(history=history)
+
+
+@app.get("/l2-jobs/{job_id}", response_model=L2AuditJob)
+async def get_l2_job(job_id: str):
+    job = audit_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="L2 audit job not found")
+    return job
+
+
+def is_l2_eligible(ds: DatasetObject) -> bool:
+    """L1-passed v2 versions that have not been through L2 yet"""
+    return (
+        ds.version == "v2"
+        and ds.status == StatusEnum.PASS
+        and ds.status_source == "L1"
+        and ds.l2_reasoning is None
+    )
+
+
+def estimate_l2_drift(dataset_id: str, version: str, baseline_version: str = "v1") -> Optional[float]:
+    try:
+        mean_baseline = pipeline.vdb.get_mean_vector(dataset_id, baseline_version)
+        mean_version = pipeline.vdb.get_mean_vector(dataset_id, version)
+    except Exception as exc:
+        logging.warning("Drift estimate failed for %s:%s: %s", dataset_id, version, exc)
+        return None
+    if mean_baseline is None or mean_version is None:
+        return None
+    return float(cosine_distance(mean_baseline, mean_version))
+
+
+def schedule_l2_if_eligible(ds: DatasetObject) -> Optional[L2AuditJob]:
+    if not is_l2_eligible(ds) or audit_scheduler.is_known(ds.dataset_id, ds.version):
+        return None
+    return audit_scheduler.enqueue(
+        ds.dataset_id,
+        ds.version,
+        trigger="AUTO",
+        version_created_at=ds.created_at,
+        drift=estimate_l2_drift(ds.dataset_id, ds.version, ds.lineage_parent_version or "v1"),
+    )
+
+
+def schedule_eligible_l2_audits() -> None:
+    for ds in dataset_registry.find(status=StatusEnum.PASS, status_source="L1", has_l2=False):
+        schedule_l2_if_eligible(ds)
+
+
+async def run_scheduled_l2_audit(dataset_id: str, version: str, force_refresh: bool = False):
+    return await l2_single_flight.do(
+        (dataset_id, version, force_refresh),
+        lambda: run_l2_audit(dataset_id, version, force_refresh=force_refresh),
+    )
+
+
+async def run_l2_audit(dataset_id: str, version: str, force_refresh: bool = False):
+    key = f"{dataset_id}:{version}"
     mean_v1 = pipeline.vdb.get_mean_vector(dataset_id, "v1")
     mean_v2 = pipeline.vdb.get_mean_vector(dataset_id, "v2")
     if mean_v1 is None or mean_v2 is None:
@@ -187,8 +754,17 @@ async def trigger_l2_audit(dataset_id: str, version: str):
     if len(outlier_samples) < 3:
         raise HTTPException(status_code=400, detail="Need at least 3 outlier samples for L2 audit")
 
-    sample_images = [item["image_url"] for item in outlier_samples]
-    sample_captions = [item["caption"] for item in outlier_samples]
+    # Prefer medoids of the clusters that moved most against v1; fall back to raw outliers
+    # when the version is too small to yield enough representatives.
+    representatives = clustering_svc.representative_samples(dataset_id, "v1", "v2")
+    cluster_context = None
+    audit_samples = outlier_samples
+    if representatives and len(representatives["samples"]) >= 3:
+        cluster_context = representatives["clusters"]
+        audit_samples = representatives["samples"]
+
+    sample_images = [item["image_url"] for item in audit_samples]
+    sample_captions = [item["caption"] for item in audit_samples]
 
     # Try Gemini Audit with fallback handling
     try:
@@ -196,7 +772,9 @@ async def trigger_l2_audit(dataset_id: str, version: str):
             drift_stats,
             sample_images,
             sample_captions,
-            outlier_context=outlier_samples,
+            outlier_context=audit_samples,
+            cluster_context=cluster_context,
+            force_refresh=force_refresh,
         )
         return await update_l2_audit(dataset_id, version, audit_result)
     except Exception as e:
@@ -233,6 +811,7 @@ async def trigger_l2_audit(dataset_id: str, version: str):
                 l2_status=StatusEnum.WARN
             )
             ds.l2_reasoning = fallback_reasoning
+            dataset_registry.save(ds)
         
         raise HTTPException(
             status_code=503, 
@@ -240,13 +819,29 @@ async def trigger_l2_audit(dataset_id: str, version: str):
         )
 
 
+# Starts in standby; start_background_work() makes it dispatch in the leader process only.
+audit_scheduler = AuditScheduler(
+    run_audit=run_scheduled_l2_audit,
+    scan=schedule_eligible_l2_audits,
+    on_change=publish_l2_job,
+    standby=True,
+)
+
+
 @app.get("/datasets/{dataset_id}/v/{version}/outliers")
 async def get_outlier_samples_with_metadata(
     dataset_id: str,
     version: str,
-    limit: int = 10
+    response: Response,
+    limit: int = 10,
+    if_none_match: Optional[str] = Header(default=None),
 ):
     """Get outlier samples with full metadata including images"""
+    # Vectors only change on (re)ingestion, which saves the dataset and bumps its counter.
+    cached = not_modified(response, dataset_registry.etag(dataset_id), if_none_match)
+    if cached is not None:
+        return cached
+
     # For v2, compare with v1
     prev_version = "v1" if version == "v2" else None
     
@@ -266,14 +861,46 @@ async def get_outlier_samples_with_metadata(
     return outliers
 
 
+@app.get("/datasets/{dataset_id}/v/{version}/projection")
+async def get_vector_projection(
+    dataset_id: str,
+    version: str,
+    baseline: str = "v1",
+    max_points: Optional[int] = None,
+    outlier_limit: int = 10,
+):
+    """2D PCA projection of sampled baseline/version embeddings with outliers flagged"""
+    if baseline == version:
+        raise HTTPException(400, "baseline and version must differ")
+    if max_points is not None and max_points <= 0:
+        raise HTTPException(400, "max_points must be positive")
+
+    projection = projection_svc.project(
+        dataset_id,
+        baseline_version=baseline,
+        version=version,
+        max_points=max_points,
+        outlier_limit=outlier_limit,
+    )
+    if projection is None:
+        raise HTTPException(400, "Missing vector data for projection")
+    return projection
+
+
 @app.get("/datasets/{dataset_id}/v/{version}/samples")
 async def list_samples(
     dataset_id: str,
     version: str,
+    response: Response,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    if_none_match: Optional[str] = Header(default=None),
 ):
     """List all samples for a dataset version"""
+    cached = not_modified(response, dataset_registry.etag(dataset_id), if_none_match)
+    if cached is not None:
+        return cached
+
     samples_tuple = pipeline.vdb.get_samples(dataset_id, version, limit=limit)
     sample_images, sample_captions = samples_tuple
     
@@ -322,52 +949,110 @@ async def manual_override_status(
     return ds
 
 
-@app.post("/datasets/{dataset_id}/v/{version}/reingest")
-async def trigger_reingest(
-    dataset_id: str,
-    version: str,
-    background_tasks: BackgroundTasks
-):
-    """Trigger re-ingestion of a dataset version"""
+@app.post("/datasets/{dataset_id}/v/{version}/reingest", status_code=202)
+async def trigger_reingest(dataset_id: str, version: str):
+    """Re-run the ingestion pipeline for a dataset version from its stored raw data"""
     key = f"{dataset_id}:{version}"
     ds = dataset_registry.get(key)
     
     if not ds:
         raise HTTPException(404, "Dataset not found")
+
+    active = ingestion_queue.active_job(dataset_id, version)
+    if active is not None:
+        return {"message": "Ingestion already in progress", "dataset": ds, "job": active}
+    if not raw_store.exists(dataset_id, version):
+        raise HTTPException(409, "No stored raw data for this version; create a new version instead")
+    try:
+        rows_total = await run_in_threadpool(count_stored_rows, ds)
+    except ManifestError as exc:
+        raise HTTPException(409, f"Cannot re-read the version's manifest: {exc}")
+    admit_ingestion(rows_total)
     
     # Reset status to VALIDATING
     apply_status(ds, StatusEnum.VALIDATING, "SYSTEM", reason="Re-ingestion triggered")
+    projection_svc.invalidate(dataset_id)
+    clustering_svc.invalidate(dataset_id)
+    audit_scheduler.forget(dataset_id, version)
+    job = ingestion_queue.enqueue(dataset_id, version, trigger="REINGEST", rows_total=rows_total)
+    logging.info("Re-ingestion %s queued for %s:%s", job.job_id, dataset_id, version)
     
-    # In a real implementation, this would trigger the actual re-ingestion
-    # For now, we just update the status
-    logging.info(f"Re-ingestion triggered for {dataset_id}:{version}")
-    
-    return {"message": "Re-ingestion triggered successfully", "dataset": ds}
+    return {"message": "Re-ingestion queued", "dataset": ds, "job": job}
 
 
-@app.get("/datasets/stats")
-async def get_dataset_statistics():
-    """Get overall dataset statistics"""
-    all_datasets = list(dataset_registry.values())
-    
-    stats = {
-        "total": len(all_datasets),
-        "by_status": {
-            "PASS": len([d for d in all_datasets if d.status == StatusEnum.PASS]),
-            "WARN": len([d for d in all_datasets if d.status == StatusEnum.WARN]),
-            "BLOCK": len([d for d in all_datasets if d.status == StatusEnum.BLOCK]),
-            "VALIDATING": len([d for d in all_datasets if d.status == StatusEnum.VALIDATING]),
-            "PENDING": len([d for d in all_datasets if d.status == StatusEnum.PENDING]),
-        },
-        "recent_activity": [
-            {
-                "dataset_id": d.dataset_id,
-                "version": d.version,
-                "status": d.status,
-                "timestamp": d.created_at
-            }
-            for d in sorted(all_datasets, key=lambda x: x.created_at, reverse=True)[:10]
-        ]
-    }
-    
-    return stats
+@app.get("/ingestion-jobs")
+async def list_ingestion_jobs(history: int = 20):
+    """Ingestion queue snapshot: active jobs, recently finished ones and admission control state"""
+    return {**ingestion_queue.snapshot(history=history), "admission": admission.snapshot()}
+
+
+@app.get("/ingestion-jobs/{job_id}", response_model=IngestionJob)
+async def get_ingestion_job(job_id: str):
+    job = ingestion_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Ingestion job not found")
+    return job
+
+
+@app.post("/ingestion-jobs/{job_id}/cancel", response_model=IngestionJob)
+async def cancel_ingestion_job(job_id: str):
+    """Cancel a queued job, or stop a running one at its next batch"""
+    job = ingestion_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(404, "Ingestion job not found")
+    if job.status in (JobStatusEnum.SUCCEEDED, JobStatusEnum.FAILED):
+        raise HTTPException(409, f"Ingestion job already {job.status}")
+    return job
+
+
+async def status_event_stream(
+    request: Request,
+    subscription: Subscription,
+    replay: list,
+    reset: bool,
+    heartbeat_sec: float = EVENT_STREAM_HEARTBEAT_SEC,
+) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        if reset:
+            # Missed events are gone (log rolled over or server restarted): tell the client to refetch.
+            yield f"id: {event_bus.last_event_id}\nevent: reset\ndata: {{}}\n\n"
+        for event in replay:
+            yield event.encode()
+        while True:
+            event = await subscription.get(timeout=heartbeat_sec)
+            if event is not None:
+                yield event.encode()
+                continue
+            if subscription.overflowed or await request.is_disconnected():
+                # An overflowed client reconnects and resumes from its Last-Event-ID.
+                break
+            yield ": keep-alive\n\n"
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+@app.get("/events")
+async def stream_events(
+    request: Request,
+    dataset_id: Optional[str] = None,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """Server-Sent Events stream of status transitions, ingestion progress and L2 job updates"""
+    # EventSource sends Last-Event-ID on automatic reconnects; the query parameter covers fresh connections.
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+
+    subscription, replay, reset = event_bus.subscribe(dataset_id=dataset_id, last_event_id=last_event_id)
+    return StreamingResponse(
+        status_event_stream(request, subscription, replay, reset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/ops/gemini")
+async def get_gemini_ops_status():
+    """Circuit breaker state, hedging counters and limits of the L2 audit client"""
+    return gemini_svc.ops_snapshot()
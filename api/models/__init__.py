@@ -1,21 +1,31 @@
 from .datasets import (
     DatasetObject,
     L1Report,
+    L1Rules,
     L2Reasoning,
     ReasoningTrace,
     StatusEnum,
     StatusHistoryItem,
     CreateDatasetRequest,
+    ImportDatasetRequest,
+    ManifestSource,
     RawDataItem,
 )
+from .jobs import IngestionJob, JobStatusEnum, L2AuditJob
 
 __all__ = [
     "DatasetObject",
     "L1Report",
+    "L1Rules",
     "L2Reasoning",
     "ReasoningTrace",
     "StatusHistoryItem",
     "StatusEnum",
     "CreateDatasetRequest",
+    "ImportDatasetRequest",
+    "ManifestSource",
     "RawDataItem",
+    "IngestionJob",
+    "JobStatusEnum",
+    "L2AuditJob",
 ]
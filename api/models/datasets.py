@@ -22,6 +22,26 @@ class L1Report(BaseModel):
     details: Dict[str, Any] = Field(default_factory=dict)
 
 
+class L1Rules(BaseModel):
+    """Per-dataset L1 thresholds. Schema and volume failures block; other violations set ``soft_status``.
+
+    Limits left unset (None, 0 or empty) are not checked.
+    """
+
+    min_rows: int = Field(10, ge=0)
+    max_freshness_delay_sec: Optional[int] = Field(None, ge=0)
+    caption_min_chars: int = Field(0, ge=0)
+    caption_max_chars: Optional[int] = Field(None, ge=1)
+    # Share of rows whose caption length is outside [caption_min_chars, caption_max_chars].
+    max_caption_length_violation_rate: float = Field(0.0, ge=0.0, le=1.0)
+    # Field name -> largest allowed share of rows where it is missing, null or blank.
+    max_null_rate: Dict[str, float] = Field(default_factory=dict)
+    # Largest allowed share of rows from a single source_id.
+    max_source_share: Optional[float] = Field(None, gt=0.0, le=1.0)
+    max_duplicate_rate: Optional[float] = Field(None, ge=0.0, le=1.0)
+    soft_status: Literal["WARN", "BLOCK"] = "WARN"
+
+
 class ReasoningTrace(BaseModel):
     summary: str
     key_observations: List[str]
@@ -37,6 +57,8 @@ class L2Reasoning(BaseModel):
     flagged_samples: List[str] = Field(default_factory=list)
     confidence_score: float = Field(..., ge=0.0, le=1.0)
     l2_status: StatusEnum = StatusEnum.PENDING
+    cache_hit: bool = False
+    cached_at: Optional[datetime] = None
 
 
 class StatusHistoryItem(BaseModel):
@@ -54,6 +76,8 @@ class DatasetObject(BaseModel):
     status: StatusEnum = StatusEnum.PENDING
     status_source: Optional[Literal["SYSTEM", "L1", "L2", "MANUAL"]] = "SYSTEM"
     status_history: List[StatusHistoryItem] = Field(default_factory=list)
+    # Older items compacted out of status_history by the registry; page through all of them via /history.
+    status_history_archived: int = 0
 
     l1_report: Optional[L1Report] = None
     l2_reasoning: Optional[L2Reasoning] = None
@@ -75,3 +99,22 @@ class RawDataItem(BaseModel):
 class CreateDatasetRequest(BaseModel):
     dataset: DatasetObject
     raw_data: List[RawDataItem]
+
+
+class ManifestSource(BaseModel):
+    """A manifest file on a local or shared volume, ingested in place instead of inline rows."""
+
+    path: str
+    # Inferred from the extension (.jsonl/.ndjson, .csv, .parquet/.pq) when omitted.
+    format: Optional[Literal["jsonl", "csv", "parquet"]] = None
+    # Relative image paths resolve against this directory (default: the manifest's own directory).
+    image_root: Optional[str] = None
+    image_column: str = "image_url"
+    caption_column: str = "caption"
+    # Rows without a source column take the dataset's source_id.
+    source_column: str = "source_id"
+
+
+class ImportDatasetRequest(BaseModel):
+    dataset: DatasetObject
+    manifest: ManifestSource
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from .datasets import StatusEnum
+
+
+class JobStatusEnum(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class L2AuditJob(BaseModel):
+    job_id: str
+    dataset_id: str
+    version: str
+    status: JobStatusEnum = JobStatusEnum.QUEUED
+    trigger: Literal["MANUAL", "AUTO"] = "AUTO"
+    force_refresh: bool = False
+
+    # Ordering inputs: manual triggers first, then newest version, then larger drift.
+    version_created_at: Optional[datetime] = None
+    drift: Optional[float] = None
+
+    enqueued_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    attempts: int = 0
+    # host:pid of the process that claimed the job; exactly one process runs it at a time.
+    owner: Optional[str] = None
+    error: Optional[str] = None
+    result_status: Optional[StatusEnum] = None
+    cache_hit: Optional[bool] = None
+
+    class Config:
+        use_enum_values = True
+
+
+class IngestionJob(BaseModel):
+    job_id: str
+    dataset_id: str
+    version: str
+    status: JobStatusEnum = JobStatusEnum.QUEUED
+    trigger: Literal["CREATE", "REINGEST", "UPLOAD", "IMPORT"] = "CREATE"
+
+    # Progress, updated per batch while running.
+    rows_total: Optional[int] = None
+    rows_fetched: int = 0
+    rows_embedded: int = 0
+    rows_upserted: int = 0
+
+    enqueued_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    owner: Optional[str] = None
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    l1_status: Optional[StatusEnum] = None
+
+    class Config:
+        use_enum_values = True
@@ -0,0 +1,90 @@
+import logging
+import math
+import os
+from typing import Any, Dict, Optional
+
+from api.services.ingestion_queue import IngestionQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Ingestion work refused; ``retry_after_sec`` is None when retrying cannot succeed."""
+
+    def __init__(self, reason: str, retry_after_sec: Optional[int]):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_sec = retry_after_sec
+
+
+class AdmissionController:
+    """Bounds ingestion work that has been accepted but not finished.
+
+    Two limits apply to the ingestion queue's backlog: the number of queued jobs, and the rows
+    not yet upserted across queued and running jobs. ``check`` raises ``AdmissionRejected`` with a
+    Retry-After estimate derived from recent ingestion throughput when a request would exceed them.
+    """
+
+    def __init__(
+        self,
+        queue: IngestionQueue,
+        max_inflight_rows: Optional[int] = None,
+        max_queued_jobs: Optional[int] = None,
+        default_retry_after_sec: Optional[float] = None,
+        max_retry_after_sec: float = 300.0,
+    ):
+        self.queue = queue
+        self.max_inflight_rows = max_inflight_rows or int(os.getenv("INGEST_MAX_INFLIGHT_ROWS", "500000"))
+        self.max_queued_jobs = max_queued_jobs or int(os.getenv("INGEST_MAX_QUEUED_JOBS", "20"))
+        self.default_retry_after_sec = (
+            default_retry_after_sec
+            if default_retry_after_sec is not None
+            else float(os.getenv("INGEST_RETRY_AFTER_SEC", "30"))
+        )
+        self.max_retry_after_sec = max_retry_after_sec
+        self._counts = {"admitted": 0, "rejected": 0}
+
+    def _retry_after(self, rows_to_drain: int) -> int:
+        rate = self.queue.rows_per_sec
+        if not rate or rows_to_drain <= 0:
+            seconds = self.default_retry_after_sec
+        else:
+            seconds = rows_to_drain / (rate * self.queue.workers)
+        return int(math.ceil(min(self.max_retry_after_sec, max(1.0, seconds))))
+
+    def _reject(self, reason: str, retry_after_sec: Optional[int]) -> AdmissionRejected:
+        self._counts["rejected"] += 1
+        logger.info("Ingestion admission rejected: %s", reason)
+        return AdmissionRejected(reason, retry_after_sec)
+
+    def check(self, rows: int = 0) -> None:
+        """Admit ``rows`` more rows of work, or raise. Call with ``rows=0`` to shed load before reading a body."""
+        if rows > self.max_inflight_rows:
+            raise self._reject(f"raw_data exceeds the ingestion budget of {self.max_inflight_rows} rows", None)
+
+        queued, inflight_rows = self.queue.backlog()
+        if queued >= self.max_queued_jobs:
+            average_job_rows = inflight_rows // max(1, queued)
+            raise self._reject(
+                f"Ingestion queue is full ({queued} jobs queued)",
+                self._retry_after(average_job_rows),
+            )
+        if inflight_rows + rows > self.max_inflight_rows or (rows == 0 and inflight_rows >= self.max_inflight_rows):
+            raise self._reject(
+                f"Ingestion row budget exhausted ({inflight_rows} of {self.max_inflight_rows} rows in flight)",
+                self._retry_after(inflight_rows + rows - self.max_inflight_rows),
+            )
+        if rows:
+            self._counts["admitted"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        queued, inflight_rows = self.queue.backlog()
+        return {
+            "queued_jobs": queued,
+            "max_queued_jobs": self.max_queued_jobs,
+            "inflight_rows": inflight_rows,
+            "max_inflight_rows": self.max_inflight_rows,
+            "rows_per_sec": self.queue.rows_per_sec,
+            **self._counts,
+        }
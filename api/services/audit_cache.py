@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from api.models import L2Reasoning
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AuditCache:
+    """File-backed L2 response cache, one JSON document per content hash."""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv(
+            "L2_AUDIT_CACHE_DIR",
+            os.path.join(os.getenv("ALIGNOPS_DATA_DIR", "data"), "l2_audit_cache"),
+        )
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[L2Reasoning]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as handle:
+                return L2Reasoning.model_validate_json(handle.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable L2 cache entry %s: %s", key, exc)
+            return None
+
+    def put(self, key: str, reasoning: L2Reasoning) -> None:
+        path = self._path(key)
+        entry = reasoning.model_copy(update={"cache_hit": False, "cached_at": datetime.now(timezone.utc)})
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(entry.model_dump_json())
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Failed to write L2 cache entry %s: %s", key, exc)
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one shared task."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, "asyncio.Task[Any]"]] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        if call is None or call[0] is not loop or call[1].done():
+            task = loop.create_task(fn())
+            self._calls[key] = (loop, task)
+
+            def _forget(finished: "asyncio.Task[Any]") -> None:
+                if self._calls.get(key, (None, None))[1] is finished:
+                    del self._calls[key]
+
+            task.add_done_callback(_forget)
+        else:
+            task = call[1]
+
+        # Shield so one caller disconnecting does not cancel the audit for everyone else.
+        return await asyncio.shield(task)
@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from api.models import JobStatusEnum, L2AuditJob
+from api.services.job_store import JobStore, process_owner
+
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_JOB_STATUSES = (JobStatusEnum.SUCCEEDED, JobStatusEnum.FAILED)
+
+
+class AuditScheduler:
+    """Background L2 audit queue with priorities and a global concurrency/rate budget.
+
+    Jobs are keyed by ``(dataset_id, version)``: enqueueing a version that is already queued or
+    running returns the existing job. Manual triggers run before automatic ones, then newer
+    versions before older ones, then larger drift first.
+
+    Queue state lives in a SQLite job store shared by every API process, so queued audits survive
+    a restart and any process can enqueue or inspect them. Only a scheduler that is not in
+    ``standby`` dispatches; the API runs exactly one such scheduler, in the process that owns
+    background work, so the concurrency and rate budgets hold across processes.
+    """
+
+    def __init__(
+        self,
+        run_audit: Callable[[str, str, bool], Awaitable[Any]],
+        scan: Optional[Callable[[], None]] = None,
+        on_change: Optional[Callable[[L2AuditJob], None]] = None,
+        db_path: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        rate_per_minute: Optional[float] = None,
+        scan_interval_sec: Optional[float] = None,
+        history_limit: int = 200,
+        poll_interval_sec: Optional[float] = None,
+        standby: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._run_audit = run_audit
+        self._scan = scan
+        self._on_change = on_change
+        self.store: JobStore[L2AuditJob] = JobStore(
+            L2AuditJob,
+            "l2_audit_jobs",
+            is_active=lambda job: job.status not in TERMINAL_JOB_STATUSES,
+            db_path=db_path,
+        )
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv("L2_SCHEDULER_CONCURRENCY", "2")))
+        # 0 disables the rate limit; the burst size equals the concurrency budget.
+        self.rate_per_minute = (
+            rate_per_minute if rate_per_minute is not None else float(os.getenv("L2_SCHEDULER_RATE_PER_MIN", "6"))
+        )
+        self.scan_interval_sec = (
+            scan_interval_sec if scan_interval_sec is not None else float(os.getenv("L2_SCHEDULER_SCAN_SEC", "30"))
+        )
+        self.history_limit = history_limit
+        # How often the dispatcher and waiters look for jobs enqueued or finished by other processes.
+        self.poll_interval_sec = (
+            poll_interval_sec if poll_interval_sec is not None else float(os.getenv("JOB_POLL_INTERVAL_SEC", "1"))
+        )
+        # A standby scheduler records and reports jobs but leaves running them to the owning process.
+        self.standby = standby
+        self._clock = clock
+
+        self._running = 0
+        self._recovered = False
+
+        self._tokens = float(self.max_concurrency)
+        self._refilled_at = self._clock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiters: Dict[str, List["asyncio.Future[None]"]] = {}
+
+    # ------------------------------------------------------------------ queue
+
+    @staticmethod
+    def _priority(job: L2AuditJob) -> Tuple[int, float, float]:
+        created = job.version_created_at.timestamp() if job.version_created_at else 0.0
+        return (0 if job.trigger == "MANUAL" else 1, -created, -(job.drift or 0.0))
+
+    def is_known(self, dataset_id: str, version: str) -> bool:
+        """True if the version is queued, running, or has already been audited."""
+        return self.store.find_active(dataset_id, version) is not None or self.store.is_marked(dataset_id, version)
+
+    def forget(self, dataset_id: str, version: str) -> None:
+        """Allow a version to be scheduled automatically again (e.g. after re-ingestion)."""
+        self.store.unmark(dataset_id, version)
+
+    def enqueue(
+        self,
+        dataset_id: str,
+        version: str,
+        trigger: str = "AUTO",
+        force_refresh: bool = False,
+        version_created_at: Optional[datetime] = None,
+        drift: Optional[float] = None,
+    ) -> L2AuditJob:
+        with self.store.transaction():
+            job = self.store.find_active(dataset_id, version)
+            created = job is None
+            if job is None:
+                job = self.store.insert(
+                    L2AuditJob(
+                        job_id=uuid.uuid4().hex,
+                        dataset_id=dataset_id,
+                        version=version,
+                        trigger=trigger,
+                        force_refresh=force_refresh,
+                        version_created_at=version_created_at,
+                        drift=drift,
+                    )
+                )
+            elif job.status == JobStatusEnum.QUEUED:
+                if trigger == "MANUAL":
+                    job.trigger = "MANUAL"
+                if drift is not None and job.drift is None:
+                    job.drift = drift
+                job.force_refresh = job.force_refresh or force_refresh
+                self.store.save(job)
+
+        if created:
+            self._notify(job)
+            logger.info("Queued L2 audit %s for %s:%s (%s)", job.job_id, dataset_id, version, trigger)
+        try:
+            self.ensure_started()
+        except RuntimeError:
+            # No running loop (e.g. called from sync setup code); the dispatcher picks it up on start.
+            pass
+        self._wake()
+        return job
+
+    def get(self, job_id: str) -> Optional[L2AuditJob]:
+        return self.store.get(job_id)
+
+    def queued_jobs(self) -> List[L2AuditJob]:
+        return sorted(self.store.active(), key=lambda job: (job.status != JobStatusEnum.RUNNING, self._priority(job)))
+
+    def snapshot(self, history: int = 20) -> Dict[str, Any]:
+        self._refill()
+        active = self.queued_jobs()
+        return {
+            "queued": sum(1 for job in active if job.status == JobStatusEnum.QUEUED),
+            "running": sum(1 for job in active if job.status == JobStatusEnum.RUNNING),
+            "max_concurrency": self.max_concurrency,
+            "rate_per_minute": self.rate_per_minute,
+            "tokens": round(self._tokens, 3),
+            "jobs": active,
+            "recent": self.store.recent(history),
+        }
+
+    def _notify(self, job: L2AuditJob) -> None:
+        if self._on_change is None:
+            return
+        try:
+            self._on_change(job)
+        except Exception:
+            logger.exception("L2 job change listener failed")
+
+    # --------------------------------------------------------------- dispatch
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self.rate_per_minute > 0:
+            elapsed = max(0.0, now - self._refilled_at)
+            self._tokens = min(float(self.max_concurrency), self._tokens + elapsed * self.rate_per_minute / 60.0)
+        self._refilled_at = now
+
+    def _token_delay(self) -> float:
+        if self.rate_per_minute <= 0:
+            return 0.0
+        self._refill()
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) * 60.0 / self.rate_per_minute
+
+    def _wake(self) -> None:
+        if self._wakeup is not None and self._loop is not None and not self._loop.is_closed():
+            self._wakeup.set()
+
+    def ensure_started(self) -> None:
+        """Start the dispatcher on the running event loop if it is not already running there.
+
+        Does nothing in standby. The first start queues again any job still marked running, on the
+        assumption that the process which claimed it is gone.
+        """
+        loop = asyncio.get_running_loop()
+        if self.standby:
+            return
+        if self._loop is loop and self._dispatcher is not None and not self._dispatcher.done():
+            return
+        if not self._recovered:
+            self._recover()
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._running = 0
+        self._dispatcher = loop.create_task(self._dispatch_loop())
+
+    def _recover(self) -> None:
+        self._recovered = True
+        with self.store.transaction():
+            for job in self.store.active():
+                if job.status == JobStatusEnum.RUNNING:
+                    job.status = JobStatusEnum.QUEUED
+                    job.started_at = None
+                    job.owner = None
+                    self.store.save(job)
+                    logger.info("Re-queued interrupted L2 audit %s for %s:%s", job.job_id, job.dataset_id, job.version)
+
+    def _dispatch_ready(self) -> Optional[float]:
+        """Start as many jobs as the budget allows; return seconds until a token frees up, if waiting on one."""
+        while self._running < self.max_concurrency:
+            with self.store.transaction():
+                queued = [job for job in self.store.active() if job.status == JobStatusEnum.QUEUED]
+                if not queued:
+                    return None
+                delay = self._token_delay()
+                if delay > 0:
+                    return delay
+                # min() keeps the earliest enqueued job among equal priorities.
+                job = min(queued, key=self._priority)
+                job.status = JobStatusEnum.RUNNING
+                job.started_at = datetime.now(timezone.utc)
+                job.attempts += 1
+                job.owner = process_owner()
+                self.store.save(job)
+                self.store.pin(job)
+            if self.rate_per_minute > 0:
+                self._tokens -= 1.0
+            self._running += 1
+            self._notify(job)
+            asyncio.get_running_loop().create_task(self._run_job(job))
+        return None
+
+    async def _dispatch_loop(self) -> None:
+        next_scan = self._clock()
+        while True:
+            if self._scan is not None and self.scan_interval_sec > 0 and self._clock() >= next_scan:
+                try:
+                    self._scan()
+                except Exception:
+                    logger.exception("L2 eligibility scan failed")
+                next_scan = self._clock() + self.scan_interval_sec
+
+            self._wakeup.clear()
+            timeout = self._dispatch_ready()
+            # Polling picks up jobs enqueued by other processes.
+            timeout = self.poll_interval_sec if timeout is None else min(timeout, self.poll_interval_sec)
+            if self._scan is not None and self.scan_interval_sec > 0:
+                timeout = min(timeout, max(0.0, next_scan - self._clock()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, job: L2AuditJob) -> None:
+        try:
+            result = await self._run_audit(job.dataset_id, job.version, job.force_refresh)
+        except asyncio.CancelledError:
+            # Loop shutting down: put the job back so it runs after restart.
+            job.status = JobStatusEnum.QUEUED
+            job.started_at = None
+            job.owner = None
+            self.store.save(job)
+            self.store.unpin(job)
+            raise
+        except Exception as exc:
+            job.status = JobStatusEnum.FAILED
+            job.error = str(getattr(exc, "detail", None) or exc)[:500]
+            logger.warning("L2 audit job %s for %s:%s failed: %s", job.job_id, job.dataset_id, job.version, job.error)
+        else:
+            job.status = JobStatusEnum.SUCCEEDED
+            job.result_status = getattr(result, "status", None)
+            job.cache_hit = getattr(getattr(result, "l2_reasoning", None), "cache_hit", None)
+        finally:
+            self._running = max(0, self._running - 1)
+            self._wake()
+        self._finish(job)
+
+    def _finish(self, job: L2AuditJob) -> None:
+        job.finished_at = datetime.now(timezone.utc)
+        with self.store.transaction():
+            self.store.save(job)
+            self.store.mark(job.dataset_id, job.version)
+            self.store.prune(self.history_limit)
+        self.store.unpin(job)
+        self._notify(job)
+
+        for future in self._waiters.pop(job.job_id, []):
+            if not future.done():
+                future.set_result(None)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[L2AuditJob]:
+        """Wait until a job finishes (or ``timeout`` elapses) and return its current state.
+
+        Jobs run by this process resolve immediately; others are noticed by polling the store.
+        """
+        job = self.store.get(job_id)
+        if job is None or job.status in TERMINAL_JOB_STATUSES:
+            return job
+        self.ensure_started()
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        future = loop.create_future()
+        self._waiters.setdefault(job_id, []).append(future)
+        try:
+            while True:
+                remaining = self.poll_interval_sec if deadline is None else deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), timeout=min(remaining, self.poll_interval_sec))
+                    break
+                except asyncio.TimeoutError:
+                    job = self.store.get(job_id)
+                    if job is None or job.status in TERMINAL_JOB_STATUSES:
+                        break
+        finally:
+            waiters = self._waiters.get(job_id, [])
+            if future in waiters:
+                waiters.remove(future)
+        return self.store.get(job_id)
@@ -0,0 +1,56 @@
+import hashlib
+import logging
+import os
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """Local filesystem blob store, sharded by key prefix within a namespace."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv(
+            "BLOB_STORE_DIR",
+            os.path.join(os.getenv("ALIGNOPS_DATA_DIR", "data"), "blobs"),
+        )
+
+    @staticmethod
+    def key_for(value: str) -> str:
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+    def path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.root, namespace, key[:2], key)
+
+    def exists(self, namespace: str, key: str) -> bool:
+        return os.path.exists(self.path(namespace, key))
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(namespace, key), "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning("Failed to read blob %s/%s: %s", namespace, key, exc)
+            return None
+
+    def put(self, namespace: str, key: str, data: bytes) -> bool:
+        path = self.path(namespace, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as exc:
+            logger.warning("Failed to write blob %s/%s: %s", namespace, key, exc)
+            return False
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            os.remove(self.path(namespace, key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency while its breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with CLOSED / OPEN / HALF_OPEN states.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and rejects calls for
+    ``recovery_timeout_sec``. It then lets up to ``half_open_max_calls`` trial calls through:
+    a success closes it again, a failure re-opens it.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout_sec: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout_sec = recovery_timeout_sec
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = self.CLOSED
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._consecutive_failures = 0
+        self._counts = {"successes": 0, "failures": 0, "rejections": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and self._clock() - (self._opened_at or 0.0) >= self.recovery_timeout_sec:
+            self._state = self.HALF_OPEN
+            self._half_open_in_flight = 0
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._half_open_in_flight = 0
+        self._counts["opened"] += 1
+
+    def allow(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self._counts["rejections"] += 1
+            return False
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counts["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state != self.CLOSED:
+                self._state = self.CLOSED
+                self._opened_at = None
+                self._half_open_in_flight = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counts["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            retry_in = None
+            if self._state == self.OPEN and self._opened_at is not None:
+                retry_in = max(0.0, self.recovery_timeout_sec - (self._clock() - self._opened_at))
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout_sec": self.recovery_timeout_sec,
+                "retry_in_sec": retry_in,
+                **self._counts,
+            }
@@ -0,0 +1,241 @@
+import heapq
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from api.services.vector_db import QdrantService
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClusterSummary:
+    cluster_id: int
+    size: int
+    centroid: np.ndarray
+    # Points closest to the centroid, used as the cluster's representative samples.
+    medoids: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class VersionClusters:
+    clusters: List[ClusterSummary]
+    total_points: int
+
+
+class ClusteringService:
+    """Streaming spherical mini-batch k-means over a version's vectors.
+
+    A version is scrolled twice: once to fit centroids batch by batch and once to count
+    cluster sizes and keep the few points nearest each centroid. Summaries are cached per
+    (dataset_id, version) until ``invalidate`` is called on re-ingest.
+    """
+
+    def __init__(
+        self,
+        vdb: QdrantService,
+        n_clusters: Optional[int] = None,
+        medoids_per_cluster: Optional[int] = None,
+        batch_size: int = 256,
+        seed: int = 0,
+    ):
+        self.vdb = vdb
+        self.n_clusters = n_clusters or int(os.getenv("L2_CLUSTER_COUNT", "8"))
+        self.medoids_per_cluster = medoids_per_cluster or int(os.getenv("L2_MEDOIDS_PER_CLUSTER", "2"))
+        self.batch_size = batch_size
+        self.seed = seed
+        self._cache: Dict[Tuple[str, str], VersionClusters] = {}
+
+    def invalidate(self, dataset_id: str) -> None:
+        for key in [key for key in self._cache if key[0] == dataset_id]:
+            del self._cache[key]
+
+    def _iter_batches(self, dataset_id: str, version: str) -> Iterator[Tuple[np.ndarray, List[Dict[str, Any]]]]:
+        vectors: List[List[float]] = []
+        metas: List[Dict[str, Any]] = []
+        dim: Optional[int] = None
+
+        for point in self.vdb.iter_points(dataset_id, version, with_payload=True, page_size=self.batch_size):
+            vector = self.vdb._extract_vector(point)
+            if vector is None:
+                continue
+            if dim is None:
+                dim = len(vector)
+            elif len(vector) != dim:
+                continue
+
+            payload = point.payload or {}
+            vectors.append(vector)
+            metas.append(
+                {
+                    "row_index": payload.get("row_index"),
+                    "image_url": payload.get("image_url"),
+                    "caption": payload.get("caption"),
+                    "source_id": payload.get("source_id"),
+                    "image_fetch_status": payload.get("image_fetch_status"),
+                    "fallback_used": bool(payload.get("fallback_used", False)),
+                }
+            )
+            if len(vectors) >= self.batch_size:
+                yield self._normalize_rows(np.asarray(vectors, dtype=np.float32)), metas
+                vectors, metas = [], []
+
+        if vectors:
+            yield self._normalize_rows(np.asarray(vectors, dtype=np.float32)), metas
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def _init_centroids(self, batch: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        # k-means++ seeding on the first mini-batch.
+        k = min(self.n_clusters, batch.shape[0])
+        centroids = [batch[rng.integers(batch.shape[0])]]
+        for _ in range(1, k):
+            distances = np.clip(1.0 - np.max(batch @ np.asarray(centroids).T, axis=1), 0.0, None)
+            total = float(distances.sum())
+            if total <= 0.0:
+                break
+            centroids.append(batch[rng.choice(batch.shape[0], p=distances / total)])
+        return np.asarray(centroids, dtype=np.float32)
+
+    @staticmethod
+    def _reseed_collapsed(batch: np.ndarray, centroids: np.ndarray, counts: np.ndarray) -> None:
+        # Seeding only sees the first batch, so two centroids can land in the same mode.
+        # If a batch point is further from every centroid than the closest centroid pair is
+        # from each other, move the lighter centroid of that pair onto the point.
+        if centroids.shape[0] < 2:
+            return
+        pairwise = centroids @ centroids.T
+        np.fill_diagonal(pairwise, -np.inf)
+        i, j = np.unravel_index(np.argmax(pairwise), pairwise.shape)
+        nearest = np.max(batch @ centroids.T, axis=1)
+        worst = int(np.argmin(nearest))
+        if nearest[worst] < pairwise[i, j]:
+            victim, survivor = (i, j) if counts[i] <= counts[j] else (j, i)
+            counts[survivor] += counts[victim]
+            centroids[victim] = batch[worst]
+            counts[victim] = 0
+
+    def _fit(self, dataset_id: str, version: str) -> Optional[np.ndarray]:
+        rng = np.random.default_rng(self.seed)
+        centroids: Optional[np.ndarray] = None
+        counts: Optional[np.ndarray] = None
+
+        for batch, _ in self._iter_batches(dataset_id, version):
+            if centroids is None:
+                centroids = self._init_centroids(batch, rng)
+                counts = np.zeros(centroids.shape[0], dtype=np.int64)
+            if batch.shape[1] != centroids.shape[1]:
+                continue
+
+            self._reseed_collapsed(batch, centroids, counts)
+            labels = np.argmax(batch @ centroids.T, axis=1)
+            for cluster_id in np.unique(labels):
+                members = batch[labels == cluster_id]
+                counts[cluster_id] += members.shape[0]
+                eta = members.shape[0] / counts[cluster_id]
+                centroids[cluster_id] = (1.0 - eta) * centroids[cluster_id] + eta * members.mean(axis=0)
+            centroids = self._normalize_rows(centroids)
+
+        return centroids
+
+    def summarize(self, dataset_id: str, version: str) -> Optional[VersionClusters]:
+        key = (dataset_id, version)
+        if key in self._cache:
+            return self._cache[key]
+
+        centroids = self._fit(dataset_id, version)
+        if centroids is None:
+            return None
+
+        sizes = np.zeros(centroids.shape[0], dtype=np.int64)
+        nearest: List[List[Tuple[float, int, Dict[str, Any]]]] = [[] for _ in range(centroids.shape[0])]
+        seen = 0
+
+        for batch, metas in self._iter_batches(dataset_id, version):
+            if batch.shape[1] != centroids.shape[1]:
+                continue
+            similarities = batch @ centroids.T
+            labels = np.argmax(similarities, axis=1)
+            sizes += np.bincount(labels, minlength=centroids.shape[0])
+            for i, cluster_id in enumerate(labels):
+                entry = (float(similarities[i, cluster_id]), seen + i, metas[i])
+                heap = nearest[cluster_id]
+                if len(heap) < self.medoids_per_cluster:
+                    heapq.heappush(heap, entry)
+                elif entry[0] > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+            seen += batch.shape[0]
+
+        clusters = [
+            ClusterSummary(
+                cluster_id=cluster_id,
+                size=int(sizes[cluster_id]),
+                centroid=centroids[cluster_id],
+                medoids=[
+                    {**meta, "centroid_similarity": similarity}
+                    for similarity, _, meta in sorted(nearest[cluster_id], key=lambda item: (-item[0], item[1]))
+                ],
+            )
+            for cluster_id in range(centroids.shape[0])
+            if sizes[cluster_id] > 0
+        ]
+        summary = VersionClusters(clusters=clusters, total_points=seen)
+        self._cache[key] = summary
+        logger.info("Clustered %s:%s into %d clusters over %d points", dataset_id, version, len(clusters), seen)
+        return summary
+
+    def representative_samples(
+        self,
+        dataset_id: str,
+        baseline_version: str,
+        version: str,
+        max_clusters: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Medoids of the clusters in ``version`` that moved furthest from any baseline cluster."""
+        baseline = self.summarize(dataset_id, baseline_version)
+        target = self.summarize(dataset_id, version)
+        if baseline is None or target is None or not baseline.clusters or not target.clusters:
+            return None
+
+        baseline_centroids = np.asarray([c.centroid for c in baseline.clusters])
+        if baseline_centroids.shape[1] != target.clusters[0].centroid.shape[0]:
+            logger.warning("Cluster dimension mismatch between %s and %s", baseline_version, version)
+            return None
+
+        scored = []
+        for cluster in target.clusters:
+            shift = float(np.clip(1.0 - np.max(baseline_centroids @ cluster.centroid), 0.0, 2.0))
+            scored.append((shift, cluster))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        limit = max_clusters or int(os.getenv("L2_MAX_CLUSTERS", "4"))
+        clusters: List[Dict[str, Any]] = []
+        samples: List[Dict[str, Any]] = []
+        for shift, cluster in scored[:limit]:
+            clusters.append(
+                {
+                    "cluster_id": cluster.cluster_id,
+                    "size": cluster.size,
+                    "share": cluster.size / target.total_points if target.total_points else 0.0,
+                    "baseline_shift": shift,
+                }
+            )
+            samples.extend(
+                {**medoid, "cluster_id": cluster.cluster_id, "cluster_size": cluster.size}
+                for medoid in cluster.medoids
+                if medoid.get("image_url") is not None and medoid.get("caption") is not None
+            )
+
+        return {
+            "clusters": clusters,
+            "samples": samples,
+            "total_clusters": len(target.clusters),
+            "total_points": target.total_points,
+        }
@@ -24,86 +24,52 @@ DEMO_DATA_V2: List[Dict[str, str]] = [
 ]
 
 
-async def seed_demo_data_if_needed(pipeline, dataset_registry, apply_status):
+DEMO_VERSIONS = (
+    ("v1", DEMO_DATA_V1, "nature_pipeline", ["nature", "demo", "baseline"], None),
+    ("v2", DEMO_DATA_V2, "urban_pipeline", ["urban", "demo", "drifted"], "v1"),
+)
+
+
+async def seed_demo_data_if_needed(dataset_registry, raw_store, ingestion_queue, apply_status):
     """
     Seed demo data on startup if demo_vlm_dataset doesn't exist
+
+    Versions go through the regular ingestion queue, so L1 is evaluated (and L2 scheduled for
+    v2) exactly as for uploaded data.
     """
-    from api.models import DatasetObject, StatusEnum
-    
+    from api.models import DatasetObject, L1Rules, StatusEnum
+
     demo_dataset_id = "demo_vlm_dataset"
-    
-    # Check if demo dataset already exists
-    v1_key = f"{demo_dataset_id}:v1"
-    v2_key = f"{demo_dataset_id}:v2"
-    
-    if v1_key in dataset_registry and v2_key in dataset_registry:
+    missing = [spec for spec in DEMO_VERSIONS if f"{demo_dataset_id}:{spec[0]}" not in dataset_registry]
+    if not missing:
         logger.info("Demo dataset already exists, skipping seed")
         return
-    
+
     logger.info("Demo dataset not found, creating demo data...")
-    
+
     try:
-        # Create v1
-        if v1_key not in dataset_registry:
-            logger.info("Creating demo_vlm_dataset v1...")
-            v1_dataset = DatasetObject(
-                dataset_id=demo_dataset_id,
-                version="v1",
-                source_id="nature_pipeline",
-                tags=["nature", "demo", "baseline"],
-            )
-            apply_status(v1_dataset, StatusEnum.VALIDATING, "SYSTEM", reason="Demo dataset v1 created on startup")
-            dataset_registry[v1_key] = v1_dataset
-            
-            # Ingest v1 data
-            await pipeline.ingest_data(v1_dataset, DEMO_DATA_V1)
-            
-            # Validate v1 L1
-            from api.models import L1Report
-            v1_dataset.l1_report = L1Report(
-                schema_passed=True,
-                volume_actual=len(DEMO_DATA_V1),
-                volume_expected=len(DEMO_DATA_V1),
-                freshness_delay_sec=30,
-                l1_status=StatusEnum.PASS,
-                details={},
-            )
-            apply_status(v1_dataset, StatusEnum.PASS, "L1", reason="Demo v1 baseline validated")
-            logger.info("✓ Demo v1 created and validated")
-        
-        # Create v2
-        if v2_key not in dataset_registry:
-            logger.info("Creating demo_vlm_dataset v2...")
-            v2_dataset = DatasetObject(
+        # The demo versions are deliberately small.
+        if dataset_registry.l1_rules(demo_dataset_id) is None:
+            dataset_registry.set_l1_rules(demo_dataset_id, L1Rules(min_rows=len(DEMO_DATA_V1)))
+
+        for version, rows, source_id, tags, parent in missing:
+            logger.info("Creating %s %s...", demo_dataset_id, version)
+            dataset = DatasetObject(
                 dataset_id=demo_dataset_id,
-                version="v2",
-                source_id="urban_pipeline",
-                tags=["urban", "demo", "drifted"],
+                version=version,
+                source_id=source_id,
+                tags=tags,
+                lineage_parent_version=parent,
             )
-            apply_status(v2_dataset, StatusEnum.VALIDATING, "SYSTEM", reason="Demo dataset v2 created on startup")
-            dataset_registry[v2_key] = v2_dataset
-            
-            # Ingest v2 data
-            await pipeline.ingest_data(v2_dataset, DEMO_DATA_V2)
-            
-            # Validate v2 L1
-            from api.models import L1Report
-            v2_dataset.l1_report = L1Report(
-                schema_passed=True,
-                volume_actual=len(DEMO_DATA_V2),
-                volume_expected=len(DEMO_DATA_V2),
-                freshness_delay_sec=45,
-                l1_status=StatusEnum.PASS,
-                details={},
-            )
-            apply_status(v2_dataset, StatusEnum.PASS, "L1", reason="Demo v2 validated, ready for L2 audit")
-            logger.info("✓ Demo v2 created and validated")
-        
-        logger.info("✓ Demo dataset seeding complete!")
+            rows_total = raw_store.save(demo_dataset_id, version, rows)
+            apply_status(dataset, StatusEnum.VALIDATING, "SYSTEM", reason=f"Demo dataset {version} created on startup")
+            dataset_registry[f"{demo_dataset_id}:{version}"] = dataset
+            ingestion_queue.enqueue(demo_dataset_id, version, trigger="CREATE", rows_total=rows_total)
+
+        logger.info("✓ Demo dataset queued for ingestion")
         logger.info("  → v1: Nature scenes (baseline)")
-        logger.info("  → v2: Urban scenes (with semantic drift)")
-        logger.info("  → Trigger L2 audit from UI or API to see Gemini analysis")
-        
+        logger.info("  → v2: Urban scenes (with semantic drift), audited by L2 once it passes L1")
+
     except Exception as e:
         logger.error(f"Failed to seed demo data: {e}")
         logger.error("Demo data seeding failed, but server will continue")
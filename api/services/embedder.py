@@ -1,29 +1,57 @@
 import io
+import logging
 import math
+import os
+import threading
 from typing import Any, Dict, List, Optional, Sequence
 
 import requests
 from PIL import Image
 
+from api.services.blob_store import BlobStore
+from api.services.sources import local_image_path, local_source_roots, resolve_local_path
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_NAMESPACE = "thumbnails"
+
 
 class EmbedderService:
-    def __init__(self, model_name: str = "google/siglip-base-patch16-224", request_timeout: int = 10):
+    def __init__(
+        self,
+        model_name: str = "google/siglip-base-patch16-224",
+        request_timeout: int = 10,
+        thumbnail_store: Optional[BlobStore] = None,
+        local_roots: Optional[Sequence[str]] = None,
+    ):
         self.model_name = model_name
         self.request_timeout = request_timeout
         self._model = None
+        # Ingestion workers run in parallel threads; load the model only once.
+        self._model_lock = threading.Lock()
+        # Downscaled JPEGs of fetched images, reused by the L2 audit instead of re-fetching URLs.
+        self.thumbnail_store = thumbnail_store or BlobStore()
+        self.thumbnail_max_side = int(os.getenv("THUMBNAIL_MAX_SIDE", "384"))
+        self.thumbnail_quality = int(os.getenv("THUMBNAIL_JPEG_QUALITY", "80"))
+        # file:// URLs and plain paths are read from disk, but only under these directories.
+        self.local_roots = list(local_roots) if local_roots is not None else local_source_roots()
 
     def _get_model(self):
-        if self._model is None:
-            # Lazy import keeps API boot lightweight inside Docker.
-            try:
-                from sentence_transformers import SentenceTransformer
-            except ImportError as exc:
-                raise RuntimeError("sentence-transformers is required for embedding generation") from exc
-
-            try:
-                self._model = SentenceTransformer(self.model_name)
-            except Exception as exc:  # pragma: no cover - depends on runtime/model availability
-                raise RuntimeError(f"Failed to load embedding model '{self.model_name}'") from exc
+        if self._model is not None:
+            return self._model
+        with self._model_lock:
+            if self._model is None:
+                # Lazy import keeps API boot lightweight inside Docker.
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as exc:
+                    raise RuntimeError("sentence-transformers is required for embedding generation") from exc
+
+                try:
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception as exc:  # pragma: no cover - depends on runtime/model availability
+                    raise RuntimeError(f"Failed to load embedding model '{self.model_name}'") from exc
         return self._model
 
     @staticmethod
@@ -41,14 +69,39 @@ class EmbedderService:
             return [0.0 for _ in vector]
         return [float(v) / norm for v in vector]
 
-    def _load_image(self, image_url: str) -> Optional[Image.Image]:
+    def _store_thumbnail(self, image_url: str, image: Image.Image) -> None:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((self.thumbnail_max_side, self.thumbnail_max_side))
+        buffer = io.BytesIO()
         try:
+            thumbnail.save(buffer, format="JPEG", quality=self.thumbnail_quality, optimize=True)
+        except OSError as exc:
+            logger.warning("Failed to encode thumbnail for %s: %s", image_url, exc)
+            return
+        self.thumbnail_store.put(THUMBNAIL_NAMESPACE, BlobStore.key_for(image_url), buffer.getvalue())
+
+    def _open_image(self, image_url: str) -> Image.Image:
+        path = local_image_path(image_url)
+        if path is None:
             response = requests.get(image_url, timeout=self.request_timeout)
             response.raise_for_status()
-            return Image.open(io.BytesIO(response.content)).convert("RGB")
+            return Image.open(io.BytesIO(response.content))
+        # Local images are decoded straight from disk, with no HTTP round-trip.
+        resolved = resolve_local_path(path, self.local_roots)
+        if resolved is None:
+            raise PermissionError(f"{path} is outside LOCAL_SOURCE_ROOTS")
+        return Image.open(resolved)
+
+    def _load_image(self, image_url: str) -> Optional[Image.Image]:
+        try:
+            with self._open_image(image_url) as source:
+                image = source.convert("RGB")
         except (requests.RequestException, OSError):
             return None
 
+        self._store_thumbnail(image_url, image)
+        return image
+
     def generate_embeddings(self, image_urls: List[str], captions: List[str]) -> List[List[float]]:
         metadata_items = self.generate_embeddings_with_metadata(image_urls=image_urls, captions=captions)
         return [item["embedding"] for item in metadata_items]
@@ -0,0 +1,262 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from api.services import sqlite_db
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    id: int
+    type: str
+    data: Dict[str, Any]
+    dataset_id: Optional[str] = None
+
+    def encode(self) -> str:
+        """Server-Sent Events frame."""
+        payload = json.dumps(self.data, default=str, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, dataset_id: Optional[str], loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.dataset_id = dataset_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=max_queue)
+        # Set when the subscriber falls too far behind; it should disconnect and resume by event id.
+        self.overflowed = False
+
+    def matches(self, event: Event) -> bool:
+        return self.dataset_id is None or event.dataset_id == self.dataset_id
+
+    def _offer(self, event: Event) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SharedEventLog:
+    """Events appended to a SQLite table by every API process, read back in id order."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite_db.connect(self.db_path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, dataset_id TEXT, data TEXT NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def append(self, event_type: str, data: Dict[str, Any], dataset_id: Optional[str]) -> Event:
+        payload = json.dumps(data, default=str, separators=(",", ":"))
+        with self._lock:
+            cursor = self._connection().execute(
+                "INSERT INTO events (type, dataset_id, data) VALUES (?, ?, ?)", (event_type, dataset_id, payload)
+            )
+        return Event(id=cursor.lastrowid, type=event_type, data=json.loads(payload), dataset_id=dataset_id)
+
+    def since(self, last_id: int, limit: int) -> List[Event]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, type, dataset_id, data FROM events WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit)
+            ).fetchall()
+        return [Event(id=row["id"], type=row["type"], data=json.loads(row["data"]), dataset_id=row["dataset_id"]) for row in rows]
+
+    def tail(self, limit: int) -> List[Event]:
+        with self._lock:
+            newest = self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        return self.since(max(0, newest - limit), limit)
+
+    def prune(self, keep: int) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (keep,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class EventBus:
+    """Publish/subscribe for status and progress events with a bounded replay log.
+
+    Event ids increase monotonically, so a reconnecting client can resume from the last id it
+    saw. If that id has fallen out of the log (or predates a restart), ``subscribe`` reports a
+    reset and the client should refetch its state instead.
+
+    By default events stay in-process. With ``log_path`` the bus spans every API process sharing
+    that SQLite file: ``publish`` appends to the shared log, which assigns the id, and a
+    background thread in each process (``start``) tails the log and fans events out to local
+    subscribers and listeners in id order, whichever process published them.
+    """
+
+    def __init__(
+        self,
+        history_size: Optional[int] = None,
+        subscriber_queue_size: int = 1000,
+        log_path: Optional[str] = None,
+        poll_interval_sec: Optional[float] = None,
+    ):
+        self.history_size = history_size or int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+        self.subscriber_queue_size = subscriber_queue_size
+        self.poll_interval_sec = (
+            poll_interval_sec if poll_interval_sec is not None else float(os.getenv("EVENT_LOG_POLL_SEC", "0.2"))
+        )
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._history: Deque[Event] = deque(maxlen=self.history_size)
+        self._subscribers: Set[Subscription] = set()
+        self._listeners: List[Callable[[Event], None]] = []
+        self._lock = threading.Lock()
+        self._shared = SharedEventLog(log_path) if log_path else None
+        self._poller: Optional[threading.Thread] = None
+        self._poll_wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    @property
+    def shared(self) -> bool:
+        return self._shared is not None
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        """Call ``listener`` synchronously for every event delivered to this process."""
+        self._listeners.append(listener)
+
+    def publish(self, event_type: str, data: Dict[str, Any], dataset_id: Optional[str] = None) -> Event:
+        """Record an event and fan it out; safe to call from any thread."""
+        if self._shared is not None:
+            event = self._shared.append(event_type, data, dataset_id)
+            self._poll_wakeup.set()
+            return event
+        with self._lock:
+            event = Event(id=next(self._ids), type=event_type, data=data, dataset_id=dataset_id)
+            self._last_id = event.id
+            self._history.append(event)
+            subscribers = [sub for sub in self._subscribers if sub.matches(event)]
+        self._deliver(event, subscribers)
+        return event
+
+    def _deliver(self, event: Event, subscribers: List[Subscription]) -> None:
+        # Subscribers are captured together with the history append, so a new subscriber gets
+        # each event either in its replay or on its queue, never both.
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for sub in subscribers:
+            if sub.loop is current_loop:
+                sub._offer(event)
+            elif not sub.loop.is_closed():
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Event listener failed")
+
+    # ------------------------------------------------------------ shared log
+
+    def start(self) -> None:
+        """Begin tailing the shared log (no-op for an in-process bus)."""
+        if self._shared is None or (self._poller is not None and self._poller.is_alive()):
+            return
+        with self._lock:
+            for event in self._shared.tail(self.history_size):
+                self._history.append(event)
+                self._last_id = event.id
+        self._stopping.clear()
+        self._poller = threading.Thread(target=self._poll_loop, name="event-log-poller", daemon=True)
+        self._poller.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        self._poll_wakeup.set()
+        if self._poller is not None:
+            self._poller.join(timeout)
+
+    def _poll_once(self) -> int:
+        deliveries = []
+        with self._lock:
+            for event in self._shared.since(self._last_id, self.history_size):
+                self._history.append(event)
+                self._last_id = event.id
+                deliveries.append((event, [sub for sub in self._subscribers if sub.matches(event)]))
+        for event, subscribers in deliveries:
+            self._deliver(event, subscribers)
+        return len(deliveries)
+
+    def _poll_loop(self) -> None:
+        polls = 0
+        while not self._stopping.is_set():
+            try:
+                while self._poll_once():
+                    pass
+                polls += 1
+                if polls % 500 == 0:
+                    self._shared.prune(self.history_size)
+            except sqlite3.Error:
+                logger.exception("Reading the shared event log failed")
+            self._poll_wakeup.wait(self.poll_interval_sec)
+            self._poll_wakeup.clear()
+
+    def subscribe(
+        self,
+        dataset_id: Optional[str] = None,
+        last_event_id: Optional[int] = None,
+    ) -> Tuple[Subscription, List[Event], bool]:
+        """Register a subscriber on the running loop.
+
+        Returns the subscription, the retained events after ``last_event_id`` to replay, and
+        whether the client missed events that can no longer be replayed.
+        """
+        sub = Subscription(dataset_id, asyncio.get_running_loop(), self.subscriber_queue_size)
+        if self._shared is not None and last_event_id is not None and last_event_id > self._last_id:
+            # The client last saw an event from a process this one has not caught up with yet.
+            self._poll_once()
+        with self._lock:
+            self._subscribers.add(sub)
+            replay: List[Event] = []
+            reset = False
+            if last_event_id is not None:
+                oldest = self._history[0].id if self._history else self._last_id + 1
+                reset = last_event_id > self._last_id or last_event_id < oldest - 1
+                if not reset:
+                    replay = [e for e in self._history if e.id > last_event_id and sub.matches(e)]
+        return sub, replay, reset
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
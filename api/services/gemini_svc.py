@@ -1,53 +1,261 @@
+import asyncio
+import hashlib
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import random
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
 
 from api.models import L2Reasoning
+from api.services.audit_cache import AuditCache
+from api.services.blob_store import BlobStore
+from api.services.circuit_breaker import CircuitBreaker
+from api.services.embedder import THUMBNAIL_NAMESPACE
+from api.services.prompt_builder import SYSTEM_PROMPT, PromptBuilder, response_schema
+
+
+logger = logging.getLogger(__name__)
 
 
 class GeminiService:
-    def __init__(self):
+    RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+    # Bump whenever the prompt or response schema changes so cached audits are not reused.
+    PROMPT_VERSION = "l2-audit-4"
+
+    def __init__(
+        self,
+        audit_cache: Optional[AuditCache] = None,
+        prompt_builder: Optional[PromptBuilder] = None,
+        thumbnail_store: Optional[BlobStore] = None,
+    ):
         self.api_key = os.getenv("GEMINI_API_KEY")
+        # Optional override so audits can be pointed at a proxy or a local stub server.
+        self.base_url = os.getenv("GEMINI_BASE_URL")
         self.client: Optional[genai.Client] = None
         self.model_id = "gemini-2.5-flash"
+        self.audit_cache = audit_cache or AuditCache()
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.thumbnail_store = thumbnail_store or BlobStore()
+        self.max_inline_images = int(os.getenv("GEMINI_MAX_INLINE_IMAGES", "8"))
+
+        self.call_timeout_sec = float(os.getenv("GEMINI_CALL_TIMEOUT_SEC", "60"))
+        self.max_attempts = max(1, int(os.getenv("GEMINI_MAX_ATTEMPTS", "3")))
+        self.backoff_base_sec = float(os.getenv("GEMINI_BACKOFF_BASE_SEC", "0.5"))
+        self.backoff_max_sec = float(os.getenv("GEMINI_BACKOFF_MAX_SEC", "8"))
+        self.max_concurrency = max(1, int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")))
+        self.breaker = CircuitBreaker(
+            "gemini",
+            failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURE_THRESHOLD", "5")),
+            recovery_timeout_sec=float(os.getenv("GEMINI_BREAKER_RECOVERY_SEC", "30")),
+        )
+        # Optional secondary model raced against the primary once it exceeds hedge_after_sec.
+        self.hedge_model_id = os.getenv("GEMINI_HEDGE_MODEL_ID") or None
+        self.hedge_after_sec = float(os.getenv("GEMINI_HEDGE_AFTER_SEC", "10"))
+        self.hedge_counts = {"started": 0, "won": 0}
+        # asyncio primitives belong to one event loop; keep one limiter per running loop.
+        self._limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
 
     def _get_client(self) -> genai.Client:
         if self.client is None:
             if not self.api_key:
                 raise RuntimeError("GEMINI_API_KEY is not set")
-            self.client = genai.Client(api_key=self.api_key)
+            http_options = genai_types.HttpOptions(base_url=self.base_url) if self.base_url else None
+            self.client = genai.Client(api_key=self.api_key, http_options=http_options)
         return self.client
 
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(loop)
+        if limiter is None:
+            limiter = asyncio.Semaphore(self.max_concurrency)
+            self._limiters[loop] = limiter
+        return limiter
+
+    def _is_retryable(self, exc: BaseException) -> bool:
+        if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError, ConnectionError)):
+            return True
+        if isinstance(exc, genai_errors.APIError):
+            return exc.code in self.RETRYABLE_STATUS_CODES
+        return False
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^(attempt-1))].
+        return random.uniform(0.0, min(self.backoff_max_sec, self.backoff_base_sec * (2 ** (attempt - 1))))
+
+    async def _call_model(self, client: genai.Client, model_id: str, contents: Any, config: Dict[str, Any]) -> Any:
+        return await client.aio.models.generate_content(model=model_id, contents=contents, config=config)
+
+    async def _hedged_call(self, client: genai.Client, contents: Any, config: Dict[str, Any]) -> Tuple[Any, str]:
+        """Call the primary model; if it is slower than ``hedge_after_sec``, race the secondary model."""
+        primary = asyncio.ensure_future(self._call_model(client, self.model_id, contents, config))
+        if not self.hedge_model_id:
+            return await primary, self.model_id
+
+        tasks = {primary: self.model_id}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_after_sec)
+            if not done:
+                hedge = asyncio.ensure_future(self._call_model(client, self.hedge_model_id, contents, config))
+                tasks[hedge] = self.hedge_model_id
+                self.hedge_counts["started"] += 1
+
+            pending = set(tasks)
+            last_exc: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if tasks[task] == self.hedge_model_id:
+                            self.hedge_counts["won"] += 1
+                        return task.result(), tasks[task]
+                    last_exc = task.exception()
+            raise last_exc
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _generate_content(self, contents: Any, config: Dict[str, Any]) -> Tuple[Any, str]:
+        client = self._get_client()
+
+        for attempt in range(1, self.max_attempts + 1):
+            # Fail fast while Gemini is known to be down instead of waiting for a full timeout.
+            self.breaker.check()
+            try:
+                # The limiter is held per attempt only, so backoff sleeps do not hold a slot.
+                async with self._limiter():
+                    result = await asyncio.wait_for(
+                        self._hedged_call(client, contents, config),
+                        timeout=self.call_timeout_sec,
+                    )
+                self.breaker.record_success()
+                return result
+            except Exception as exc:
+                retryable = self._is_retryable(exc)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    # The service answered; the request itself was bad.
+                    self.breaker.record_success()
+                if attempt >= self.max_attempts or not retryable:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(
+                    "Gemini call failed (attempt %d/%d): %r; retrying in %.2fs",
+                    attempt,
+                    self.max_attempts,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    def ops_snapshot(self) -> Dict[str, Any]:
+        return {
+            "model_id": self.model_id,
+            "hedge_model_id": self.hedge_model_id,
+            "hedge_after_sec": self.hedge_after_sec,
+            "hedges": dict(self.hedge_counts),
+            "max_concurrency": self.max_concurrency,
+            "call_timeout_sec": self.call_timeout_sec,
+            "breaker": self.breaker.snapshot(),
+        }
+
+    def _build_contents(self, prompt_text: str, image_urls: List[str]) -> Tuple[Any, int]:
+        """Prompt text followed by stored thumbnails, so Gemini never has to fetch the URLs itself."""
+        parts: List[genai_types.Part] = []
+        for image_url in image_urls:
+            if len(parts) // 2 >= self.max_inline_images:
+                break
+            thumbnail = self.thumbnail_store.get(THUMBNAIL_NAMESPACE, BlobStore.key_for(image_url))
+            if thumbnail is None:
+                continue
+            parts.append(genai_types.Part.from_text(text=f"IMAGE {image_url}"))
+            parts.append(genai_types.Part.from_bytes(data=thumbnail, mime_type="image/jpeg"))
+
+        if not parts:
+            return prompt_text, 0
+        return [genai_types.Part.from_text(text=prompt_text), *parts], len(parts) // 2
+
+    def _cache_key(
+        self,
+        drift_data: Dict[str, float],
+        sample_images: List[str],
+        sample_captions: List[str],
+        cluster_context: Optional[List[Dict[str, Any]]],
+    ) -> str:
+        sample_ids = [
+            hashlib.sha1(f"{image}\n{caption}".encode("utf-8")).hexdigest()
+            for image, caption in zip(sample_images, sample_captions)
+        ]
+        return self.audit_cache.make_key(
+            drift={name: round(float(value), 6) for name, value in drift_data.items()},
+            samples=sample_ids,
+            clusters=[[c.get("cluster_id"), c.get("size")] for c in cluster_context or []],
+            prompt_version=self.PROMPT_VERSION,
+            model_id=self.model_id,
+        )
+
     async def audit_dataset(
         self,
         drift_data: Dict[str, float],
         sample_images: List[str],
         sample_captions: List[str],
         outlier_context: Optional[List[Dict[str, Any]]] = None,
+        cluster_context: Optional[List[Dict[str, Any]]] = None,
+        force_refresh: bool = False,
     ) -> L2Reasoning:
-        system_prompt = """
-        You are a VLM dataset auditor.
-        Review image-text samples and drift statistics, then decide alignment status.
-        These are statistically most-outlying samples (lowest similarity cohort).
-        Assess whether these outliers also indicate semantic misalignment.
-        Return strict JSON that matches the provided schema.
-        """
-
-        user_content = f"""
-        [Drift Stats]: {drift_data}
-        [Samples]: {list(zip(sample_images, sample_captions))}
-        [Outlier Context]: {outlier_context or []}
-        """
-
-        response = self._get_client().models.generate_content(
-            model=self.model_id,
-            contents=user_content,
-            config={
-                "system_instruction": system_prompt,
+        cache_key = self._cache_key(drift_data, sample_images, sample_captions, cluster_context)
+        if not force_refresh:
+            cached = self.audit_cache.get(cache_key)
+            if cached is not None:
+                logger.info("L2 audit cache hit (%s)", cache_key[:12])
+                return cached.model_copy(update={"cache_hit": True})
+
+        prompt = self.prompt_builder.build(
+            drift_data,
+            sample_images,
+            sample_captions,
+            outlier_context=outlier_context,
+            cluster_context=cluster_context,
+        )
+
+        contents, inline_images = self._build_contents(prompt.text, prompt.image_urls)
+
+        started = time.perf_counter()
+        response, served_by = await self._generate_content(
+            contents,
+            {
+                "system_instruction": SYSTEM_PROMPT,
                 "response_mime_type": "application/json",
-                "response_schema": L2Reasoning.model_json_schema(),
+                "response_json_schema": response_schema(),
             },
         )
+        latency_ms = (time.perf_counter() - started) * 1000.0
+
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or prompt.estimated_tokens
+        logger.info(
+            "L2 audit model=%s prompt_tokens=%d (estimated=%d) samples=%d dropped=%d deduped=%d images=%d latency_ms=%.0f",
+            served_by,
+            prompt_tokens,
+            prompt.estimated_tokens,
+            prompt.samples_included,
+            prompt.samples_dropped,
+            prompt.duplicates_removed,
+            inline_images,
+            latency_ms,
+        )
 
-        return L2Reasoning.model_validate_json(response.text)
+        result = L2Reasoning.model_validate_json(response.text).model_copy(
+            update={"model_name": served_by, "cache_hit": False, "cached_at": None}
+        )
+        self.audit_cache.put(cache_key, result)
+        return result
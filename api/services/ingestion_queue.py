@@ -0,0 +1,345 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from api.models import IngestionJob, JobStatusEnum
+from api.services.job_store import JobStore, process_owner
+
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_INGESTION_STATUSES = (JobStatusEnum.SUCCEEDED, JobStatusEnum.FAILED, JobStatusEnum.CANCELLED)
+
+# Bad input will not get better on a retry; everything else (vector DB, network, model load) might.
+NON_RETRYABLE_ERRORS = (ValueError, KeyError, FileNotFoundError)
+
+ProgressCallback = Callable[..., None]
+
+
+class IngestionCancelled(Exception):
+    """Raised from the progress callback to stop a job whose cancellation was requested."""
+
+
+class _WorkerShutdown(Exception):
+    """Raised from the progress callback when the pool is stopping; the job is queued again."""
+
+
+class IngestionQueue:
+    """Durable FIFO of ingestion jobs executed by a pool of worker threads.
+
+    Each worker runs jobs on its own event loop, so embedding and vector upserts never block the
+    API's request loop, and at most ``workers`` ingestions run at once. Jobs are keyed by
+    ``(dataset_id, version)``: enqueueing a version that is already queued or running returns the
+    existing job. Failed attempts are retried with exponential backoff unless the error is a data
+    error.
+
+    Queue state lives in a SQLite job store shared by every API process, so any process can
+    enqueue, inspect or cancel a job, but only a process that has called ``start`` executes them
+    (the API starts workers in the one process that owns background work). Workers claim jobs in
+    a write transaction, and ``start`` queues again any job left running by a previous owner.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[IngestionJob, ProgressCallback], Awaitable[Any]],
+        on_change: Optional[Callable[[IngestionJob], None]] = None,
+        db_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff_sec: Optional[float] = None,
+        history_limit: int = 200,
+        progress_interval_sec: float = 0.5,
+        poll_interval_sec: Optional[float] = None,
+    ):
+        self._run_job = run_job
+        self._on_change = on_change
+        self.store: JobStore[IngestionJob] = JobStore(
+            IngestionJob,
+            "ingestion_jobs",
+            is_active=lambda job: job.status not in TERMINAL_INGESTION_STATUSES,
+            db_path=db_path,
+        )
+        self.workers = max(1, workers or int(os.getenv("INGEST_WORKERS", "2")))
+        self.max_attempts = max(1, max_attempts or int(os.getenv("INGEST_MAX_ATTEMPTS", "3")))
+        self.retry_backoff_sec = (
+            retry_backoff_sec if retry_backoff_sec is not None else float(os.getenv("INGEST_RETRY_BACKOFF_SEC", "5"))
+        )
+        self.history_limit = history_limit
+        self.progress_interval_sec = progress_interval_sec
+        # How often idle workers and waiters look for changes made by other processes.
+        self.poll_interval_sec = (
+            poll_interval_sec if poll_interval_sec is not None else float(os.getenv("JOB_POLL_INTERVAL_SEC", "1"))
+        )
+
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        # Smoothed per-job ingestion rate of recent successful jobs, used to estimate wait times.
+        self.rows_per_sec: Optional[float] = None
+
+    # ------------------------------------------------------------------ queue
+
+    def enqueue(self, dataset_id: str, version: str, trigger: str = "CREATE", rows_total: Optional[int] = None) -> IngestionJob:
+        with self.store.transaction():
+            existing = self.store.find_active(dataset_id, version)
+            if existing is not None:
+                return existing
+            job = self.store.insert(
+                IngestionJob(
+                    job_id=uuid.uuid4().hex,
+                    dataset_id=dataset_id,
+                    version=version,
+                    trigger=trigger,
+                    rows_total=rows_total,
+                )
+            )
+        self._signal()
+        self._notify(job)
+        logger.info("Queued ingestion %s for %s:%s (%s)", job.job_id, dataset_id, version, trigger)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """Cancel a queued job now, or ask a running one to stop at its next batch boundary.
+
+        Returns the job (unchanged if it had already finished), or ``None`` if it is unknown.
+        Works from any process; the owner of a running job notices on its next progress report.
+        """
+        with self.store.transaction():
+            job = self.store.get(job_id)
+            if job is None or job.status in TERMINAL_INGESTION_STATUSES:
+                return job
+            job.cancel_requested = True
+            self.store.request_cancel(job_id)
+            if job.status == JobStatusEnum.RUNNING:
+                return job
+            job.status = JobStatusEnum.CANCELLED
+            job.next_attempt_at = None
+            self._finish(job)
+        self._signal()
+        self._notify(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self.store.get(job_id)
+
+    def active_job(self, dataset_id: str, version: str) -> Optional[IngestionJob]:
+        return self.store.find_active(dataset_id, version)
+
+    def snapshot(self, history: int = 20) -> Dict[str, Any]:
+        active = self.store.active()
+        return {
+            "queued": sum(1 for job in active if job.status == JobStatusEnum.QUEUED),
+            "running": sum(1 for job in active if job.status == JobStatusEnum.RUNNING),
+            "workers": self.workers,
+            "max_attempts": self.max_attempts,
+            "jobs": sorted(active, key=lambda job: (job.status != JobStatusEnum.RUNNING, job.enqueued_at)),
+            "recent": self.store.recent(history),
+        }
+
+    def backlog(self) -> Tuple[int, int]:
+        """Number of queued jobs, and rows accepted but not yet upserted across all active jobs."""
+        active = self.store.active()
+        queued = sum(1 for job in active if job.status == JobStatusEnum.QUEUED)
+        rows = sum(max(0, (job.rows_total or 0) - job.rows_upserted) for job in active)
+        return queued, rows
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[IngestionJob]:
+        """Block until a job finishes (or ``timeout`` elapses) and return its current state."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                generation = self._generation
+            job = self.store.get(job_id)
+            if job is None or job.status in TERMINAL_INGESTION_STATUSES:
+                return job
+            remaining = self.poll_interval_sec if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            with self._cond:
+                # Woken early by jobs finishing here; finishes in other processes are seen by polling.
+                self._cond.wait_for(
+                    lambda: self._generation != generation, timeout=min(remaining, self.poll_interval_sec)
+                )
+
+    def _signal(self) -> None:
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+
+    def _notify(self, job: IngestionJob) -> None:
+        if self._on_change is None:
+            return
+        try:
+            self._on_change(job)
+        except Exception:
+            logger.exception("Ingestion job change listener failed")
+
+    # ---------------------------------------------------------------- workers
+
+    def start(self) -> None:
+        """Start the worker threads if they are not running.
+
+        Call this in at most one process at a time: it first queues again every job still marked
+        running, on the assumption that the process which claimed it is gone.
+        """
+        with self._cond:
+            if any(thread.is_alive() for thread in self._threads):
+                return
+            self._stopping = False
+            self._recover()
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"ingest-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers; running jobs halt at their next batch boundary and are queued again."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _recover(self) -> None:
+        finished: List[IngestionJob] = []
+        with self.store.transaction():
+            for job in self.store.active():
+                if job.status != JobStatusEnum.RUNNING:
+                    continue
+                if job.cancel_requested:
+                    job.status = JobStatusEnum.CANCELLED
+                    self._finish(job)
+                    finished.append(job)
+                    continue
+                # Restarted from the stored raw data; the interrupted attempt does not count.
+                job.status = JobStatusEnum.QUEUED
+                job.started_at = None
+                job.owner = None
+                self.store.save(job)
+                logger.info("Re-queued interrupted ingestion %s for %s:%s", job.job_id, job.dataset_id, job.version)
+        for job in finished:
+            self._notify(job)
+
+    def _claim(self) -> Tuple[Optional[IngestionJob], Optional[float]]:
+        """Take the oldest runnable job, or return how long until a backed-off job becomes runnable."""
+        now = datetime.now(timezone.utc)
+        wait_sec: Optional[float] = None
+        with self.store.transaction():
+            for job in self.store.active():
+                if job.status != JobStatusEnum.QUEUED:
+                    continue
+                if job.next_attempt_at is None or job.next_attempt_at <= now:
+                    job.status = JobStatusEnum.RUNNING
+                    job.started_at = now
+                    job.next_attempt_at = None
+                    job.attempts += 1
+                    job.owner = process_owner()
+                    job.rows_fetched = job.rows_embedded = job.rows_upserted = 0
+                    self.store.save(job)
+                    self.store.pin(job)
+                    return job, None
+                delay = (job.next_attempt_at - now).total_seconds()
+                wait_sec = delay if wait_sec is None else min(wait_sec, delay)
+        return None, wait_sec
+
+    def _next_job(self) -> Optional[IngestionJob]:
+        with self._cond:
+            while not self._stopping:
+                job, wait_sec = self._claim()
+                if job is not None:
+                    return job
+                self._cond.wait(self.poll_interval_sec if wait_sec is None else min(wait_sec, self.poll_interval_sec))
+            return None
+
+    def _worker(self) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                self._notify(job)
+                self._execute(loop, job)
+        finally:
+            loop.close()
+
+    def _progress(self, job: IngestionJob) -> ProgressCallback:
+        last_reported = [time.monotonic()]
+
+        def report(stage: str, **counts: Any) -> None:
+            for field in ("rows_fetched", "rows_embedded", "rows_upserted"):
+                if field in counts:
+                    setattr(job, field, int(counts[field]))
+            if self._stopping:
+                raise _WorkerShutdown()
+            if job.cancel_requested:
+                raise IngestionCancelled()
+            now = time.monotonic()
+            if now - last_reported[0] >= self.progress_interval_sec:
+                last_reported[0] = now
+                # Cancellation may have been requested by another process.
+                if self.store.cancel_requested(job.job_id):
+                    job.cancel_requested = True
+                    raise IngestionCancelled()
+                self.store.save(job)
+                self._notify(job)
+
+        return report
+
+    def _execute(self, loop: asyncio.AbstractEventLoop, job: IngestionJob) -> None:
+        try:
+            result = loop.run_until_complete(self._run_job(job, self._progress(job)))
+        except _WorkerShutdown:
+            job.status = JobStatusEnum.QUEUED
+            job.started_at = None
+            job.owner = None
+            job.attempts -= 1
+            self.store.save(job)
+            self.store.unpin(job)
+            return
+        except IngestionCancelled:
+            job.status = JobStatusEnum.CANCELLED
+        except Exception as exc:
+            job.error = str(exc)[:500]
+            if not isinstance(exc, NON_RETRYABLE_ERRORS) and job.attempts < self.max_attempts:
+                delay = self.retry_backoff_sec * (2 ** (job.attempts - 1))
+                logger.warning("Ingestion %s attempt %d failed, retrying in %.1fs: %s", job.job_id, job.attempts, delay, exc)
+                job.status = JobStatusEnum.QUEUED
+                job.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                self.store.save(job)
+                self.store.unpin(job)
+                self._signal()
+                self._notify(job)
+                return
+            job.status = JobStatusEnum.FAILED
+            logger.warning("Ingestion %s for %s:%s failed: %s", job.job_id, job.dataset_id, job.version, job.error)
+        else:
+            job.status = JobStatusEnum.SUCCEEDED
+            job.error = None
+            job.l1_status = getattr(result, "l1_status", None)
+            self._record_throughput(job)
+        self._finish(job)
+        self._signal()
+        self._notify(job)
+
+    def _record_throughput(self, job: IngestionJob) -> None:
+        elapsed = (datetime.now(timezone.utc) - job.started_at).total_seconds() if job.started_at else 0.0
+        if job.rows_upserted <= 0 or elapsed <= 0:
+            return
+        rate = job.rows_upserted / elapsed
+        self.rows_per_sec = rate if self.rows_per_sec is None else 0.7 * self.rows_per_sec + 0.3 * rate
+
+    def _finish(self, job: IngestionJob) -> None:
+        job.finished_at = datetime.now(timezone.utc)
+        with self.store.transaction():
+            self.store.save(job)
+            self.store.prune(self.history_limit)
+        self.store.unpin(job)
@@ -1,11 +1,19 @@
+import bisect
+import hashlib
+import os
+import re
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from api.models import L1Report, StatusEnum
+from api.models import L1Report, L1Rules, StatusEnum
 
 
 class IngestorService:
     TIMESTAMP_FIELDS = ("captured_at", "created_at", "updated_at", "timestamp", "event_time")
+    # Cap the number of clusters echoed into L1Report.details so the report stays small.
+    MAX_DUPLICATE_CLUSTERS = 20
+    MAX_CLUSTER_MEMBERS = 10
 
     @staticmethod
     def _parse_timestamp(value: Any) -> Optional[datetime]:
@@ -30,42 +38,271 @@ class IngestorService:
             return dt.replace(tzinfo=timezone.utc)
         return dt.astimezone(timezone.utc)
 
-    def _compute_freshness_delay(self, raw_data: List[Dict]) -> int:
-        latest_timestamp: Optional[datetime] = None
+    @staticmethod
+    def _content_hash(value: Any, casefold: bool = False) -> Optional[str]:
+        if value is None:
+            return None
+        text = re.sub(r"\s+", " ", str(value)).strip()
+        if not text:
+            return None
+        if casefold:
+            text = text.casefold()
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def summarize_duplicates(
+        self,
+        row_count: int,
+        exact_pairs: Dict[str, List[List[int]]],
+        near_duplicates: Optional[Iterable[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        parent = list(range(row_count))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(a: int, b: int) -> None:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        for field_pairs in exact_pairs.values():
+            for first, second in field_pairs:
+                union(first, second)
+
+        near_count = 0
+        parent_matches: Dict[int, List[Dict[str, Any]]] = {}
+        for match in near_duplicates or []:
+            row_index = match["row_index"]
+            if not 0 <= row_index < row_count:
+                continue
+            near_count += 1
+            if match.get("same_version"):
+                union(row_index, match["match_row_index"])
+            else:
+                parent_matches.setdefault(row_index, []).append(match)
+
+        members: Dict[int, List[int]] = {}
+        for index in range(row_count):
+            members.setdefault(find(index), []).append(index)
+
+        duplicate_rows = {index for root, rows in members.items() for index in rows if index != root}
+        duplicate_rows.update(parent_matches)
+
+        clusters = []
+        for root, rows in members.items():
+            parent_rows = sorted(
+                {
+                    (match["match_version"], match["match_row_index"])
+                    for index in rows
+                    for match in parent_matches.get(index, [])
+                }
+            )
+            if len(rows) < 2 and not parent_rows:
+                continue
+            clusters.append(
+                {
+                    "size": len(rows) + len(parent_rows),
+                    "rows": rows[: self.MAX_CLUSTER_MEMBERS],
+                    "parent_rows": [
+                        {"version": version, "row_index": index}
+                        for version, index in parent_rows[: self.MAX_CLUSTER_MEMBERS]
+                    ],
+                }
+            )
+        clusters.sort(key=lambda cluster: cluster["size"], reverse=True)
+
+        return {
+            "duplicate_rate": (len(duplicate_rows) / row_count) if row_count else 0.0,
+            "duplicate_rows": len(duplicate_rows),
+            "exact_url_duplicates": len(exact_pairs.get("image_url", [])),
+            "exact_caption_duplicates": len(exact_pairs.get("caption", [])),
+            "near_duplicates": near_count,
+            "duplicate_cluster_count": len(clusters),
+            "duplicate_clusters": clusters[: self.MAX_DUPLICATE_CLUSTERS],
+        }
+
+    def start_l1(self, rules: Optional[L1Rules] = None) -> "L1Evaluation":
+        """Begin a single-pass L1 evaluation; feed it rows with ``observe`` and finish with ``report``."""
+        return L1Evaluation(self, rules or default_l1_rules())
+
+    def validate_l1(
+        self,
+        raw_data: Iterable[Dict],
+        near_duplicates: Optional[Iterable[Dict[str, Any]]] = None,
+        rules: Optional[L1Rules] = None,
+    ) -> L1Report:
+        evaluation = self.start_l1(rules)
+        evaluation.observe(raw_data)
+        evaluation.add_near_duplicates(near_duplicates or [])
+        return evaluation.report()
 
-        for item in raw_data:
-            for field in self.TIMESTAMP_FIELDS:
-                parsed = self._parse_timestamp(item.get(field))
-                if parsed is None:
-                    continue
-                if latest_timestamp is None or parsed > latest_timestamp:
-                    latest_timestamp = parsed
 
-        if latest_timestamp is None:
+def default_l1_rules() -> L1Rules:
+    """Rules for datasets without their own; only the volume floor is configurable globally."""
+    return L1Rules(min_rows=int(os.getenv("L1_MIN_ROWS", "10")))
+
+
+class L1Evaluation:
+    """Streaming accumulators for every L1 check, updated once per row.
+
+    Schema, volume, freshness, caption-length distribution, null rates and per-source counts use
+    constant memory (source counts are capped at ``MAX_TRACKED_SOURCES``), so rows can be
+    discarded as soon as they are observed. Exact-duplicate detection keeps one digest per
+    distinct URL and caption.
+    """
+
+    REQUIRED_FIELDS = ("image_url", "caption", "source_id")
+    # Lower bounds of the caption length histogram buckets.
+    CAPTION_LENGTH_BUCKETS = (0, 10, 20, 50, 100, 200, 500)
+    MAX_TRACKED_SOURCES = 1000
+    MAX_REPORTED_SOURCES = 20
+
+    def __init__(self, ingestor: IngestorService, rules: L1Rules):
+        self.ingestor = ingestor
+        self.rules = rules
+        self.rows = 0
+        self.schema_failures = 0
+        self.latest_timestamp: Optional[datetime] = None
+        self.caption_total = 0
+        self.caption_min: Optional[int] = None
+        self.caption_max: Optional[int] = None
+        self.caption_histogram = [0] * len(self.CAPTION_LENGTH_BUCKETS)
+        self.caption_out_of_range = 0
+        self.null_fields = tuple(dict.fromkeys((*self.REQUIRED_FIELDS, *IngestorService.TIMESTAMP_FIELDS, *rules.max_null_rate)))
+        self.null_counts = dict.fromkeys(self.null_fields, 0)
+        self.source_counts: Counter = Counter()
+        self.untracked_source_rows = 0
+        self._first_seen: Dict[str, Dict[str, int]] = {"image_url": {}, "caption": {}}
+        self._exact_pairs: Dict[str, List[List[int]]] = {"image_url": [], "caption": []}
+        self._near_duplicates: List[Dict[str, Any]] = []
+
+    def observe(self, rows: Iterable[Dict]) -> None:
+        for row in rows:
+            self._observe_row(row)
+
+    def _observe_row(self, row: Dict) -> None:
+        index = self.rows
+        self.rows += 1
+
+        if any(row.get(field) is None for field in self.REQUIRED_FIELDS):
+            self.schema_failures += 1
+        for field in self.null_fields:
+            value = row.get(field)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                self.null_counts[field] += 1
+
+        for field in IngestorService.TIMESTAMP_FIELDS:
+            parsed = IngestorService._parse_timestamp(row.get(field))
+            if parsed is not None and (self.latest_timestamp is None or parsed > self.latest_timestamp):
+                self.latest_timestamp = parsed
+
+        caption = row.get("caption")
+        if caption is not None:
+            length = len(str(caption))
+            self.caption_total += length
+            self.caption_min = length if self.caption_min is None else min(self.caption_min, length)
+            self.caption_max = length if self.caption_max is None else max(self.caption_max, length)
+            self.caption_histogram[bisect.bisect_right(self.CAPTION_LENGTH_BUCKETS, length) - 1] += 1
+            if length < self.rules.caption_min_chars or (
+                self.rules.caption_max_chars is not None and length > self.rules.caption_max_chars
+            ):
+                self.caption_out_of_range += 1
+
+        source = row.get("source_id")
+        if source is not None:
+            source = str(source)
+            if source in self.source_counts or len(self.source_counts) < self.MAX_TRACKED_SOURCES:
+                self.source_counts[source] += 1
+            else:
+                self.untracked_source_rows += 1
+
+        for field, seen in self._first_seen.items():
+            digest = IngestorService._content_hash(row.get(field), casefold=field == "caption")
+            if digest is None:
+                continue
+            if digest in seen:
+                self._exact_pairs[field].append([seen[digest], index])
+            else:
+                seen[digest] = index
+
+    def add_near_duplicates(self, matches: Iterable[Dict[str, Any]]) -> None:
+        self._near_duplicates.extend(matches)
+
+    def _freshness_delay(self) -> int:
+        if self.latest_timestamp is None:
             return -1
+        return max(0, int((datetime.now(timezone.utc) - self.latest_timestamp).total_seconds()))
 
-        now_utc = datetime.now(timezone.utc)
-        delay = (now_utc - latest_timestamp).total_seconds()
-        return max(0, int(delay))
+    def _caption_details(self) -> Dict[str, Any]:
+        labels = [
+            f"{low}-{high - 1}" for low, high in zip(self.CAPTION_LENGTH_BUCKETS, self.CAPTION_LENGTH_BUCKETS[1:])
+        ] + [f"{self.CAPTION_LENGTH_BUCKETS[-1]}+"]
+        return {
+            "min": self.caption_min,
+            "max": self.caption_max,
+            "histogram": dict(zip(labels, self.caption_histogram)),
+            "out_of_range_rate": self.caption_out_of_range / self.rows if self.rows else 0.0,
+        }
 
-    def validate_l1(self, raw_data: List[Dict]) -> L1Report:
-        required_fields = {"image_url", "caption", "source_id"}
-        schema_passed = all(required_fields.issubset(item.keys()) for item in raw_data)
+    def report(self) -> L1Report:
+        rules = self.rules
+        rows = self.rows
+        freshness_delay_sec = self._freshness_delay()
+        null_rates = {field: (count / rows if rows else 0.0) for field, count in self.null_counts.items()}
+        duplicates = self.ingestor.summarize_duplicates(rows, self._exact_pairs, self._near_duplicates)
+        top_source = self.source_counts.most_common(1)
+        top_source_share = top_source[0][1] / rows if rows and top_source else 0.0
 
-        actual_count = len(raw_data)
-        expected_count = 10
-        freshness_delay_sec = self._compute_freshness_delay(raw_data)
+        schema_passed = self.schema_failures == 0
+        violations: List[str] = []
+        if rules.max_freshness_delay_sec is not None:
+            if freshness_delay_sec < 0:
+                violations.append("freshness: no row has a timestamp")
+            elif freshness_delay_sec > rules.max_freshness_delay_sec:
+                violations.append(f"freshness: {freshness_delay_sec}s > {rules.max_freshness_delay_sec}s")
+        caption_rate = self.caption_out_of_range / rows if rows else 0.0
+        if caption_rate > rules.max_caption_length_violation_rate:
+            violations.append(
+                f"caption_length: {caption_rate:.1%} of captions outside "
+                f"[{rules.caption_min_chars}, {rules.caption_max_chars or 'inf'}] chars"
+            )
+        for field, limit in rules.max_null_rate.items():
+            if null_rates[field] > limit:
+                violations.append(f"null_rate: {field} {null_rates[field]:.1%} > {limit:.1%}")
+        if rules.max_source_share is not None and top_source_share > rules.max_source_share:
+            violations.append(f"source_share: {top_source[0][0]} {top_source_share:.1%} > {rules.max_source_share:.1%}")
+        if rules.max_duplicate_rate is not None and duplicates["duplicate_rate"] > rules.max_duplicate_rate:
+            violations.append(f"duplicate_rate: {duplicates['duplicate_rate']:.1%} > {rules.max_duplicate_rate:.1%}")
 
-        l1_status = StatusEnum.PASS if schema_passed and actual_count >= expected_count else StatusEnum.BLOCK
+        if not schema_passed or rows < rules.min_rows:
+            l1_status = StatusEnum.BLOCK
+        elif violations:
+            l1_status = StatusEnum(rules.soft_status)
+        else:
+            l1_status = StatusEnum.PASS
 
         return L1Report(
             schema_passed=schema_passed,
-            volume_actual=actual_count,
-            volume_expected=expected_count,
+            volume_actual=rows,
+            volume_expected=rules.min_rows,
             freshness_delay_sec=freshness_delay_sec,
             l1_status=l1_status,
             details={
-                "avg_caption_len": (sum(len(d["caption"]) for d in raw_data) / actual_count) if actual_count else 0.0,
+                "avg_caption_len": (self.caption_total / rows) if rows else 0.0,
                 "freshness_known": freshness_delay_sec >= 0,
+                "schema_failures": self.schema_failures,
+                "caption_length": self._caption_details(),
+                "null_rates": null_rates,
+                "source_counts": dict(self.source_counts.most_common(self.MAX_REPORTED_SOURCES)),
+                "distinct_sources": len(self.source_counts),
+                # Rows whose source_id arrived after MAX_TRACKED_SOURCES others; counted in no source.
+                "untracked_source_rows": self.untracked_source_rows,
+                "top_source_share": top_source_share,
+                "violations": violations,
+                "rules": rules.model_dump(),
+                **duplicates,
             },
         )
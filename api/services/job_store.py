@@ -0,0 +1,221 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Generic, Iterator, List, Optional, Set, Type, TypeVar
+
+from pydantic import BaseModel
+
+from api.services import sqlite_db
+
+
+JobT = TypeVar("JobT", bound=BaseModel)
+
+
+def default_jobs_db_path() -> str:
+    return os.getenv("JOBS_DB_PATH", os.path.join(os.getenv("ALIGNOPS_DATA_DIR", "data"), "jobs.db"))
+
+
+def process_owner() -> str:
+    """Identifies the process that claimed a job, for operators and for tests."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _status(job: BaseModel) -> str:
+    return str(getattr(job.status, "value", job.status))
+
+
+class JobStore(Generic[JobT]):
+    """Jobs of one kind in a SQLite table shared by every API process.
+
+    Rows are the source of truth. Reads return one in-process object per job id, refreshed from
+    its row each time, so callers holding a job see changes made by other processes. Jobs this
+    process is executing are ``pin``-ned: their progress lives in memory and is written back
+    with ``save``, and only the cancellation flag (set by any process via ``request_cancel``)
+    is merged in from the row. A per-kind mark table records versions a scheduler has handled.
+    """
+
+    def __init__(self, model: Type[JobT], table: str, is_active: Callable[[JobT], bool], db_path: Optional[str] = None):
+        self.model = model
+        self.table = table
+        self.is_active = is_active
+        self.db_path = db_path or default_jobs_db_path()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._objects: "weakref.WeakValueDictionary[str, JobT]" = weakref.WeakValueDictionary()
+        self._pinned: Set[str] = set()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite_db.connect(self.db_path)
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    job_id TEXT PRIMARY KEY,
+                    dataset_id TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    active INTEGER NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    seq INTEGER NOT NULL,
+                    updated_ts REAL NOT NULL,
+                    doc TEXT NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS {self.table}_active_version
+                    ON {self.table} (dataset_id, version) WHERE active = 1;
+                CREATE INDEX IF NOT EXISTS {self.table}_active_seq ON {self.table} (active, seq);
+                CREATE TABLE IF NOT EXISTS {self.table}_marks (
+                    dataset_id TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    PRIMARY KEY (dataset_id, version)
+                );
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Serialize a read-modify-write against this and every other process; nests."""
+        with self._lock:
+            conn = self._connection()
+            if conn.in_transaction:
+                yield
+                return
+            with sqlite_db.write_transaction(conn):
+                yield
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------ objects
+
+    def _adopt(self, row: sqlite3.Row) -> JobT:
+        job_id = row["job_id"]
+        job = self._objects.get(job_id)
+        if job is not None and job_id in self._pinned:
+            if row["cancel_requested"] and hasattr(job, "cancel_requested"):
+                job.cancel_requested = True
+            return job
+        fresh = self.model.model_validate_json(row["doc"])
+        if row["cancel_requested"] and hasattr(fresh, "cancel_requested"):
+            fresh.cancel_requested = True
+        if job is None:
+            self._objects[job_id] = fresh
+            return fresh
+        for field in self.model.model_fields:
+            setattr(job, field, getattr(fresh, field))
+        return job
+
+    def _select(self, where: str, params: tuple = (), order: str = "seq", limit: Optional[int] = None) -> List[JobT]:
+        sql = f"SELECT job_id, cancel_requested, doc FROM {self.table} WHERE {where} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [self._adopt(row) for row in self._connection().execute(sql, params).fetchall()]
+
+    def pin(self, job: JobT) -> None:
+        with self._lock:
+            self._objects[job.job_id] = job
+            self._pinned.add(job.job_id)
+
+    def unpin(self, job: JobT) -> None:
+        with self._lock:
+            self._pinned.discard(job.job_id)
+
+    # ------------------------------------------------------------ reads
+
+    def get(self, job_id: str) -> Optional[JobT]:
+        jobs = self._select("job_id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def find_active(self, dataset_id: str, version: str) -> Optional[JobT]:
+        jobs = self._select("active = 1 AND dataset_id = ? AND version = ?", (dataset_id, version))
+        return jobs[0] if jobs else None
+
+    def active(self) -> List[JobT]:
+        """Queued and running jobs in enqueue order."""
+        return self._select("active = 1")
+
+    def recent(self, limit: int) -> List[JobT]:
+        """Finished jobs, most recently finished first."""
+        return self._select("active = 0", order="updated_ts DESC", limit=limit)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT cancel_requested FROM {self.table} WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    # ------------------------------------------------------------ writes
+
+    def insert(self, job: JobT) -> JobT:
+        """Add a job; raises ``sqlite3.IntegrityError`` if its version already has an active job."""
+        with self.transaction():
+            conn = self._connection()
+            seq = conn.execute(f"SELECT COALESCE(MAX(seq), 0) + 1 FROM {self.table}").fetchone()[0]
+            conn.execute(
+                f"INSERT INTO {self.table} (job_id, dataset_id, version, status, active, cancel_requested, seq, updated_ts, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.job_id,
+                    job.dataset_id,
+                    job.version,
+                    _status(job),
+                    int(self.is_active(job)),
+                    int(bool(getattr(job, "cancel_requested", False))),
+                    seq,
+                    time.time(),
+                    job.model_dump_json(),
+                ),
+            )
+            self._objects[job.job_id] = job
+        return job
+
+    def save(self, job: JobT) -> None:
+        with self._lock:
+            self._connection().execute(
+                f"UPDATE {self.table} SET status = ?, active = ?, updated_ts = ?, doc = ? WHERE job_id = ?",
+                (_status(job), int(self.is_active(job)), time.time(), job.model_dump_json(), job.job_id),
+            )
+
+    def request_cancel(self, job_id: str) -> None:
+        with self._lock:
+            self._connection().execute(f"UPDATE {self.table} SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+
+    def prune(self, keep: int) -> None:
+        """Delete all but the ``keep`` most recently finished jobs."""
+        with self._lock:
+            self._connection().execute(
+                f"DELETE FROM {self.table} WHERE active = 0 AND job_id NOT IN "
+                f"(SELECT job_id FROM {self.table} WHERE active = 0 ORDER BY updated_ts DESC LIMIT ?)",
+                (keep,),
+            )
+
+    # ------------------------------------------------------------ marks
+
+    def mark(self, dataset_id: str, version: str) -> None:
+        with self._lock:
+            self._connection().execute(
+                f"INSERT OR IGNORE INTO {self.table}_marks (dataset_id, version) VALUES (?, ?)", (dataset_id, version)
+            )
+
+    def unmark(self, dataset_id: str, version: str) -> None:
+        with self._lock:
+            self._connection().execute(
+                f"DELETE FROM {self.table}_marks WHERE dataset_id = ? AND version = ?", (dataset_id, version)
+            )
+
+    def is_marked(self, dataset_id: str, version: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT 1 FROM {self.table}_marks WHERE dataset_id = ? AND version = ?", (dataset_id, version)
+            ).fetchone()
+        return row is not None
@@ -0,0 +1,153 @@
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, List, Tuple
+
+
+class _JsonReader:
+    """Buffered cursor over a UTF-8 JSON byte stream, decoding one value at a time."""
+
+    def __init__(self, stream: BinaryIO, chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> None:
+        # Drop consumed text so the buffer only ever holds about one value plus a chunk.
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._buffer += self._decoder.decode(b"", final=True)
+            self._eof = True
+        else:
+            self._buffer += self._decoder.decode(chunk)
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos : self._pos + 1]
+            self._fill()
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill()
+                continue
+            # A value ending exactly at the buffer edge may be cut short (e.g. a number); read on to be sure.
+            if end == len(self._buffer) and not self._eof:
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise self.error("Expecting ',' delimiter")
+
+    def at_end(self) -> bool:
+        return self.peek() == ""
+
+
+def iter_object_members(stream: BinaryIO, streamed_key: str, chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Any]]:
+    """Yield the top-level members of a JSON object read incrementally from ``stream``.
+
+    The array under ``streamed_key`` is yielded as an iterator over its items instead of a list,
+    so arbitrarily long arrays are parsed one element at a time; it must be consumed before the
+    next member is requested. Raises ``json.JSONDecodeError`` on malformed input.
+    """
+    reader = _JsonReader(stream, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise reader.error("Expecting property name")
+            reader.expect(":")
+            if key == streamed_key:
+                yield key, reader.array_items()
+            else:
+                yield key, reader.value()
+            if reader.peek() == ",":
+                reader.expect(",")
+                continue
+            reader.expect("}")
+            break
+    if not reader.at_end():
+        raise reader.error("Extra data")
+
+
+class NdjsonError(ValueError):
+    """A line of newline-delimited JSON could not be decoded."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+class NdjsonDecoder:
+    """Decodes newline-delimited JSON fed in arbitrary byte chunks.
+
+    ``feed`` returns ``(line_number, value)`` for every line completed by the chunk (1-based,
+    blank lines skipped) and buffers the trailing partial line; ``close`` decodes what is left.
+    Only one partial line is ever buffered, and it may not exceed ``max_line_bytes``.
+    """
+
+    def __init__(self, max_line_bytes: int = 1024 * 1024):
+        self.max_line_bytes = max_line_bytes
+        self.lines = 0
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> List[Tuple[int, Any]]:
+        lines = (self._pending + chunk).split(b"\n")
+        self._pending = lines.pop()
+        if len(self._pending) > self.max_line_bytes:
+            raise NdjsonError(self.lines + len(lines) + 1, f"Line exceeds {self.max_line_bytes} bytes")
+        return self._decode(lines)
+
+    def close(self) -> List[Tuple[int, Any]]:
+        lines, self._pending = [self._pending], b""
+        return self._decode(lines)
+
+    def _decode(self, lines: List[bytes]) -> List[Tuple[int, Any]]:
+        values = []
+        for line in lines:
+            self.lines += 1
+            if not line.strip():
+                continue
+            try:
+                values.append((self.lines, json.loads(line)))
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                raise NdjsonError(self.lines, getattr(exc, "msg", None) or str(exc)) from exc
+        return values
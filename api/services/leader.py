@@ -0,0 +1,61 @@
+import logging
+import os
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run a single process
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """Elects one process per data directory to own background work.
+
+    Holds an exclusive advisory lock (``flock``) on a file for the life of the process. The
+    kernel releases it when the holder exits or crashes, so a standby process that keeps calling
+    ``try_acquire`` takes over. Without ``fcntl`` every process considers itself the leader.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            "LEADER_LOCK_PATH",
+            os.path.join(os.getenv("ALIGNOPS_DATA_DIR", "data"), "leader.lock"),
+        )
+        self._handle: Optional[IO[str]] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._handle is not None
+
+    def try_acquire(self) -> bool:
+        """Take the lock if it is free; returns whether this process is now the leader."""
+        if self._handle is not None:
+            return True
+        if fcntl is None:
+            self._handle = open(os.devnull, "w")
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        handle = open(self.path, "a+")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(f"{os.getpid()}\n")
+        handle.flush()
+        self._handle = handle
+        logger.info("Process %d is the background-work leader (%s)", os.getpid(), self.path)
+        return True
+
+    def release(self) -> None:
+        if self._handle is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+        self._handle.close()
+        self._handle = None
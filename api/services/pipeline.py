@@ -1,4 +1,11 @@
+import itertools
+import os
+from typing import Any, Callable, Iterable, Optional
+
+from api.models import L1Report, L1Rules, ManifestSource
 from api.services.embedder import EmbedderService
+from api.services.ingestor import IngestorService
+from api.services.sources import ManifestReader
 from api.services.vector_db import QdrantService
 
 
@@ -6,41 +13,101 @@ class DataPipeline:
     def __init__(self):
         self.embedder = EmbedderService()
         self.vdb = QdrantService()
+        self.ingestor = IngestorService()
+        self.near_duplicate_threshold = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.97"))
+        self.batch_size = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+
+    def read_manifest(self, manifest: ManifestSource, default_source_id: Optional[str] = None) -> ManifestReader:
+        """Rows of a local manifest file, read in chunks of the ingestion batch size, as ``raw_data``.
+
+        Manifests and the images they name are confined to the embedder's local roots; raises
+        ``ManifestError`` if the manifest cannot be opened.
+        """
+        return ManifestReader(
+            manifest,
+            default_source_id=default_source_id,
+            roots=self.embedder.local_roots,
+            chunk_rows=self.batch_size,
+        )
+
+    async def process_ingestion(
+        self,
+        dataset_id: str,
+        version: str,
+        raw_data: Iterable[dict],
+        parent_version: Optional[str] = None,
+        on_progress: Optional[Callable[..., None]] = None,
+        batch_size: Optional[int] = None,
+        rules: Optional[L1Rules] = None,
+    ) -> L1Report:
+        """Ingestion -> Embedding -> Vector DB -> duplicate-aware L1 report
 
-    async def process_ingestion(self, dataset_id: str, version: str, raw_data: list):
-        """Ingestion -> Embedding -> Vector DB flow"""
+        Rows are consumed from ``raw_data`` (any iterable, e.g. a stream from the raw data store)
+        in batches of ``batch_size``; each batch is validated, embedded, upserted, checked for near
+        duplicates and fed to the L1 evaluation (``rules``) before the next is read, so no batch is
+        kept once it is done. After each step ``on_progress(stage, **counts)`` is called with the cumulative
+        ``rows_fetched``, ``rows_embedded`` and ``rows_upserted``; an exception raised by it (such as
+        a cancellation) stops ingestion at that batch boundary.
+        """
+        report_progress: Callable[..., Any] = on_progress or (lambda stage, **details: None)
+        batch_size = max(1, batch_size or self.batch_size)
         # Initialize the collection only when ingestion runs so API startup is not blocked.
         self.vdb.init_collection()
+        # Point ids are per row index; drop leftovers from an earlier or interrupted run of this version.
+        self.vdb.delete_version(dataset_id, version)
 
         required_fields = {"image_url", "caption", "source_id"}
-        processed_items = []
-        image_urls = []
-        captions = []
-
-        for index, data in enumerate(raw_data):
-            missing_fields = [
-                field for field in required_fields if field not in data or data[field] is None
-            ]
-            if missing_fields:
-                raise ValueError(
-                    f"raw_data[{index}] is missing required fields: {', '.join(sorted(missing_fields))}"
-                )
+        evaluation = self.ingestor.start_l1(rules)
+        counts = {"rows_fetched": 0, "rows_embedded": 0, "rows_upserted": 0, "fallback_rows": 0}
+        rows = iter(raw_data)
 
-            image_urls.append(str(data["image_url"]))
-            captions.append(str(data["caption"]))
-            processed_items.append(dict(data))
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            start_index = counts["rows_fetched"]
 
-        embedding_items = self.embedder.generate_embeddings_with_metadata(
-            image_urls=image_urls,
-            captions=captions,
-        )
-        if len(embedding_items) != len(processed_items):
-            raise RuntimeError("Embedding count does not match raw_data length")
+            for offset, data in enumerate(batch):
+                missing_fields = [
+                    field for field in required_fields if field not in data or data[field] is None
+                ]
+                if missing_fields:
+                    raise ValueError(
+                        f"raw_data[{start_index + offset}] is missing required fields: {', '.join(sorted(missing_fields))}"
+                    )
+            items = [dict(data) for data in batch]
+            counts["rows_fetched"] += len(items)
+            report_progress("fetched", **counts)
+
+            embedding_items = self.embedder.generate_embeddings_with_metadata(
+                image_urls=[str(item["image_url"]) for item in items],
+                captions=[str(item["caption"]) for item in items],
+            )
+            if len(embedding_items) != len(items):
+                raise RuntimeError("Embedding count does not match raw_data length")
 
-        for i, embedding_item in enumerate(embedding_items):
-            processed_items[i]["embedding"] = embedding_item["embedding"]
-            processed_items[i]["image_fetch_status"] = embedding_item["image_fetch_status"]
-            processed_items[i]["fallback_used"] = embedding_item["fallback_used"]
+            for item, embedding_item in zip(items, embedding_items):
+                item["embedding"] = embedding_item["embedding"]
+                item["image_fetch_status"] = embedding_item["image_fetch_status"]
+                item["fallback_used"] = embedding_item["fallback_used"]
+            counts["rows_embedded"] += len(items)
+            counts["fallback_rows"] += sum(1 for item in items if item["fallback_used"])
+            report_progress("embedded", **counts)
+
+            await self.vdb.upsert_dataset(dataset_id, version, items, start_index=start_index)
+            counts["rows_upserted"] += len(items)
+            # Earlier batches are already upserted, so each row still sees every earlier row.
+            evaluation.add_near_duplicates(
+                self.vdb.find_near_duplicates(
+                    dataset_id,
+                    version,
+                    [item["embedding"] for item in items],
+                    parent_version=parent_version,
+                    threshold=self.near_duplicate_threshold,
+                    start_index=start_index,
+                )
+            )
+            evaluation.observe(items)
+            report_progress("upserted", **counts)
 
-        await self.vdb.upsert_dataset(dataset_id, version, processed_items)
-        return True
+        return evaluation.report()
@@ -0,0 +1,201 @@
+import logging
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from api.services.vector_db import QdrantService
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VersionSample:
+    mean: np.ndarray
+    vectors: np.ndarray
+    coords: np.ndarray
+    metadata: List[Dict[str, Any]]
+    total_points: int
+
+
+@dataclass
+class DatasetProjection:
+    center: np.ndarray
+    components: np.ndarray
+    explained_variance_ratio: List[float]
+    versions: Dict[str, VersionSample] = field(default_factory=dict)
+
+
+class ProjectionService:
+    """2D PCA view of a dataset's embeddings, fitted once per dataset on a bounded sample.
+
+    Each version is streamed once: a reservoir keeps at most ``point_budget`` points while the
+    exact version mean is accumulated alongside. Coordinates stay cached until ``invalidate``.
+    """
+
+    def __init__(self, vdb: QdrantService, point_budget: Optional[int] = None, seed: int = 0):
+        self.vdb = vdb
+        self.point_budget = point_budget or int(os.getenv("PROJECTION_POINT_BUDGET", "2000"))
+        self.seed = seed
+        self._cache: Dict[str, DatasetProjection] = {}
+
+    def invalidate(self, dataset_id: str) -> None:
+        if self._cache.pop(dataset_id, None) is not None:
+            logger.info("Projection cache invalidated for %s", dataset_id)
+
+    def _sample_version(self, dataset_id: str, version: str) -> Optional[Dict[str, Any]]:
+        rng = random.Random(f"{self.seed}:{dataset_id}:{version}")
+        reservoir_vectors: List[List[float]] = []
+        reservoir_meta: List[Dict[str, Any]] = []
+        vector_sum: Optional[np.ndarray] = None
+        seen = 0
+
+        for point in self.vdb.iter_points(dataset_id, version, with_payload=True):
+            vector = self.vdb._extract_vector(point)
+            if vector is None:
+                continue
+            if vector_sum is None:
+                vector_sum = np.zeros(len(vector), dtype=np.float64)
+            elif len(vector) != vector_sum.shape[0]:
+                continue
+
+            vector_sum += vector
+            payload = point.payload or {}
+            meta = {
+                "row_index": payload.get("row_index"),
+                "image_url": payload.get("image_url"),
+                "caption": payload.get("caption"),
+                "source_id": payload.get("source_id"),
+                "fallback_used": bool(payload.get("fallback_used", False)),
+            }
+
+            if seen < self.point_budget:
+                reservoir_vectors.append(vector)
+                reservoir_meta.append(meta)
+            else:
+                slot = rng.randint(0, seen)
+                if slot < self.point_budget:
+                    reservoir_vectors[slot] = vector
+                    reservoir_meta[slot] = meta
+            seen += 1
+
+        if not seen:
+            return None
+
+        # Shuffle once so any prefix of the reservoir is itself a uniform subsample.
+        order = list(range(len(reservoir_vectors)))
+        rng.shuffle(order)
+        return {
+            "mean": (vector_sum / seen).astype(np.float32),
+            "vectors": np.asarray([reservoir_vectors[i] for i in order], dtype=np.float32),
+            "metadata": [reservoir_meta[i] for i in order],
+            "total_points": seen,
+        }
+
+    @staticmethod
+    def _fit_pca(samples: Sequence[np.ndarray]) -> Dict[str, Any]:
+        stacked = np.concatenate(samples, axis=0).astype(np.float64)
+        center = stacked.mean(axis=0)
+        centered = stacked - center
+        covariance = centered.T @ centered / max(1, stacked.shape[0] - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        top = np.argsort(eigenvalues)[::-1][:2]
+        components = eigenvectors[:, top].T
+        if components.shape[0] < 2:
+            components = np.vstack([components, np.zeros((2 - components.shape[0], stacked.shape[1]))])
+        total_variance = float(eigenvalues.clip(min=0).sum())
+        ratios = [float(max(eigenvalues[i], 0.0) / total_variance) if total_variance > 0 else 0.0 for i in top]
+        return {
+            "center": center.astype(np.float32),
+            "components": components.astype(np.float32),
+            "explained_variance_ratio": ratios,
+        }
+
+    def _get_projection(self, dataset_id: str, versions: Sequence[str]) -> Optional[DatasetProjection]:
+        cached = self._cache.get(dataset_id)
+        missing = [v for v in versions if cached is None or v not in cached.versions]
+        sampled = {v: s for v in missing if (s := self._sample_version(dataset_id, v)) is not None}
+
+        if cached is None:
+            if not sampled:
+                return None
+            fit = self._fit_pca([s["vectors"] for s in sampled.values()])
+            cached = DatasetProjection(**fit)
+            self._cache[dataset_id] = cached
+
+        for version, sample in sampled.items():
+            if sample["vectors"].shape[1] != cached.center.shape[0]:
+                logger.warning("Skipping %s:%s projection due to vector dimension mismatch", dataset_id, version)
+                continue
+            coords = (sample["vectors"] - cached.center) @ cached.components.T
+            cached.versions[version] = VersionSample(coords=coords, **sample)
+
+        return cached
+
+    @staticmethod
+    def _cosine_distances(vectors: np.ndarray, target: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1) * float(np.linalg.norm(target))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = (vectors @ target) / norms
+        similarity = np.where(np.isfinite(similarity), np.clip(similarity, -1.0, 1.0), 0.0)
+        return np.where(norms > 0, 1.0 - similarity, 1.0)
+
+    def project(
+        self,
+        dataset_id: str,
+        baseline_version: str,
+        version: str,
+        max_points: Optional[int] = None,
+        outlier_limit: int = 10,
+    ) -> Optional[Dict[str, Any]]:
+        budget = min(max_points or self.point_budget, self.point_budget)
+        projection = self._get_projection(dataset_id, [baseline_version, version])
+        if projection is None or baseline_version not in projection.versions or version not in projection.versions:
+            return None
+
+        baseline = projection.versions[baseline_version]
+        target = projection.versions[version]
+        per_version = {baseline_version: budget // 2, version: budget - budget // 2}
+
+        target_count = min(per_version[version], len(target.metadata))
+        dist_to_baseline = self._cosine_distances(target.vectors[:target_count], baseline.mean)
+        dist_to_target = self._cosine_distances(target.vectors[:target_count], target.mean)
+        scores = 0.5 * dist_to_baseline + 0.5 * dist_to_target
+        outliers = set(np.argsort(-scores)[: max(0, outlier_limit)].tolist())
+
+        points: List[Dict[str, Any]] = []
+        for name, sample in ((baseline_version, baseline), (version, target)):
+            count = min(per_version[name], len(sample.metadata))
+            for i in range(count):
+                point = {
+                    "x": float(sample.coords[i, 0]),
+                    "y": float(sample.coords[i, 1]),
+                    "version": name,
+                    **sample.metadata[i],
+                }
+                if sample is target:
+                    point.update(
+                        {
+                            "dist_to_v1_mean": float(dist_to_baseline[i]),
+                            "dist_to_v2_mean": float(dist_to_target[i]),
+                            "outlier_score": float(scores[i]),
+                            "is_outlier": i in outliers,
+                        }
+                    )
+                else:
+                    point["is_outlier"] = False
+                points.append(point)
+
+        return {
+            "dataset_id": dataset_id,
+            "method": "pca",
+            "baseline_version": baseline_version,
+            "version": version,
+            "explained_variance_ratio": projection.explained_variance_ratio,
+            "point_budget": budget,
+            "total_points": {baseline_version: baseline.total_points, version: target.total_points},
+            "points": points,
+        }
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from api.models import L2Reasoning
+
+
+SYSTEM_PROMPT = (
+    "You are a VLM dataset auditor. Review image-text samples and drift statistics, then decide alignment "
+    "status. Samples are either the statistically most-outlying samples (lowest similarity cohort) or "
+    "representative medoids of the clusters that shifted most against the baseline; cluster sizes and "
+    "baseline shifts are then listed under CLUSTERS. Assess whether these samples also indicate semantic "
+    "misalignment. Tables are pipe-separated with a header row. When a sample's image is attached inline it "
+    "follows an 'IMAGE <image_url>' label; judge the attached pixels rather than fetching the URL. Put the "
+    "image_url of each flagged sample in flagged_samples. Return strict JSON that matches the provided schema."
+)
+
+# Fields the API sets itself; the model must not be asked to produce them.
+SERVER_ONLY_FIELDS = ("cache_hit", "cached_at")
+
+# Numeric context columns, in display order, that are included when any sample carries them.
+CONTEXT_COLUMNS = (
+    "outlier_score",
+    "dist_to_v1_mean",
+    "dist_to_v2_mean",
+    "cluster_id",
+    "cluster_size",
+    "centroid_similarity",
+)
+
+
+@lru_cache(maxsize=1)
+def response_schema() -> Dict[str, Any]:
+    schema = L2Reasoning.model_json_schema()
+    for name in SERVER_ONLY_FIELDS:
+        schema.get("properties", {}).pop(name, None)
+        if name in schema.get("required", []):
+            schema["required"].remove(name)
+    return schema
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    estimated_tokens: int
+    samples_included: int
+    samples_dropped: int
+    duplicates_removed: int
+    image_urls: List[str]
+
+
+class PromptBuilder:
+    """Compact, token-budgeted user prompt for the L2 audit.
+
+    Drift stats and cluster summaries are always included; sample rows are added in ranking
+    order until the budget is exhausted. Token counts are estimated at ~4 characters per token.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        max_caption_chars: int = 200,
+        chars_per_token: float = 4.0,
+    ):
+        self.token_budget = token_budget or int(os.getenv("GEMINI_PROMPT_TOKEN_BUDGET", "2000"))
+        self.max_caption_chars = max_caption_chars
+        self.chars_per_token = chars_per_token
+
+    def estimate_tokens(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token) + 1
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        if value is None:
+            return "-"
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return re.sub(r"\s+", " ", str(value)).replace("|", "/").strip()
+
+    def _clip(self, text: str) -> str:
+        text = re.sub(r"\s+", " ", text).strip()
+        if len(text) > self.max_caption_chars:
+            return text[: self.max_caption_chars - 1] + "…"
+        return text
+
+    def _table(self, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[str]:
+        lines = ["|".join(columns)]
+        lines.extend("|".join(self._format_value(value) for value in row) for row in rows)
+        return lines
+
+    def _dedupe_samples(
+        self,
+        sample_images: Sequence[str],
+        sample_captions: Sequence[str],
+        outlier_context: Optional[Sequence[Dict[str, Any]]],
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        if outlier_context:
+            candidates = [dict(item) for item in outlier_context]
+        else:
+            candidates = [
+                {"image_url": image, "caption": caption}
+                for image, caption in zip(sample_images, sample_captions)
+            ]
+
+        seen = set()
+        unique: List[Dict[str, Any]] = []
+        for item in candidates:
+            key = (str(item.get("image_url")).strip(), re.sub(r"\s+", " ", str(item.get("caption"))).strip().casefold())
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(item)
+        return unique, len(candidates) - len(unique)
+
+    def build(
+        self,
+        drift_data: Dict[str, float],
+        sample_images: Sequence[str],
+        sample_captions: Sequence[str],
+        outlier_context: Optional[Sequence[Dict[str, Any]]] = None,
+        cluster_context: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> BuiltPrompt:
+        lines = ["DRIFT " + json.dumps({k: round(float(v), 4) for k, v in drift_data.items()}, separators=(",", ":"))]
+
+        if cluster_context:
+            cluster_columns = ("cluster_id", "size", "share", "baseline_shift")
+            lines.append("CLUSTERS")
+            lines.extend(self._table(cluster_columns, [[c.get(col) for col in cluster_columns] for c in cluster_context]))
+
+        samples, duplicates_removed = self._dedupe_samples(sample_images, sample_captions, outlier_context)
+        context_columns = [col for col in CONTEXT_COLUMNS if any(s.get(col) is not None for s in samples)]
+        sample_columns = ["image_url", "caption", *context_columns]
+
+        header = self._table(sample_columns, [])
+        lines.append("SAMPLES")
+        lines.extend(header)
+        used_tokens = self.estimate_tokens("\n".join(lines))
+
+        included = 0
+        image_urls: List[str] = []
+        for sample in samples:
+            row = [sample.get("image_url"), self._clip(str(sample.get("caption", "")))]
+            row.extend(sample.get(col) for col in context_columns)
+            line = self._table(sample_columns, [row])[1]
+            line_tokens = self.estimate_tokens(line)
+            # Always keep at least one sample so the model has something to judge.
+            if included and used_tokens + line_tokens > self.token_budget:
+                break
+            lines.append(line)
+            used_tokens += line_tokens
+            included += 1
+            if sample.get("image_url"):
+                image_urls.append(str(sample["image_url"]))
+
+        dropped = len(samples) - included
+        if dropped:
+            lines.append(f"({dropped} lower-ranked samples omitted for budget)")
+
+        text = "\n".join(lines)
+        return BuiltPrompt(
+            text=text,
+            estimated_tokens=self.estimate_tokens(text),
+            samples_included=included,
+            samples_dropped=dropped,
+            duplicates_removed=duplicates_removed,
+            image_urls=image_urls,
+        )
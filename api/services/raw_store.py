@@ -0,0 +1,230 @@
+import json
+import logging
+import os
+import time
+import uuid
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from api.models import ManifestSource
+from api.services.blob_store import BlobStore
+
+
+logger = logging.getLogger(__name__)
+
+RAW_DATA_NAMESPACE = "raw"
+# Versions ingested in place from a manifest file keep a reference to it here instead of rows.
+MANIFEST_NAMESPACE = "manifests"
+# Sits next to a version's raw file while an upload is still appending to it.
+UPLOAD_MARKER_SUFFIX = ".uploading"
+UPLOAD_ABORTED = "aborted"
+
+
+class UploadAborted(ValueError):
+    """The rows of a streamed upload stop short: the client failed or disconnected mid-upload."""
+
+
+class RawUpload:
+    """Appends rows to a version's raw file while ingestion may already be reading it.
+
+    Rows are flushed by ``write``, so a reader following the file (``RawDataStore.iter_rows``)
+    sees them straight away. ``finish`` marks the file complete and ``abort`` marks it unusable.
+    """
+
+    def __init__(self, path: str, marker_path: str):
+        self.path = path
+        self.marker_path = marker_path
+        self.rows = 0
+        self._handle: Optional[IO[str]] = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Append rows and flush; returns how many were written."""
+        written = 0
+        for row in rows:
+            self._handle.write(json.dumps(row, default=str, separators=(",", ":")))
+            self._handle.write("\n")
+            written += 1
+        self._handle.flush()
+        self.rows += written
+        return written
+
+    def finish(self) -> None:
+        self._close()
+        os.remove(self.marker_path)
+
+    def abort(self) -> None:
+        self._close()
+        with open(self.marker_path, "w", encoding="utf-8") as marker:
+            marker.write(UPLOAD_ABORTED)
+
+    def _close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class RawDataStore:
+    """Submitted raw rows per dataset version, kept as JSON Lines in the blob store.
+
+    Ingestion jobs read their input from here rather than from the request, so queued jobs
+    survive a restart and re-ingestion can replay exactly what was submitted. A version imported
+    from a manifest file stores the ``ManifestSource`` instead, and is re-read from the file.
+    """
+
+    def __init__(
+        self,
+        blob_store: Optional[BlobStore] = None,
+        poll_interval_sec: float = 0.05,
+        upload_stall_timeout_sec: Optional[float] = None,
+    ):
+        self.blob_store = blob_store or BlobStore()
+        self.poll_interval_sec = poll_interval_sec
+        # A reader following an upload gives up after this long without new rows (e.g. the writer died).
+        self.upload_stall_timeout_sec = (
+            upload_stall_timeout_sec
+            if upload_stall_timeout_sec is not None
+            else float(os.getenv("UPLOAD_STALL_TIMEOUT_SEC", "300"))
+        )
+
+    @staticmethod
+    def _key(dataset_id: str, version: str) -> str:
+        return BlobStore.key_for(f"{dataset_id}:{version}")
+
+    def path(self, dataset_id: str, version: str) -> str:
+        return self.blob_store.path(RAW_DATA_NAMESPACE, self._key(dataset_id, version))
+
+    def exists(self, dataset_id: str, version: str) -> bool:
+        """Whether the version has raw data that is, or will be, complete (aborted uploads do not count)."""
+        if self.blob_store.exists(MANIFEST_NAMESPACE, self._key(dataset_id, version)):
+            return True
+        if not self.blob_store.exists(RAW_DATA_NAMESPACE, self._key(dataset_id, version)):
+            return False
+        return self._upload_state(self.path(dataset_id, version)) != UPLOAD_ABORTED
+
+    @staticmethod
+    def _upload_state(path: str) -> Optional[str]:
+        """None once the file is complete, otherwise the marker contents ("" while uploading)."""
+        try:
+            with open(path + UPLOAD_MARKER_SUFFIX, "r", encoding="utf-8") as marker:
+                return marker.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def save_manifest(self, dataset_id: str, version: str, manifest: ManifestSource) -> None:
+        """Make a manifest file the version's raw data, replacing any stored rows."""
+        self.delete(dataset_id, version)
+        self.blob_store.put(MANIFEST_NAMESPACE, self._key(dataset_id, version), manifest.model_dump_json().encode("utf-8"))
+
+    def manifest(self, dataset_id: str, version: str) -> Optional[ManifestSource]:
+        """The manifest the version was imported from, or None if its rows are stored here."""
+        data = self.blob_store.get(MANIFEST_NAMESPACE, self._key(dataset_id, version))
+        return ManifestSource.model_validate_json(data) if data is not None else None
+
+    def open_upload(self, dataset_id: str, version: str) -> RawUpload:
+        """Start the version's raw file for rows that arrive over time, replacing any previous copy."""
+        self.blob_store.delete(MANIFEST_NAMESPACE, self._key(dataset_id, version))
+        path = self.path(dataset_id, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Marker first, so a reader never takes a partial file for a complete one.
+        with open(path + UPLOAD_MARKER_SUFFIX, "w", encoding="utf-8"):
+            pass
+        return RawUpload(path, path + UPLOAD_MARKER_SUFFIX)
+
+    def stage(self, rows: Iterable[Dict[str, Any]]) -> Tuple[str, int]:
+        """Spill rows to a staging file one line at a time; returns its path and the row count.
+
+        The file is removed if ``rows`` raises. Use ``commit`` to attach it to a version or
+        ``discard`` to drop it.
+        """
+        staging_dir = os.path.join(self.blob_store.root, RAW_DATA_NAMESPACE, "staging")
+        os.makedirs(staging_dir, exist_ok=True)
+        path = os.path.join(staging_dir, f"{uuid.uuid4().hex}.jsonl")
+        count = 0
+        try:
+            with open(path, "w", encoding="utf-8") as handle:
+                for row in rows:
+                    handle.write(json.dumps(row, default=str, separators=(",", ":")))
+                    handle.write("\n")
+                    count += 1
+        except BaseException:
+            self.discard(path)
+            raise
+        return path, count
+
+    def commit(self, staged_path: str, dataset_id: str, version: str) -> None:
+        """Atomically make a staged file the stored raw data of a version, replacing any previous copy."""
+        path = self.path(dataset_id, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged_path, path)
+        self.blob_store.delete(MANIFEST_NAMESPACE, self._key(dataset_id, version))
+        try:
+            os.remove(path + UPLOAD_MARKER_SUFFIX)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def discard(staged_path: str) -> None:
+        try:
+            os.remove(staged_path)
+        except FileNotFoundError:
+            pass
+
+    def save(self, dataset_id: str, version: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Store rows for a version; returns the row count."""
+        staged_path, count = self.stage(rows)
+        self.commit(staged_path, dataset_id, version)
+        return count
+
+    def count_rows(self, dataset_id: str, version: str) -> int:
+        count = 0
+        with open(self.path(dataset_id, version), "rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                count += block.count(b"\n")
+        return count
+
+    def iter_rows(self, dataset_id: str, version: str) -> Iterator[Dict[str, Any]]:
+        """Stream stored rows without loading the whole file; raises FileNotFoundError if absent.
+
+        While an upload to the version is in progress, follows the file as it grows and ends
+        when the upload finishes; raises ``UploadAborted`` if it is aborted or stalls.
+        """
+        path = self.path(dataset_id, version)
+        with open(path, "r", encoding="utf-8") as handle:
+            partial = ""
+            idle_since: Optional[float] = None
+            while True:
+                line = handle.readline()
+                if line:
+                    idle_since = None
+                    if not line.endswith("\n"):
+                        # The writer is mid-line; wait for the rest.
+                        partial += line
+                        continue
+                    line, partial = partial + line, ""
+                    if line.strip():
+                        yield json.loads(line)
+                    continue
+
+                state = self._upload_state(path)
+                if state is None:
+                    # Complete; rows written between the last read and the marker's removal are still unread.
+                    for line in (partial + handle.read()).splitlines():
+                        if line.strip():
+                            yield json.loads(line)
+                    return
+                if state == UPLOAD_ABORTED:
+                    raise UploadAborted(f"Upload of {dataset_id}:{version} was aborted")
+                now = time.monotonic()
+                idle_since = idle_since or now
+                if now - idle_since > self.upload_stall_timeout_sec:
+                    raise UploadAborted(
+                        f"Upload of {dataset_id}:{version} stalled for {self.upload_stall_timeout_sec:.0f}s"
+                    )
+                time.sleep(self.poll_interval_sec)
+
+    def delete(self, dataset_id: str, version: str) -> None:
+        self.blob_store.delete(RAW_DATA_NAMESPACE, self._key(dataset_id, version))
+        self.blob_store.delete(MANIFEST_NAMESPACE, self._key(dataset_id, version))
+        try:
+            os.remove(self.path(dataset_id, version) + UPLOAD_MARKER_SUFFIX)
+        except FileNotFoundError:
+            pass
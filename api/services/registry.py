@@ -0,0 +1,626 @@
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from api.models import DatasetObject, L1Rules, StatusHistoryItem
+from api.services import sqlite_db
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    key TEXT PRIMARY KEY,
+    dataset_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    status TEXT NOT NULL,
+    status_source TEXT,
+    has_l2 INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    created_ts REAL NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_dataset_created ON datasets (dataset_id, created_ts);
+CREATE INDEX IF NOT EXISTS idx_datasets_status ON datasets (status);
+CREATE INDEX IF NOT EXISTS idx_datasets_created ON datasets (created_ts);
+CREATE TABLE IF NOT EXISTS registry_changes (
+    revision INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    dataset_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    status TEXT,
+    source TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_dataset ON registry_changes (dataset_id, revision);
+CREATE TABLE IF NOT EXISTS status_history_archive (
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (key, seq)
+);
+CREATE TABLE IF NOT EXISTS l1_rules (
+    dataset_id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS registry_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO datasets (key, dataset_id, version, status, status_source, has_l2, created_at, created_ts, doc)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    status = excluded.status,
+    status_source = excluded.status_source,
+    has_l2 = excluded.has_l2,
+    created_at = excluded.created_at,
+    created_ts = excluded.created_ts,
+    doc = excluded.doc
+"""
+
+_ROW_COLUMNS = "key, dataset_id, version, status, status_source, created_at, created_ts"
+
+# Columns that callers may filter on in find(); values are bound as parameters.
+_FILTER_COLUMNS = ("dataset_id", "version", "status", "status_source", "has_l2")
+
+
+def registry_key(dataset_id: str, version: str) -> str:
+    return f"{dataset_id}:{version}"
+
+
+def _enum_value(value: Any) -> str:
+    # Status fields hold plain strings after validation but enum members after direct assignment.
+    return str(getattr(value, "value", value))
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class DatasetRegistry:
+    """SQLite-backed (WAL) dataset version registry with a write-through identity map.
+
+    Behaves like the ``Dict[str, DatasetObject]`` it replaces (``get``, ``[]``, ``in``,
+    ``values``), but objects are only deserialized when first accessed, filtered lookups use
+    indexed columns, and dashboard summaries come from incrementally maintained aggregates. Callers mutate the returned objects in place and
+    persist them with ``save``; ``apply_status`` calls ``record_transition`` for every status change.
+
+    The database file may be shared by several API processes. Every write appends to a change
+    log in the same transaction, and reads first replay entries committed by other processes
+    (detected cheaply with ``PRAGMA data_version``) into the identity map and aggregates. The
+    log's revision numbers double as the change counters behind ``etag``, so validators agree
+    across processes and restarts.
+
+    Each version keeps at most ``history_limit`` status history items inline; older items move to
+    an archive table on write and are read back page by page with ``status_history``.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        recent_limit: int = 50,
+        change_log_limit: int = 10000,
+        history_limit: Optional[int] = None,
+    ):
+        self.recent_limit = recent_limit
+        self.change_log_limit = change_log_limit
+        # 0 keeps every item inline.
+        self.history_limit = (
+            history_limit if history_limit is not None else int(os.getenv("STATUS_HISTORY_INLINE_LIMIT", "100"))
+        )
+        self.db_path = db_path or os.getenv(
+            "REGISTRY_DB_PATH",
+            os.path.join(os.getenv("ALIGNOPS_DATA_DIR", "data"), "registry.db"),
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._objects: Dict[str, DatasetObject] = {}
+        self._aggregates: Optional[RegistryAggregates] = None
+        # Identifies the database file, so validators from a recreated database never match.
+        self._epoch = ""
+        self._revision = 0
+        self._dataset_revisions: Dict[str, int] = {}
+        self._data_version: Optional[int] = None
+
+    # ------------------------------------------------------------ connection
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use so importing the API does not touch the filesystem.
+        if self._conn is None:
+            conn = sqlite_db.connect(self.db_path)
+            conn.executescript(_SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO registry_meta (name, value) VALUES ('epoch', ?)", (format(time.time_ns(), "x"),)
+            )
+            self._conn = conn
+            self._load_revisions()
+        return self._conn
+
+    def _load_revisions(self) -> None:
+        conn = self._conn
+        self._epoch = conn.execute("SELECT value FROM registry_meta WHERE name = 'epoch'").fetchone()[0]
+        self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        self._revision = conn.execute("SELECT COALESCE(MAX(revision), 0) FROM registry_changes").fetchone()[0]
+        self._dataset_revisions = {
+            row[0]: row[1]
+            for row in conn.execute("SELECT dataset_id, MAX(revision) FROM registry_changes GROUP BY dataset_id")
+        }
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._objects.clear()
+            self._aggregates = None
+
+    # ------------------------------------------------------------ writes
+
+    def _log(self, conn: sqlite3.Connection, key: str, dataset_id: str, version: str, item: Optional[StatusHistoryItem]) -> int:
+        transition = (
+            (_enum_value(item.status), item.source, _as_utc(item.timestamp).isoformat()) if item else (None, None, None)
+        )
+        cursor = conn.execute(
+            "INSERT INTO registry_changes (key, dataset_id, version, status, source, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, dataset_id, version, *transition),
+        )
+        return cursor.lastrowid
+
+    def _archive_overflow(self, conn: sqlite3.Connection, key: str, ds: DatasetObject) -> int:
+        """Copy the history items beyond ``history_limit`` to the archive; returns how many to drop inline."""
+        overflow = len(ds.status_history) - self.history_limit
+        if self.history_limit <= 0 or overflow <= 0:
+            return 0
+        conn.executemany(
+            "INSERT OR REPLACE INTO status_history_archive (key, seq, doc) VALUES (?, ?, ?)",
+            [
+                (key, ds.status_history_archived + offset, item.model_dump_json())
+                for offset, item in enumerate(ds.status_history[:overflow])
+            ],
+        )
+        return overflow
+
+    def _write(self, ds: DatasetObject, item: Optional[StatusHistoryItem] = None) -> None:
+        key = registry_key(ds.dataset_id, ds.version)
+        created_at = _as_utc(ds.created_at)
+        with self._lock:
+            conn = self._connection()
+            with sqlite_db.write_transaction(conn):
+                archived = self._archive_overflow(conn, key, ds)
+                doc = ds
+                if archived:
+                    doc = ds.model_copy(
+                        update={
+                            "status_history": ds.status_history[archived:],
+                            "status_history_archived": ds.status_history_archived + archived,
+                        }
+                    )
+                conn.execute(
+                    _UPSERT,
+                    (
+                        key,
+                        ds.dataset_id,
+                        ds.version,
+                        _enum_value(ds.status),
+                        ds.status_source,
+                        int(ds.l2_reasoning is not None),
+                        created_at.isoformat(),
+                        created_at.timestamp(),
+                        doc.model_dump_json(),
+                    ),
+                )
+                revision = self._log(conn, key, ds.dataset_id, ds.version, item)
+            if archived:
+                # Only once committed, so a failed write leaves the caller's object whole.
+                del ds.status_history[:archived]
+                ds.status_history_archived += archived
+            self._objects[key] = ds
+            self._sync(own_revision=revision)
+            if revision % 1000 == 0:
+                self._prune_changes(revision)
+
+    def save(self, ds: DatasetObject) -> None:
+        self._write(ds)
+
+    def __setitem__(self, key: str, ds: DatasetObject) -> None:
+        if key != registry_key(ds.dataset_id, ds.version):
+            raise KeyError(f"Registry key {key!r} does not match {ds.dataset_id}:{ds.version}")
+        self.save(ds)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            with sqlite_db.write_transaction(conn):
+                row = conn.execute("SELECT dataset_id, version FROM datasets WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return
+                conn.execute("DELETE FROM datasets WHERE key = ?", (key,))
+                conn.execute("DELETE FROM status_history_archive WHERE key = ?", (key,))
+                self._log(conn, key, row["dataset_id"], row["version"], None)
+            self._sync(force=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            with sqlite_db.write_transaction(conn):
+                conn.execute(
+                    "INSERT INTO registry_changes (key, dataset_id, version) SELECT key, dataset_id, version FROM datasets"
+                )
+                conn.execute("DELETE FROM datasets")
+                conn.execute("DELETE FROM status_history_archive")
+            self._sync(force=True)
+
+    # ------------------------------------------------------------ change log
+
+    def _sync(self, own_revision: Optional[int] = None, force: bool = False) -> None:
+        """Replay change-log entries written since the last sync, by any process, in revision order.
+
+        ``own_revision`` is a write this process just made with its object already in the identity map.
+        """
+        conn = self._connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if own_revision is None and not force and data_version == self._data_version:
+            return
+        self._data_version = data_version
+
+        pruned_through = conn.execute("SELECT value FROM registry_meta WHERE name = 'pruned_through'").fetchone()
+        if pruned_through is not None and int(pruned_through[0]) > self._revision:
+            # Too far behind to replay: start again from the table itself.
+            logger.info("Registry change log pruned past revision %d; reloading", self._revision)
+            self._objects.clear()
+            self._aggregates = None
+            self._load_revisions()
+            return
+
+        changes = conn.execute(
+            "SELECT revision, key, dataset_id, version, status, source, timestamp FROM registry_changes "
+            "WHERE revision > ? ORDER BY revision",
+            (self._revision,),
+        ).fetchall()
+        if not changes:
+            return
+
+        last_writer: Dict[str, int] = {}
+        for change in changes:
+            self._revision = change["revision"]
+            self._dataset_revisions[change["dataset_id"]] = change["revision"]
+            last_writer[change["key"]] = change["revision"]
+        for key, revision in last_writer.items():
+            if revision != own_revision:
+                self._objects.pop(key, None)
+
+        if self._aggregates is not None:
+            keys = list(last_writer)
+            found = set()
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for row in conn.execute(f"SELECT {_ROW_COLUMNS} FROM datasets WHERE key IN ({placeholders})", batch):
+                    self._aggregates.upsert(row["key"], _VersionRow.from_row(row))
+                    found.add(row["key"])
+            for key in keys:
+                if key not in found:
+                    self._aggregates.remove(key)
+            for change in changes:
+                if change["status"] is not None:
+                    self._aggregates.record(_activity(change))
+
+    def _prune_changes(self, revision: int) -> None:
+        """Drop old log entries, keeping each dataset's newest one so its revision survives."""
+        threshold = revision - self.change_log_limit
+        if threshold <= 0:
+            return
+        conn = self._connection()
+        with sqlite_db.write_transaction(conn):
+            conn.execute(
+                "DELETE FROM registry_changes WHERE revision <= ? "
+                "AND revision NOT IN (SELECT MAX(revision) FROM registry_changes GROUP BY dataset_id)",
+                (threshold,),
+            )
+            conn.execute(
+                "INSERT INTO registry_meta (name, value) VALUES ('pruned_through', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                (str(threshold),),
+            )
+
+    def revision(self, dataset_id: Optional[str] = None) -> int:
+        """Global change counter, or the counter value at the dataset's last write."""
+        with self._lock:
+            self._sync()
+            if dataset_id is None:
+                return self._revision
+            return self._dataset_revisions.get(dataset_id, 0)
+
+    def etag(self, dataset_id: Optional[str] = None) -> str:
+        """Weak validator for a view of the whole registry or of one dataset."""
+        revision = self.revision(dataset_id)
+        return f'W/"{self._epoch}-{revision}"'
+
+# ------------------------------------------------------------ reads
+
+    def _materialize(self, row: sqlite3.Row) -> DatasetObject:
+        ds = self._objects.get(row["key"])
+        if ds is None:
+            ds = DatasetObject.model_validate_json(row["doc"])
+            self._objects[row["key"]] = ds
+        return ds
+
+    def get(self, key: str, default: Optional[DatasetObject] = None) -> Optional[DatasetObject]:
+        with self._lock:
+            self._sync()
+            ds = self._objects.get(key)
+            if ds is not None:
+                return ds
+            rows = self._execute("SELECT key, doc FROM datasets WHERE key = ?", (key,))
+            return self._materialize(rows[0]) if rows else default
+
+    def __getitem__(self, key: str) -> DatasetObject:
+        ds = self.get(key)
+        if ds is None:
+            raise KeyError(key)
+        return ds
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        with self._lock:
+            self._sync()
+            if key in self._objects:
+                return True
+        return bool(self._execute("SELECT 1 FROM datasets WHERE key = ?", (key,)))
+
+    def __len__(self) -> int:
+        return int(self._execute("SELECT COUNT(*) FROM datasets")[0][0])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([row["key"] for row in self._execute("SELECT key FROM datasets ORDER BY created_ts")])
+
+    def keys(self) -> List[str]:
+        return list(self)
+
+    def values(self) -> List[DatasetObject]:
+        with self._lock:
+            self._sync()
+            rows = self._execute("SELECT key, doc FROM datasets ORDER BY created_ts")
+            return [self._materialize(row) for row in rows]
+
+    def find(self, **filters: Any) -> List[DatasetObject]:
+        """Versions matching equality filters on indexed columns, oldest first."""
+        unknown = set(filters) - set(_FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unsupported registry filters: {sorted(unknown)}")
+        where = " AND ".join(f"{column} = ?" for column in filters) or "1 = 1"
+        params = tuple(int(v) if isinstance(v, bool) else _enum_value(v) for v in filters.values())
+        with self._lock:
+            self._sync()
+            rows = self._execute(f"SELECT key, doc FROM datasets WHERE {where} ORDER BY created_ts", params)
+            return [self._materialize(row) for row in rows]
+
+    def list_versions(self, dataset_id: str) -> List[DatasetObject]:
+        return self.find(dataset_id=dataset_id)
+
+    def status_history(self, key: str, offset: int = 0, limit: int = 50) -> Optional[Tuple[int, List[StatusHistoryItem]]]:
+        """A page of a version's full status history, newest first, with the total item count.
+
+        Returns None if the version does not exist. Inline items come from the object; only
+        the archived part of the page is read from the archive table.
+        """
+        with self._lock:
+            ds = self.get(key)
+            if ds is None:
+                return None
+            archived = ds.status_history_archived
+            inline = list(ds.status_history)
+            total = archived + len(inline)
+            stop = max(0, total - offset)
+            start = max(0, stop - limit)
+            items = inline[max(0, start - archived) : max(0, stop - archived)]
+            if start < archived:
+                rows = self._execute(
+                    "SELECT doc FROM status_history_archive WHERE key = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                    (key, start, min(stop, archived)),
+                )
+                items = [StatusHistoryItem.model_validate_json(row["doc"]) for row in rows] + items
+        items.reverse()
+        return total, items
+
+    # ------------------------------------------------------------ L1 rules
+
+    def l1_rules(self, dataset_id: str) -> Optional[L1Rules]:
+        """The dataset's own L1 thresholds, or None if it uses the defaults."""
+        rows = self._execute("SELECT doc FROM l1_rules WHERE dataset_id = ?", (dataset_id,))
+        return L1Rules.model_validate_json(rows[0]["doc"]) if rows else None
+
+    def set_l1_rules(self, dataset_id: str, rules: Optional[L1Rules]) -> None:
+        """Store thresholds for the dataset's next ingestions; None returns it to the defaults."""
+        if rules is None:
+            self._execute("DELETE FROM l1_rules WHERE dataset_id = ?", (dataset_id,))
+            return
+        self._execute(
+            "INSERT INTO l1_rules (dataset_id, doc) VALUES (?, ?) ON CONFLICT(dataset_id) DO UPDATE SET doc = excluded.doc",
+            (dataset_id, rules.model_dump_json()),
+        )
+
+    # ------------------------------------------------------------ aggregates
+
+    def _stats(self) -> "RegistryAggregates":
+        # Built once from indexed columns (no document parsing), then maintained on every write.
+        self._sync()
+        if self._aggregates is None:
+            aggregates = RegistryAggregates(recent_limit=self.recent_limit)
+            for row in self._execute(f"SELECT {_ROW_COLUMNS} FROM datasets"):
+                aggregates.upsert(row["key"], _VersionRow.from_row(row))
+            transitions = self._execute(
+                "SELECT dataset_id, version, status, source, timestamp FROM registry_changes "
+                "WHERE status IS NOT NULL AND revision <= ? ORDER BY revision DESC LIMIT ?",
+                (self._revision, self.recent_limit),
+            )
+            if transitions:
+                for change in reversed(transitions):
+                    aggregates.record(_activity(change))
+            else:
+                # Databases written before the change log existed: approximate from creation times.
+                recent_rows = self._execute(
+                    "SELECT dataset_id, version, status, status_source, created_at FROM datasets "
+                    "ORDER BY created_ts DESC LIMIT ?",
+                    (self.recent_limit,),
+                )
+                for row in reversed(recent_rows):
+                    aggregates.record(
+                        {
+                            "dataset_id": row["dataset_id"],
+                            "version": row["version"],
+                            "status": row["status"],
+                            "source": row["status_source"],
+                            "timestamp": datetime.fromisoformat(row["created_at"]),
+                        }
+                    )
+            self._aggregates = aggregates
+        return self._aggregates
+
+    def record_transition(self, ds: DatasetObject, item: StatusHistoryItem) -> None:
+        """Persist a status transition; it reaches the recent-activity buffer of every process via the change log."""
+        self._write(ds, item)
+
+    def latest_versions(self) -> List[Dict[str, Any]]:
+        """One summary row per dataset: its newest version, status and version count."""
+        with self._lock:
+            return self._stats().summaries()
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats().status_counts)
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent status transitions, newest first."""
+        with self._lock:
+            return list(itertools.islice(self._stats().recent, limit))
+
+
+def _activity(change: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "dataset_id": change["dataset_id"],
+        "version": change["version"],
+        "status": change["status"],
+        "source": change["source"],
+        "timestamp": datetime.fromisoformat(change["timestamp"]),
+    }
+
+
+@dataclass
+class _VersionRow:
+    dataset_id: str
+    version: str
+    status: str
+    status_source: Optional[str]
+    created_at: datetime
+    created_ts: float
+
+    @classmethod
+    def from_dataset(cls, ds: DatasetObject) -> "_VersionRow":
+        created_at = _as_utc(ds.created_at)
+        return cls(
+            ds.dataset_id,
+            ds.version,
+            _enum_value(ds.status),
+            ds.status_source,
+            created_at,
+            created_at.timestamp(),
+        )
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "_VersionRow":
+        return cls(
+            row["dataset_id"],
+            row["version"],
+            row["status"],
+            row["status_source"],
+            datetime.fromisoformat(row["created_at"]),
+            row["created_ts"],
+        )
+
+
+class RegistryAggregates:
+    """Status counters, per-dataset latest-version pointers and a bounded recent-activity buffer.
+
+    Updated incrementally on each write so dashboard reads cost O(statuses), O(datasets) and
+    O(k) instead of a pass over every version.
+    """
+
+    def __init__(self, recent_limit: int = 50):
+        self.rows: Dict[str, _VersionRow] = {}
+        self.status_counts: Counter = Counter()
+        self.versions: Dict[str, Set[str]] = {}
+        self.latest: Dict[str, str] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent_limit)
+
+    def upsert(self, key: str, row: _VersionRow) -> None:
+        previous = self.rows.get(key)
+        if previous is not None:
+            self._decrement(previous.status)
+        self.rows[key] = row
+        self.status_counts[row.status] += 1
+        self.versions.setdefault(row.dataset_id, set()).add(key)
+
+        current = self.latest.get(row.dataset_id)
+        if current is None:
+            self.latest[row.dataset_id] = key
+        elif current == key:
+            if previous is not None and row.created_ts < previous.created_ts:
+                self._recompute_latest(row.dataset_id)
+        elif row.created_ts > self.rows[current].created_ts:
+            self.latest[row.dataset_id] = key
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        self._decrement(row.status)
+        keys = self.versions.get(row.dataset_id, set())
+        keys.discard(key)
+        if not keys:
+            self.versions.pop(row.dataset_id, None)
+            self.latest.pop(row.dataset_id, None)
+        elif self.latest.get(row.dataset_id) == key:
+            self._recompute_latest(row.dataset_id)
+
+    def record(self, activity: Dict[str, Any]) -> None:
+        self.recent.appendleft(activity)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        summaries = []
+        for dataset_id, key in self.latest.items():
+            row = self.rows[key]
+            summaries.append(
+                {
+                    "dataset_id": dataset_id,
+                    "latest_version": row.version,
+                    "status": row.status,
+                    "status_source": row.status_source,
+                    "last_evaluated": row.created_at,
+                    "total_versions": len(self.versions[dataset_id]),
+                }
+            )
+        return summaries
+
+    def _decrement(self, status: str) -> None:
+        self.status_counts[status] -= 1
+        if self.status_counts[status] <= 0:
+            del self.status_counts[status]
+
+    def _recompute_latest(self, dataset_id: str) -> None:
+        self.latest[dataset_id] = max(self.versions[dataset_id], key=lambda k: self.rows[k].created_ts)
@@ -0,0 +1,150 @@
+import csv
+import json
+import mmap
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+
+from api.models import ManifestSource
+
+
+MANIFEST_FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+
+
+class ManifestError(ValueError):
+    """A manifest cannot be read: outside the allowed roots, missing, or malformed."""
+
+
+def local_source_roots() -> List[str]:
+    """Directories the API may read manifests and images from (LOCAL_SOURCE_ROOTS, ``os.pathsep``-separated)."""
+    roots = os.getenv("LOCAL_SOURCE_ROOTS", "")
+    return [os.path.realpath(root) for root in roots.split(os.pathsep) if root.strip()]
+
+
+def resolve_local_path(path: str, roots: Sequence[str]) -> Optional[str]:
+    """The real path of ``path`` if it lies under one of ``roots``, otherwise None."""
+    resolved = os.path.realpath(path)
+    for root in roots:
+        root = os.path.realpath(root)
+        if resolved == root or resolved.startswith(root.rstrip(os.sep) + os.sep):
+            return resolved
+    return None
+
+
+def local_image_path(image_url: str) -> Optional[str]:
+    """The filesystem path named by a ``file://`` URL or a plain path; None for remote URLs."""
+    parsed = urlsplit(image_url)
+    if parsed.scheme == "file":
+        if parsed.netloc not in ("", "localhost"):
+            return None
+        return url2pathname(parsed.path)
+    if parsed.scheme == "":
+        return image_url
+    return None
+
+
+class ManifestReader:
+    """Rows of a manifest file, mapped onto ``RawDataItem`` fields.
+
+    JSONL is read through a read-only memory map, CSV through the file's own buffering and
+    Parquet in record batches of ``chunk_rows`` from a memory-mapped file (needs ``pyarrow``),
+    so memory stays flat whatever the manifest's size. Relative image paths resolve against the
+    manifest's ``image_root`` or its directory; rows without a source column get
+    ``default_source_id``.
+    """
+
+    def __init__(
+        self,
+        manifest: ManifestSource,
+        default_source_id: Optional[str] = None,
+        roots: Optional[Sequence[str]] = None,
+        chunk_rows: int = 1024,
+    ):
+        self.manifest = manifest
+        self.default_source_id = default_source_id
+        self.chunk_rows = max(1, chunk_rows)
+        roots = local_source_roots() if roots is None else roots
+        if not roots:
+            raise ManifestError("Local sources are disabled; set LOCAL_SOURCE_ROOTS to allow them")
+        path = resolve_local_path(manifest.path, roots)
+        if path is None:
+            raise ManifestError(f"Manifest {manifest.path} is outside LOCAL_SOURCE_ROOTS")
+        if not os.path.isfile(path):
+            raise ManifestError(f"Manifest {manifest.path} does not exist")
+        self.path = path
+        self.format = manifest.format or MANIFEST_FORMATS.get(os.path.splitext(path)[1].lower())
+        if self.format is None:
+            raise ManifestError(f"Cannot infer the format of {manifest.path}; set format to one of jsonl, csv, parquet")
+        self.image_root = os.path.abspath(manifest.image_root or os.path.dirname(path))
+
+    def _image_url(self, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        path = local_image_path(value)
+        if path is None:
+            return value
+        return os.path.normpath(os.path.join(self.image_root, path))
+
+    def _row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        manifest = self.manifest
+        image = record.get(manifest.image_column)
+        return {
+            "image_url": None if image is None else self._image_url(image),
+            "caption": record.get(manifest.caption_column),
+            "source_id": record.get(manifest.source_column) or self.default_source_id,
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for record in getattr(self, f"_iter_{self.format}")():
+            yield self._row(record)
+
+    def count_rows(self) -> int:
+        if self.format == "parquet":
+            return self._parquet_file().metadata.num_rows
+        return sum(1 for _ in getattr(self, f"_iter_{self.format}")(decode=False))
+
+    def _iter_jsonl(self, decode: bool = True) -> Iterator[Any]:
+        with open(self.path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for line_number, line in enumerate(iter(mapped.readline, b""), start=1):
+                    if not line.strip():
+                        continue
+                    if not decode:
+                        yield line
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                        raise ManifestError(f"{self.manifest.path}:{line_number}: invalid JSON ({exc})")
+                    if not isinstance(record, dict):
+                        raise ManifestError(f"{self.manifest.path}:{line_number}: expected a JSON object")
+                    yield record
+
+    def _iter_csv(self, decode: bool = True) -> Iterator[Any]:
+        with open(self.path, "r", encoding="utf-8", newline="") as handle:
+            reader = csv.DictReader(handle)
+            try:
+                yield from reader
+            except (csv.Error, UnicodeDecodeError) as exc:
+                raise ManifestError(f"{self.manifest.path}:{reader.line_num}: invalid CSV ({exc})")
+
+    def _parquet_file(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ManifestError("pyarrow is required for Parquet manifests") from exc
+        try:
+            return pq.ParquetFile(self.path, memory_map=True)
+        except Exception as exc:
+            raise ManifestError(f"{self.manifest.path}: not a readable Parquet file ({exc})") from exc
+
+    def _iter_parquet(self, decode: bool = True) -> Iterator[Any]:
+        parquet_file = self._parquet_file()
+        manifest = self.manifest
+        wanted = {manifest.image_column, manifest.caption_column, manifest.source_column}
+        columns = [name for name in parquet_file.schema_arrow.names if name in wanted]
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_rows, columns=columns):
+            yield from batch.to_pylist()
@@ -0,0 +1,35 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+
+# How long a writer waits for another process's write transaction before giving up.
+BUSY_TIMEOUT_SEC = float(os.getenv("SQLITE_BUSY_TIMEOUT_SEC", "10"))
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection suitable for sharing one database file between API processes.
+
+    Autocommit mode (callers use ``write_transaction`` for multi-statement writes), WAL so
+    readers never block the writer, and a busy timeout so concurrent writers queue up.
+    """
+    if db_path != ":memory:":
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT_SEC)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Take the database write lock up front so a read-modify-write cannot interleave with another process."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
@@ -1,14 +1,19 @@
+import hashlib
 import logging
 import os
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
     FieldCondition,
     Filter,
+    FilterSelector,
+    MatchAny,
     MatchValue,
+    PayloadSchemaType,
     PointStruct,
+    QueryRequest,
     VectorParams,
 )
 
@@ -38,11 +43,20 @@ class QdrantService:
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
             )
+            # Keyword indexes keep filtered ANN queries (per dataset/version) off the full-scan path.
+            for field_name in ("dataset_id", "version"):
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=PayloadSchemaType.KEYWORD,
+                )
 
     @staticmethod
     def _point_id(dataset_id: str, version: str, index: int) -> int:
-        # Keep IDs positive and deterministic for the same dataset/version/index.
-        return abs(hash(f"{dataset_id}_{version}_{index}")) % (2**63 - 1)
+        # Positive and identical in every process: str hash() is salted per interpreter, which
+        # let workers write the same row under different ids.
+        digest = hashlib.blake2b(f"{dataset_id}_{version}_{index}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % (2**63 - 1)
 
     @staticmethod
     def _dataset_version_filter(dataset_id: str, version: str) -> Filter:
@@ -90,14 +104,22 @@ class QdrantService:
         ]
         self.client.upsert(collection_name=self.collection_name, points=points)
 
-    async def upsert_dataset(self, dataset_id: str, version: str, data_list: List[Dict[str, Any]]) -> None:
+    async def upsert_dataset(
+        self,
+        dataset_id: str,
+        version: str,
+        data_list: List[Dict[str, Any]],
+        start_index: int = 0,
+    ) -> None:
+        """Upsert rows as points; ``start_index`` is the row index of ``data_list[0]`` when writing in batches."""
         points = [
             PointStruct(
-                id=self._point_id(dataset_id, version, i),
+                id=self._point_id(dataset_id, version, start_index + i),
                 vector=list(item["embedding"]),
                 payload={
                     "dataset_id": dataset_id,
                     "version": version,
+                    "row_index": start_index + i,
                     "caption": item.get("caption"),
                     "source_id": item.get("source_id"),
                     "image_url": item.get("image_url"),
@@ -112,6 +134,114 @@ class QdrantService:
         if points:
             self.client.upsert(collection_name=self.collection_name, points=points)
 
+    def delete_version(self, dataset_id: str, version: str) -> None:
+        """Drop every point of a dataset version, e.g. before re-ingesting it."""
+        if not self.client.collection_exists(self.collection_name):
+            return
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(filter=self._dataset_version_filter(dataset_id, version)),
+        )
+
+    def find_near_duplicates(
+        self,
+        dataset_id: str,
+        version: str,
+        embeddings: Sequence[Optional[Sequence[float]]],
+        parent_version: Optional[str] = None,
+        threshold: float = 0.97,
+        limit: int = 3,
+        batch_size: int = 64,
+        start_index: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Batched ANN lookup of each row against its own version and the lineage parent.
+
+        ``embeddings`` are rows ``start_index`` onwards. Within a version only matches to earlier
+        rows are reported, so every pair appears once, including when rows are checked batch by
+        batch as they are upserted.
+        """
+        if not embeddings or not self.client.collection_exists(self.collection_name):
+            return []
+
+        versions = [version] if not parent_version or parent_version == version else [version, parent_version]
+        filter_query = Filter(
+            must=[
+                FieldCondition(key="dataset_id", match=MatchValue(value=dataset_id)),
+                FieldCondition(key="version", match=MatchAny(any=versions)),
+            ]
+        )
+
+        queries = [(start_index + i, list(emb)) for i, emb in enumerate(embeddings) if emb is not None]
+        matches: List[Dict[str, Any]] = []
+
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start : start + batch_size]
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    QueryRequest(
+                        query=vector,
+                        filter=filter_query,
+                        # One extra slot because a row always finds itself.
+                        limit=limit + 1,
+                        score_threshold=threshold,
+                        with_payload=["version", "row_index"],
+                    )
+                    for _, vector in batch
+                ],
+            )
+
+            for (row_index, _), response in zip(batch, responses):
+                for point in response.points:
+                    payload = point.payload or {}
+                    match_version = payload.get("version")
+                    match_row_index = payload.get("row_index")
+                    if match_row_index is None:
+                        continue
+                    same_version = match_version == version
+                    if same_version and match_row_index >= row_index:
+                        continue
+                    matches.append(
+                        {
+                            "row_index": row_index,
+                            "match_version": match_version,
+                            "match_row_index": int(match_row_index),
+                            "same_version": same_version,
+                            "score": float(point.score),
+                        }
+                    )
+
+        return matches
+
+    def iter_points(
+        self,
+        dataset_id: str,
+        version: str,
+        with_payload: bool = True,
+        page_size: int = 256,
+    ) -> Iterator[Any]:
+        """Stream every point of a dataset version page by page, vectors included."""
+        if not self.client.collection_exists(self.collection_name):
+            return
+
+        offset: Optional[Any] = None
+        filter_query = self._dataset_version_filter(dataset_id, version)
+
+        while True:
+            points, next_offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=filter_query,
+                limit=page_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=True,
+            )
+            yield from points
+
+            if next_offset is None:
+                break
+            offset = next_offset
+
     def get_vectors_by_version(self, dataset_id: str, version: str, page_size: int = 256) -> List[List[float]]:
         if not self.client.collection_exists(self.collection_name):
             return []
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+
+from api.services.admission import AdmissionController, AdmissionRejected
+from api.services.ingestion_queue import IngestionQueue
+
+
+class AdmissionControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.queue = IngestionQueue(
+            run_job=lambda job, progress: None,
+            db_path=tempfile.mkdtemp(prefix="admission-") + "/jobs.db",
+            workers=2,
+        )
+
+    def _controller(self, **kwargs) -> AdmissionController:
+        kwargs.setdefault("max_inflight_rows", 1000)
+        kwargs.setdefault("max_queued_jobs", 3)
+        kwargs.setdefault("default_retry_after_sec", 30)
+        return AdmissionController(self.queue, **kwargs)
+
+    def test_row_budget_counts_rows_not_yet_upserted(self):
+        controller = self._controller()
+        job = self.queue.enqueue("a", "v1", rows_total=800)
+
+        controller.check(200)
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.check(300)
+        self.assertEqual(ctx.exception.retry_after_sec, 30)
+
+        # As a worker's progress report would record it.
+        job.rows_upserted = 500
+        self.queue.store.save(job)
+        controller.check(300)
+        self.assertEqual(controller.snapshot()["inflight_rows"], 300)
+
+    def test_queue_depth_limit_applies_before_rows_are_known(self):
+        controller = self._controller(max_inflight_rows=10**6)
+        for i in range(3):
+            self.queue.enqueue(f"ds{i}", "v1", rows_total=10)
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.check()
+        self.assertIn("queue is full", ctx.exception.reason)
+        self.assertEqual(controller.snapshot()["rejected"], 1)
+
+    def test_requests_larger_than_the_whole_budget_cannot_be_retried(self):
+        with self.assertRaises(AdmissionRejected) as ctx:
+            self._controller().check(1001)
+        self.assertIsNone(ctx.exception.retry_after_sec)
+
+    def test_retry_after_follows_observed_throughput(self):
+        controller = self._controller()
+        self.queue.enqueue("a", "v1", rows_total=1000)
+        self.queue.rows_per_sec = 10.0
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.check(400)
+        # 400 rows over budget at 10 rows/s on each of 2 workers.
+        self.assertEqual(ctx.exception.retry_after_sec, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from api.models import JobStatusEnum
+from api.services.audit_scheduler import AuditScheduler
+
+
+def _db_path() -> str:
+    return os.path.join(tempfile.mkdtemp(prefix="l2-queue-"), "jobs.db")
+
+
+class RecordingAudit:
+    def __init__(self, delay=0.0, fail_for=()):
+        self.delay = delay
+        self.fail_for = set(fail_for)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, dataset_id, version, force_refresh):
+        self.calls.append((dataset_id, version, force_refresh))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if dataset_id in self.fail_for:
+                raise RuntimeError(f"audit failed for {dataset_id}")
+            return None
+        finally:
+            self.in_flight -= 1
+
+
+class AuditSchedulerTests(unittest.TestCase):
+    def _scheduler(self, audit, **kwargs) -> AuditScheduler:
+        kwargs.setdefault("rate_per_minute", 0)
+        kwargs.setdefault("scan_interval_sec", 0)
+        kwargs.setdefault("poll_interval_sec", 0.02)
+        return AuditScheduler(run_audit=audit, db_path=kwargs.pop("db_path", _db_path()), **kwargs)
+
+    def test_dispatches_manual_then_newest_then_largest_drift(self):
+        audit = RecordingAudit()
+        scheduler = self._scheduler(audit, max_concurrency=1)
+        now = datetime.now(timezone.utc)
+
+        # Enqueued without a running loop, so nothing dispatches until the scenario starts.
+        scheduler.enqueue("old", "v2", version_created_at=now - timedelta(days=1), drift=0.9)
+        scheduler.enqueue("new-small", "v2", version_created_at=now, drift=0.1)
+        scheduler.enqueue("new-large", "v2", version_created_at=now, drift=0.5)
+        manual = scheduler.enqueue("manual", "v2", trigger="MANUAL", version_created_at=now - timedelta(days=2))
+
+        async def scenario():
+            for job in scheduler.queued_jobs():
+                await scheduler.wait(job.job_id, timeout=2)
+
+        self.assertEqual(manual.trigger, "MANUAL")
+        asyncio.run(scenario())
+        self.assertEqual([call[0] for call in audit.calls], ["manual", "new-large", "new-small", "old"])
+
+    def test_requeue_of_active_version_returns_same_job(self):
+        audit = RecordingAudit(delay=0.05)
+        scheduler = self._scheduler(audit)
+
+        async def scenario():
+            first = scheduler.enqueue("demo", "v2")
+            second = scheduler.enqueue("demo", "v2", trigger="MANUAL", force_refresh=True)
+            await scheduler.wait(first.job_id, timeout=2)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertIs(first, second)
+        self.assertEqual(len(audit.calls), 1)
+        self.assertTrue(scheduler.is_known("demo", "v2"))
+
+    def test_concurrency_budget_caps_running_audits(self):
+        audit = RecordingAudit(delay=0.03)
+        scheduler = self._scheduler(audit, max_concurrency=2)
+
+        async def scenario():
+            jobs = [scheduler.enqueue(f"ds{i}", "v2") for i in range(6)]
+            await asyncio.gather(*[scheduler.wait(job.job_id, timeout=2) for job in jobs])
+            return jobs
+
+        jobs = asyncio.run(scenario())
+        self.assertEqual(audit.max_in_flight, 2)
+        self.assertTrue(all(job.status == JobStatusEnum.SUCCEEDED for job in jobs))
+
+    def test_rate_budget_spaces_out_dispatches(self):
+        audit = RecordingAudit()
+        # 600/min = one token every 0.1s, burst of one.
+        scheduler = self._scheduler(audit, max_concurrency=1, rate_per_minute=600)
+
+        async def scenario():
+            jobs = [scheduler.enqueue(f"ds{i}", "v2") for i in range(3)]
+            started = time.perf_counter()
+            await asyncio.gather(*[scheduler.wait(job.job_id, timeout=2) for job in jobs])
+            return time.perf_counter() - started
+
+        elapsed = asyncio.run(scenario())
+        self.assertEqual(len(audit.calls), 3)
+        self.assertGreaterEqual(elapsed, 0.18)
+
+    def test_failed_audit_is_recorded_on_the_job(self):
+        audit = RecordingAudit(fail_for={"broken"})
+        scheduler = self._scheduler(audit)
+
+        async def scenario():
+            job = scheduler.enqueue("broken", "v2")
+            return await scheduler.wait(job.job_id, timeout=2)
+
+        job = asyncio.run(scenario())
+        self.assertEqual(job.status, JobStatusEnum.FAILED)
+        self.assertIn("audit failed", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_queue_state_survives_restart(self):
+        db_path = _db_path()
+        first = self._scheduler(RecordingAudit(), db_path=db_path)
+        queued = first.enqueue("demo", "v2", drift=0.4)
+        first.enqueue("other", "v2")
+        # The owning process died mid-audit.
+        queued.status = JobStatusEnum.RUNNING
+        first.store.save(queued)
+
+        audit = RecordingAudit()
+        restored = self._scheduler(audit, db_path=db_path)
+        restored_job = restored.get(queued.job_id)
+        self.assertEqual(restored_job.status, JobStatusEnum.RUNNING)
+        self.assertEqual(restored_job.drift, 0.4)
+
+        async def scenario():
+            for job in restored.queued_jobs():
+                await restored.wait(job.job_id, timeout=2)
+
+        asyncio.run(scenario())
+        self.assertEqual(sorted(call[0] for call in audit.calls), ["demo", "other"])
+        self.assertTrue(restored.is_known("demo", "v2"))
+
+    def test_standby_scheduler_hands_jobs_to_the_owner(self):
+        db_path = _db_path()
+        audit = RecordingAudit(delay=0.02)
+        owner = self._scheduler(audit, db_path=db_path)
+        standby_audit = RecordingAudit()
+        standby = self._scheduler(standby_audit, db_path=db_path, standby=True)
+
+        async def scenario():
+            owner.ensure_started()
+            job = standby.enqueue("demo", "v2", trigger="MANUAL")
+            self.assertIs(standby.enqueue("demo", "v2"), job)
+            return await standby.wait(job.job_id, timeout=2)
+
+        job = asyncio.run(scenario())
+        self.assertEqual(job.status, JobStatusEnum.SUCCEEDED)
+        self.assertIsNotNone(job.owner)
+        self.assertEqual(audit.calls, [("demo", "v2", False)])
+        self.assertEqual(standby_audit.calls, [])
+        self.assertTrue(standby.is_known("demo", "v2"))
+        standby.forget("demo", "v2")
+        self.assertFalse(owner.is_known("demo", "v2"))
+
+    def test_scan_enqueues_eligible_versions(self):
+        audit = RecordingAudit()
+        scheduler = None
+
+        def scan():
+            if not scheduler.is_known("auto", "v2"):
+                scheduler.enqueue("auto", "v2")
+
+        scheduler = AuditScheduler(
+            run_audit=audit, scan=scan, db_path=_db_path(), rate_per_minute=0, scan_interval_sec=0.01
+        )
+
+        async def scenario():
+            scheduler.ensure_started()
+            for _ in range(100):
+                if audit.calls:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(scenario())
+        self.assertEqual(audit.calls, [("auto", "v2", False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from api.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout_sec=10, clock=self.clock)
+
+    def test_opens_after_consecutive_failures_and_rejects(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.check()
+        self.assertEqual(self.breaker.snapshot()["rejections"], 1)
+
+    def test_success_resets_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_allows_one_trial_and_closes_on_success(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10.0
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_failure_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10.0
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot["state"], CircuitBreaker.OPEN)
+        self.assertEqual(snapshot["opened"], 2)
+        self.assertEqual(snapshot["retry_in_sec"], 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from types import SimpleNamespace
+
+from api.services.clustering import ClusteringService
+from api.services.vector_db import QdrantService
+
+
+class FakeVectorDB:
+    _extract_vector = staticmethod(QdrantService._extract_vector)
+
+    def __init__(self, points_by_version):
+        self.points_by_version = points_by_version
+        self.scans = []
+
+    def iter_points(self, dataset_id, version, with_payload=True, page_size=256):
+        self.scans.append(version)
+        for i, vector in enumerate(self.points_by_version.get(version, [])):
+            yield SimpleNamespace(
+                vector=vector,
+                payload={"row_index": i, "image_url": f"{version}-{i}", "caption": f"cap-{i}"},
+            )
+
+
+def _cluster(axis, count, dim=3):
+    points = []
+    for i in range(count):
+        vector = [0.01 * ((i % 3) + 1)] * dim
+        vector[axis] = 1.0
+        points.append(vector)
+    return points
+
+
+class ClusteringServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.vdb = FakeVectorDB(
+            {
+                "v1": _cluster(0, 30),
+                "v2": _cluster(0, 20) + _cluster(2, 10),
+            }
+        )
+        self.service = ClusteringService(self.vdb, n_clusters=2, medoids_per_cluster=2, batch_size=8)
+
+    def test_summarize_recovers_cluster_sizes(self):
+        summary = self.service.summarize("demo", "v2")
+
+        self.assertEqual(summary.total_points, 30)
+        self.assertEqual(sorted(c.size for c in summary.clusters), [10, 20])
+        self.assertTrue(all(len(c.medoids) == 2 for c in summary.clusters))
+
+    def test_representative_samples_rank_shifted_cluster_first(self):
+        result = self.service.representative_samples("demo", "v1", "v2", max_clusters=1)
+
+        self.assertEqual(len(result["clusters"]), 1)
+        self.assertEqual(result["clusters"][0]["size"], 10)
+        self.assertGreater(result["clusters"][0]["baseline_shift"], 0.5)
+        self.assertTrue(all(int(s["image_url"].split("-")[1]) >= 20 for s in result["samples"]))
+
+    def test_summaries_are_cached_per_version_until_invalidated(self):
+        self.service.summarize("demo", "v2")
+        self.service.summarize("demo", "v2")
+        self.assertEqual(self.vdb.scans, ["v2", "v2"])
+
+        self.service.invalidate("demo")
+        self.service.summarize("demo", "v2")
+        self.assertEqual(len(self.vdb.scans), 4)
+
+    def test_representative_samples_returns_none_without_baseline(self):
+        self.assertIsNone(self.service.representative_samples("demo", "v0", "v2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,14 @@
+import io
 import math
+import tempfile
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch
 
 from PIL import Image
 
-from api.services.embedder import EmbedderService
+from api.services.blob_store import BlobStore
+from api.services.embedder import THUMBNAIL_NAMESPACE, EmbedderService
 
 
 class FakeModel:
@@ -70,6 +74,39 @@ class EmbedderServiceTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             service.generate_embeddings(image_urls=["a"], captions=["x", "y"])
 
+    def test_load_image_persists_downscaled_jpeg_thumbnail(self):
+        store = BlobStore(tempfile.mkdtemp(prefix="blobs-"))
+        service = EmbedderService(thumbnail_store=store)
+        service.thumbnail_max_side = 64
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (640, 320), color=(10, 200, 30)).save(buffer, format="PNG")
+        response = SimpleNamespace(content=buffer.getvalue(), raise_for_status=lambda: None)
+
+        with patch("api.services.embedder.requests.get", return_value=response):
+            image = service._load_image("https://example.com/large.png")
+
+        self.assertEqual(image.size, (640, 320))
+        thumbnail_bytes = store.get(THUMBNAIL_NAMESPACE, BlobStore.key_for("https://example.com/large.png"))
+        thumbnail = Image.open(io.BytesIO(thumbnail_bytes))
+        self.assertEqual(thumbnail.format, "JPEG")
+        self.assertEqual(thumbnail.size, (64, 32))
+
+    def test_load_image_reads_local_paths_under_the_allowed_roots(self):
+        root = tempfile.mkdtemp(prefix="images-")
+        path = f"{root}/local.png"
+        Image.new("RGB", (8, 4), color=(1, 2, 3)).save(path)
+        service = EmbedderService(thumbnail_store=BlobStore(tempfile.mkdtemp(prefix="blobs-")), local_roots=[root])
+
+        with patch("api.services.embedder.requests.get") as get:
+            self.assertEqual(service._load_image(path).size, (8, 4))
+            self.assertEqual(service._load_image(f"file://{path}").getpixel((0, 0)), (1, 2, 3))
+            self.assertIsNone(service._load_image(f"{root}/missing.png"))
+        get.assert_not_called()
+
+        outside = EmbedderService(thumbnail_store=service.thumbnail_store, local_roots=[tempfile.mkdtemp(prefix="other-")])
+        self.assertIsNone(outside._load_image(path))
+
 
 if __name__ == "__main__":
     unittest.main()
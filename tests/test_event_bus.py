@@ -0,0 +1,113 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from api.services.event_bus import EventBus
+
+
+class EventBusTests(unittest.TestCase):
+    def test_subscribers_only_receive_their_dataset(self):
+        bus = EventBus(history_size=10)
+
+        async def scenario():
+            everything, _, _ = bus.subscribe()
+            only_a, _, _ = bus.subscribe(dataset_id="a")
+            bus.publish("status", {"status": "PASS"}, dataset_id="a")
+            bus.publish("status", {"status": "WARN"}, dataset_id="b")
+            return (
+                [(await everything.get(0.1)).dataset_id, (await everything.get(0.1)).dataset_id],
+                [(await only_a.get(0.1)).dataset_id, await only_a.get(0.01)],
+            )
+
+        everything, only_a = asyncio.run(scenario())
+        self.assertEqual(everything, ["a", "b"])
+        self.assertEqual(only_a, ["a", None])
+
+    def test_resume_replays_events_after_last_id(self):
+        bus = EventBus(history_size=10)
+        for i in range(5):
+            bus.publish("status", {"i": i}, dataset_id="a" if i % 2 == 0 else "b")
+
+        async def scenario():
+            _, replay, reset = bus.subscribe(dataset_id="a", last_event_id=2)
+            return replay, reset
+
+        replay, reset = asyncio.run(scenario())
+        self.assertFalse(reset)
+        self.assertEqual([event.id for event in replay], [3, 5])
+        self.assertEqual(replay[0].encode(), 'id: 3\nevent: status\ndata: {"i":2}\n\n')
+
+    def test_resume_past_retained_history_requests_reset(self):
+        bus = EventBus(history_size=3)
+        for i in range(6):
+            bus.publish("status", {"i": i})
+
+        async def scenario():
+            _, _, too_old = bus.subscribe(last_event_id=1)
+            _, _, from_restart = bus.subscribe(last_event_id=99)
+            _, replay, in_window = bus.subscribe(last_event_id=3)
+            return too_old, from_restart, in_window, replay
+
+        too_old, from_restart, in_window, replay = asyncio.run(scenario())
+        self.assertTrue(too_old)
+        self.assertTrue(from_restart)
+        self.assertFalse(in_window)
+        self.assertEqual([event.id for event in replay], [4, 5, 6])
+
+    def test_slow_subscriber_is_marked_overflowed(self):
+        bus = EventBus(history_size=10, subscriber_queue_size=2)
+
+        async def scenario():
+            sub, _, _ = bus.subscribe()
+            for i in range(3):
+                bus.publish("status", {"i": i})
+            return sub
+
+        sub = asyncio.run(scenario())
+        self.assertTrue(sub.overflowed)
+        self.assertEqual(sub.queue.qsize(), 2)
+
+    def test_publish_from_worker_thread_is_delivered_on_the_loop(self):
+        bus = EventBus(history_size=10)
+
+        async def scenario():
+            sub, _, _ = bus.subscribe()
+            worker = threading.Thread(target=bus.publish, args=("ingestion", {"stage": "embedded"}, "a"))
+            worker.start()
+            worker.join()
+            return await sub.get(1.0)
+
+        event = asyncio.run(scenario())
+        self.assertEqual(event.data, {"stage": "embedded"})
+        self.assertEqual(bus.subscriber_count(), 1)
+
+    def test_shared_log_delivers_events_from_other_processes_in_id_order(self):
+        log_path = os.path.join(tempfile.mkdtemp(prefix="event-log-"), "events.db")
+        publisher = EventBus(history_size=10, log_path=log_path, poll_interval_sec=0.01)
+        reader = EventBus(history_size=10, log_path=log_path, poll_interval_sec=0.01)
+        heard = []
+        reader.add_listener(lambda event: heard.append(event.id))
+        reader.start()
+        self.addCleanup(reader.stop, 1)
+
+        async def scenario():
+            sub, _, _ = reader.subscribe(dataset_id="a")
+            first = publisher.publish("status", {"status": "VALIDATING"}, dataset_id="a")
+            publisher.publish("status", {"status": "PASS"}, dataset_id="b")
+            reader.publish("status", {"status": "BLOCK"}, dataset_id="a")
+            received = [await sub.get(2.0), await sub.get(2.0)]
+            _, replay, reset = reader.subscribe(last_event_id=first.id)
+            return received, replay, reset
+
+        received, replay, reset = asyncio.run(scenario())
+        self.assertEqual([(e.id, e.data["status"]) for e in received], [(1, "VALIDATING"), (3, "BLOCK")])
+        self.assertEqual([e.id for e in replay], [2, 3])
+        self.assertFalse(reset)
+        self.assertEqual(heard, [1, 2, 3])
+        self.assertEqual(reader.last_event_id, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
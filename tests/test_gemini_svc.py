@@ -0,0 +1,305 @@
+import asyncio
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+
+import api.main as main_module
+from api.models import DatasetObject, StatusEnum
+from api.services.audit_cache import AuditCache
+from api.services.audit_scheduler import AuditScheduler
+from api.services.blob_store import BlobStore
+from api.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from api.services.embedder import THUMBNAIL_NAMESPACE
+from api.services.registry import DatasetRegistry
+from api.services.gemini_svc import GeminiService
+
+
+AUDIT_JSON = json.dumps(
+    {
+        "model_name": "gemini-2.5-flash",
+        "distribution_drift": {"cosine_mean_shift": 0.2},
+        "reasoning_trace": {
+            "summary": "summary",
+            "key_observations": ["obs"],
+            "decision_rationale": "rationale",
+        },
+        "judgment_summary": "judgment",
+        "flagged_samples": [],
+        "confidence_score": 0.7,
+        "l2_status": "WARN",
+    }
+)
+
+
+class FakeAsyncModels:
+    def __init__(self, delay=0.0, failures=None):
+        self.delay = delay
+        self.failures = list(failures or [])
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        self.last_contents = contents
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                raise self.failures.pop(0)
+            return SimpleNamespace(text=AUDIT_JSON)
+        finally:
+            self.in_flight -= 1
+
+
+def _temp_cache() -> AuditCache:
+    return AuditCache(tempfile.mkdtemp(prefix="l2-cache-"))
+
+
+class PerModelFakeModels:
+    """Fake client whose latency depends on the requested model id."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.models_called = []
+        self.cancelled = []
+
+    async def generate_content(self, model, contents, config):
+        self.models_called.append(model)
+        try:
+            await asyncio.sleep(self.delays[model])
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return SimpleNamespace(text=AUDIT_JSON)
+
+
+def _service_with(models) -> GeminiService:
+    service = GeminiService(audit_cache=_temp_cache())
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    service.backoff_base_sec = 0.001
+    return service
+
+
+def _audit(service: GeminiService, **kwargs):
+    return service.audit_dataset({"cosine_mean_shift": 0.2}, ["img"], ["cap"], **kwargs)
+
+
+class GeminiServiceTests(unittest.TestCase):
+    def test_audit_retries_transient_errors_with_backoff(self):
+        models = FakeAsyncModels(failures=[ConnectionError("reset"), asyncio.TimeoutError()])
+        service = _service_with(models)
+
+        result = asyncio.run(_audit(service))
+
+        self.assertEqual(result.l2_status, StatusEnum.WARN)
+        self.assertEqual(models.calls, 3)
+
+    def test_audit_does_not_retry_non_retryable_errors(self):
+        models = FakeAsyncModels(failures=[ValueError("bad request")])
+        service = _service_with(models)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(_audit(service))
+        self.assertEqual(models.calls, 1)
+
+    def test_audit_enforces_per_call_deadline(self):
+        models = FakeAsyncModels(delay=1.0)
+        service = _service_with(models)
+        service.call_timeout_sec = 0.01
+        service.max_attempts = 2
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(_audit(service))
+        self.assertEqual(models.calls, 2)
+
+    def test_concurrency_limiter_caps_in_flight_calls(self):
+        models = FakeAsyncModels(delay=0.02)
+        service = _service_with(models)
+        service.max_concurrency = 2
+
+        async def run_many():
+            await asyncio.gather(*[_audit(service, force_refresh=True) for _ in range(6)])
+
+        asyncio.run(run_many())
+        self.assertEqual(models.calls, 6)
+        self.assertEqual(models.max_in_flight, 2)
+
+    def test_repeat_audit_is_served_from_cache_unless_forced(self):
+        models = FakeAsyncModels()
+        service = _service_with(models)
+
+        first = asyncio.run(_audit(service))
+        second = asyncio.run(_audit(service))
+        forced = asyncio.run(_audit(service, force_refresh=True))
+
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        self.assertIsNotNone(second.cached_at)
+        self.assertFalse(forced.cache_hit)
+        self.assertEqual(models.calls, 2)
+
+    def test_audit_attaches_stored_thumbnails_inline(self):
+        models = FakeAsyncModels()
+        service = _service_with(models)
+        service.thumbnail_store = BlobStore(tempfile.mkdtemp(prefix="blobs-"))
+        service.thumbnail_store.put(THUMBNAIL_NAMESPACE, BlobStore.key_for("img-a"), b"jpeg-a")
+
+        asyncio.run(service.audit_dataset({"cosine_mean_shift": 0.2}, ["img-a", "img-b"], ["cap-a", "cap-b"]))
+
+        contents = models.last_contents
+        self.assertIn("img-b|cap-b", contents[0].text)
+        self.assertEqual(contents[1].text, "IMAGE img-a")
+        self.assertEqual(contents[2].inline_data.data, b"jpeg-a")
+        self.assertEqual(contents[2].inline_data.mime_type, "image/jpeg")
+        self.assertEqual(len(contents), 3)
+
+    def test_open_breaker_fails_fast_without_calling_gemini(self):
+        models = FakeAsyncModels(failures=[ConnectionError("down")] * 10)
+        service = _service_with(models)
+        service.max_attempts = 1
+        service.breaker = CircuitBreaker("gemini", failure_threshold=2, recovery_timeout_sec=60)
+
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                asyncio.run(_audit(service, force_refresh=True))
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(_audit(service, force_refresh=True))
+
+        self.assertEqual(models.calls, 2)
+        snapshot = service.ops_snapshot()["breaker"]
+        self.assertEqual(snapshot["state"], "OPEN")
+        self.assertEqual(snapshot["rejections"], 1)
+
+    def test_slow_primary_is_hedged_to_secondary_model(self):
+        models = PerModelFakeModels({"primary": 1.0, "secondary": 0.01})
+        service = _service_with(models)
+        service.model_id = "primary"
+        service.hedge_model_id = "secondary"
+        service.hedge_after_sec = 0.02
+
+        started = time.perf_counter()
+        result = asyncio.run(_audit(service))
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(result.model_name, "secondary")
+        self.assertEqual(models.models_called, ["primary", "secondary"])
+        self.assertEqual(models.cancelled, ["primary"])
+        self.assertEqual(service.ops_snapshot()["hedges"], {"started": 1, "won": 1})
+
+    def test_fast_primary_is_not_hedged(self):
+        models = PerModelFakeModels({"primary": 0.0, "secondary": 0.0})
+        service = _service_with(models)
+        service.model_id = "primary"
+        service.hedge_model_id = "secondary"
+        service.hedge_after_sec = 0.5
+
+        result = asyncio.run(_audit(service))
+
+        self.assertEqual(result.model_name, "primary")
+        self.assertEqual(models.models_called, ["primary"])
+
+    def test_cache_key_changes_with_samples_and_prompt_version(self):
+        service = _service_with(FakeAsyncModels())
+        base = service._cache_key({"cosine_mean_shift": 0.2}, ["img"], ["cap"], None)
+
+        self.assertEqual(base, service._cache_key({"cosine_mean_shift": 0.2}, ["img"], ["cap"], None))
+        self.assertNotEqual(base, service._cache_key({"cosine_mean_shift": 0.2}, ["img"], ["other"], None))
+        service.PROMPT_VERSION = "next"
+        self.assertNotEqual(base, service._cache_key({"cosine_mean_shift": 0.2}, ["img"], ["cap"], None))
+
+
+class _SlowGeminiStub(BaseHTTPRequestHandler):
+    delay_sec = 0.5
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.delay_sec)
+        body = json.dumps(
+            {"candidates": [{"content": {"role": "model", "parts": [{"text": AUDIT_JSON}]}}]}
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GeminiEventLoopTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowGeminiStub)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.service = GeminiService(audit_cache=_temp_cache())
+        self.service.api_key = "test-key"
+        self.service.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        registry_patcher = patch.object(main_module, "dataset_registry", DatasetRegistry(":memory:"))
+        registry_patcher.start()
+        self.addCleanup(registry_patcher.stop)
+        for i in range(4):
+            main_module.dataset_registry[f"demo{i}:v2"] = DatasetObject(
+                dataset_id=f"demo{i}", version="v2", source_id="src", status=StatusEnum.PASS
+            )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_list_datasets_latency_unaffected_by_in_flight_audits(self):
+        outliers = [{"image_url": f"img-{i}", "caption": f"cap-{i}", "outlier_score": 0.5} for i in range(3)]
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main_module.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                # Measured from scenario start: a blocked event loop would also delay the listing's
+                # own start timestamp, so a per-request timer alone cannot detect it.
+                started = time.perf_counter()
+                audits = [
+                    asyncio.create_task(client.post(f"/datasets/demo{i}/v/v2/trigger-l2")) for i in range(4)
+                ]
+                await asyncio.sleep(0.1)
+
+                listing = await client.get("/datasets/")
+                list_latency = time.perf_counter() - started - 0.1
+
+                triggered = await asyncio.gather(*audits)
+                jobs = [await scheduler.wait(r.json()["job_id"], timeout=5) for r in triggered]
+                return listing, list_latency, triggered, jobs
+
+        scheduler = AuditScheduler(
+            run_audit=main_module.run_scheduled_l2_audit,
+            db_path=tempfile.mkdtemp(prefix="l2-queue-") + "/jobs.db",
+            max_concurrency=4,
+            rate_per_minute=0,
+            scan_interval_sec=0,
+        )
+
+        with patch.object(main_module, "gemini_svc", self.service), patch.object(
+            main_module, "audit_scheduler", scheduler
+        ), patch.object(
+            main_module.pipeline.vdb, "get_mean_vector", return_value=[1.0, 0.0]
+        ), patch.object(main_module.pipeline.vdb, "get_outlier_samples", return_value=outliers), patch.object(
+            main_module.clustering_svc, "representative_samples", return_value=None
+        ):
+            listing, list_latency, triggered, jobs = asyncio.run(scenario())
+
+        self.assertEqual(listing.status_code, 200)
+        self.assertLess(list_latency, 0.2)
+        self.assertEqual([r.status_code for r in triggered], [202, 202, 202, 202])
+        self.assertEqual([job.status for job in jobs], ["SUCCEEDED"] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
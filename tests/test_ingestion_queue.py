@@ -0,0 +1,171 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+
+from api.models import JobStatusEnum
+from api.services.ingestion_queue import IngestionQueue
+
+
+def _db_path() -> str:
+    return tempfile.mkdtemp(prefix="ingest-queue-") + "/jobs.db"
+
+
+class IngestionQueueTests(unittest.TestCase):
+    def _queue(self, run_job, **kwargs) -> IngestionQueue:
+        kwargs.setdefault("db_path", _db_path())
+        kwargs.setdefault("workers", 2)
+        kwargs.setdefault("retry_backoff_sec", 0.01)
+        kwargs.setdefault("progress_interval_sec", 0)
+        kwargs.setdefault("poll_interval_sec", 0.02)
+        queue = IngestionQueue(run_job=run_job, **kwargs)
+        self.addCleanup(queue.stop, 5)
+        return queue
+
+    def test_jobs_run_on_worker_pool_with_progress(self):
+        lock = threading.Lock()
+        in_flight = [0, 0]
+        events = []
+
+        async def run_job(job, progress):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            await asyncio.sleep(0.05)
+            progress("fetched", rows_fetched=3, rows_embedded=0, rows_upserted=0)
+            progress("upserted", rows_fetched=3, rows_embedded=3, rows_upserted=3)
+            with lock:
+                in_flight[0] -= 1
+            return SimpleNamespace(l1_status="PASS")
+
+        queue = self._queue(run_job, on_change=lambda job: events.append((job.job_id, job.status)))
+        jobs = [queue.enqueue(f"ds{i}", "v1", rows_total=3) for i in range(4)]
+        queue.start()
+
+        finished = [queue.wait(job.job_id, timeout=5) for job in jobs]
+        self.assertEqual([job.status for job in finished], ["SUCCEEDED"] * 4)
+        self.assertEqual(finished[0].rows_upserted, 3)
+        self.assertEqual(finished[0].l1_status, "PASS")
+        self.assertEqual(in_flight[1], 2)
+        self.assertIn((jobs[0].job_id, "RUNNING"), events)
+        self.assertEqual(queue.snapshot()["queued"], 0)
+
+    def test_enqueue_returns_active_job_for_same_version(self):
+        queue = self._queue(lambda job, progress: None)
+
+        first = queue.enqueue("ds", "v1")
+        self.assertIs(queue.enqueue("ds", "v1", trigger="REINGEST"), first)
+        self.assertIs(queue.active_job("ds", "v1"), first)
+
+    def test_transient_failures_are_retried_but_data_errors_are_not(self):
+        attempts = {"flaky": 0, "bad": 0}
+
+        async def run_job(job, progress):
+            attempts[job.dataset_id] += 1
+            if job.dataset_id == "bad":
+                raise ValueError("raw_data[0] is missing required fields: caption")
+            if attempts["flaky"] < 3:
+                raise ConnectionError("qdrant unavailable")
+
+        queue = self._queue(run_job, max_attempts=3)
+        flaky, bad = queue.enqueue("flaky", "v1"), queue.enqueue("bad", "v1")
+        queue.start()
+
+        self.assertEqual(queue.wait(flaky.job_id, timeout=5).status, "SUCCEEDED")
+        self.assertEqual(queue.wait(bad.job_id, timeout=5).status, "FAILED")
+        self.assertEqual(attempts, {"flaky": 3, "bad": 1})
+        self.assertEqual(flaky.attempts, 3)
+        self.assertIn("missing required fields", bad.error)
+
+    def test_cancel_queued_and_running_jobs(self):
+        started = threading.Event()
+
+        async def run_job(job, progress):
+            started.set()
+            for batch in range(1, 200):
+                await asyncio.sleep(0.01)
+                progress("upserted", rows_fetched=batch, rows_embedded=batch, rows_upserted=batch)
+
+        queue = self._queue(run_job, workers=1)
+        running, queued = queue.enqueue("a", "v1"), queue.enqueue("b", "v1")
+        queue.start()
+        self.assertTrue(started.wait(5))
+
+        self.assertEqual(queue.cancel(queued.job_id).status, "CANCELLED")
+        self.assertTrue(queue.cancel(running.job_id).cancel_requested)
+        self.assertEqual(queue.wait(running.job_id, timeout=5).status, "CANCELLED")
+        self.assertLess(running.rows_upserted, 199)
+        self.assertIsNone(queue.cancel("missing"))
+
+    def test_jobs_left_running_by_a_previous_owner_are_requeued_on_start(self):
+        db_path = _db_path()
+        crashed = self._queue(lambda job, progress: None, db_path=db_path)
+        job = crashed.enqueue("ds", "v1", rows_total=10)
+        job, _ = crashed._claim()
+        self.assertEqual(job.status, "RUNNING")
+
+        ran = []
+
+        async def run_job(job, progress):
+            ran.append(job.job_id)
+
+        restored = self._queue(run_job, db_path=db_path)
+        self.assertEqual(restored.active_job("ds", "v1").job_id, job.job_id)
+        restored.start()
+
+        finished = restored.wait(job.job_id, timeout=5)
+        self.assertEqual(finished.status, "SUCCEEDED")
+        self.assertEqual(finished.rows_total, 10)
+        self.assertEqual(ran, [job.job_id])
+
+    def test_processes_sharing_a_store_see_one_queue_and_one_owner(self):
+        db_path = _db_path()
+        started = threading.Event()
+
+        async def run_job(job, progress):
+            started.set()
+            for batch in range(1, 500):
+                await asyncio.sleep(0.01)
+                progress("upserted", rows_fetched=batch, rows_embedded=batch, rows_upserted=batch)
+
+        owner = self._queue(run_job, db_path=db_path, workers=1)
+        # A second API process: it enqueues and cancels but never starts workers.
+        front = self._queue(lambda job, progress: None, db_path=db_path)
+
+        job = front.enqueue("ds", "v1", rows_total=500)
+        self.assertEqual(owner.enqueue("ds", "v1").job_id, job.job_id)
+        owner.start()
+        self.assertTrue(started.wait(5))
+
+        running = front.wait(job.job_id, timeout=0.1)
+        self.assertEqual(running.status, "RUNNING")
+        self.assertIsNotNone(running.owner)
+        self.assertEqual(front.backlog()[0], 0)
+
+        front.cancel(job.job_id)
+        self.assertEqual(front.wait(job.job_id, timeout=5).status, "CANCELLED")
+        self.assertEqual(owner.get(job.job_id).status, "CANCELLED")
+        self.assertEqual(front.snapshot()["recent"][0].job_id, job.job_id)
+
+    def test_stop_requeues_running_job(self):
+        started = threading.Event()
+
+        async def run_job(job, progress):
+            started.set()
+            while True:
+                await asyncio.sleep(0.01)
+                progress("upserted", rows_fetched=1, rows_embedded=1, rows_upserted=1)
+
+        queue = self._queue(run_job, workers=1)
+        job = queue.enqueue("ds", "v1")
+        queue.start()
+        self.assertTrue(started.wait(5))
+        queue.stop(timeout=5)
+
+        self.assertEqual(job.status, "QUEUED")
+        self.assertEqual(job.attempts, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from datetime import datetime, timedelta, timezone
 
+from api.models import L1Rules, StatusEnum
 from api.services.ingestor import IngestorService
 
 
@@ -33,6 +34,97 @@ class IngestorServiceTests(unittest.TestCase):
         self.assertEqual(report.freshness_delay_sec, -1)
         self.assertEqual(report.details["freshness_known"], False)
 
+    def test_validate_l1_reports_exact_url_and_caption_duplicates(self):
+        service = IngestorService()
+        report = service.validate_l1(
+            [
+                {"image_url": "u1", "caption": "A beach", "source_id": "s1"},
+                {"image_url": "u2", "caption": "a  BEACH ", "source_id": "s1"},
+                {"image_url": "u1", "caption": "A city", "source_id": "s2"},
+                {"image_url": "u3", "caption": "A forest", "source_id": "s2"},
+            ]
+        )
+
+        self.assertEqual(report.details["exact_url_duplicates"], 1)
+        self.assertEqual(report.details["exact_caption_duplicates"], 1)
+        self.assertEqual(report.details["duplicate_rows"], 2)
+        self.assertAlmostEqual(report.details["duplicate_rate"], 0.5)
+        self.assertEqual(report.details["duplicate_clusters"][0]["rows"], [0, 1, 2])
+
+    def test_validate_l1_merges_near_duplicates_from_version_and_parent(self):
+        service = IngestorService()
+        rows = [{"image_url": f"u{i}", "caption": f"c{i}", "source_id": "s"} for i in range(4)]
+        near_duplicates = [
+            {"row_index": 2, "match_version": "v2", "match_row_index": 0, "same_version": True, "score": 0.99},
+            {"row_index": 3, "match_version": "v1", "match_row_index": 7, "same_version": False, "score": 0.98},
+        ]
+
+        report = service.validate_l1(rows, near_duplicates=near_duplicates)
+
+        self.assertEqual(report.details["near_duplicates"], 2)
+        self.assertEqual(report.details["duplicate_rows"], 2)
+        self.assertEqual(report.details["duplicate_cluster_count"], 2)
+        parent_cluster = next(c for c in report.details["duplicate_clusters"] if c["parent_rows"])
+        self.assertEqual(parent_cluster["rows"], [3])
+        self.assertEqual(parent_cluster["parent_rows"], [{"version": "v1", "row_index": 7}])
+
+    def test_soft_rules_report_every_violation_in_one_pass(self):
+        service = IngestorService()
+        old = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+        rows = (
+            {
+                "image_url": f"u{i}",
+                "caption": "x" * (i % 30),
+                "source_id": "cam" if i % 4 else "other",
+                "captured_at": old,
+                "gps": None if i % 2 else "1,2",
+            }
+            for i in range(40)
+        )
+        rules = L1Rules(
+            min_rows=40,
+            max_freshness_delay_sec=3600,
+            caption_min_chars=5,
+            max_caption_length_violation_rate=0.1,
+            max_null_rate={"gps": 0.25},
+            max_source_share=0.6,
+        )
+
+        report = service.validate_l1(rows, rules=rules)
+
+        self.assertTrue(report.schema_passed)
+        self.assertEqual(report.l1_status, StatusEnum.WARN)
+        violations = report.details["violations"]
+        self.assertEqual([v.split(":")[0] for v in violations], ["freshness", "caption_length", "null_rate", "source_share"])
+        self.assertEqual(report.details["null_rates"]["gps"], 0.5)
+        self.assertEqual(report.details["source_counts"], {"cam": 30, "other": 10})
+        self.assertEqual(report.details["caption_length"]["histogram"]["0-9"], 20)
+        self.assertEqual((report.details["caption_length"]["min"], report.details["caption_length"]["max"]), (0, 29))
+
+        strict = rules.model_copy(update={"min_rows": 1, "soft_status": "BLOCK"})
+        report = service.validate_l1([{"image_url": "u", "caption": "c", "source_id": "s"}] * 3, rules=strict)
+        self.assertEqual(report.l1_status, StatusEnum.BLOCK)
+
+    def test_schema_and_volume_block_and_defaults_pass_clean_data(self):
+        service = IngestorService()
+        rows = [{"image_url": f"u{i}", "caption": f"c{i}", "source_id": "s"} for i in range(10)]
+
+        self.assertEqual(service.validate_l1(rows).l1_status, StatusEnum.PASS)
+        self.assertEqual(service.validate_l1(rows[:9]).l1_status, StatusEnum.BLOCK)
+        report = service.validate_l1(rows + [{"image_url": "u", "caption": None, "source_id": "s"}])
+        self.assertFalse(report.schema_passed)
+        self.assertEqual(report.details["schema_failures"], 1)
+        self.assertEqual(report.l1_status, StatusEnum.BLOCK)
+
+    def test_source_counts_are_bounded(self):
+        evaluation = IngestorService().start_l1(L1Rules(min_rows=0))
+        evaluation.observe({"image_url": f"u{i}", "caption": "c", "source_id": f"s{i}"} for i in range(1500))
+
+        self.assertEqual(len(evaluation.source_counts), evaluation.MAX_TRACKED_SOURCES)
+        details = evaluation.report().details
+        self.assertEqual(details["untracked_source_rows"], 500)
+        self.assertEqual(len(details["source_counts"]), evaluation.MAX_REPORTED_SOURCES)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,82 @@
+import io
+import json
+import unittest
+
+from api.services.json_stream import NdjsonDecoder, NdjsonError, iter_object_members
+
+
+def _members(data: bytes, chunk_size: int):
+    members = {}
+    for key, value in iter_object_members(io.BytesIO(data), "raw_data", chunk_size=chunk_size):
+        members[key] = list(value) if key == "raw_data" else value
+    return members
+
+
+class IterObjectMembersTests(unittest.TestCase):
+    def test_matches_json_loads_at_any_chunk_boundary(self):
+        doc = {
+            "raw_data": [{"caption": "é" * i, "score": i / 3} for i in range(50)],
+            "dataset": {"dataset_id": "demo", "count": 12345},
+            "tail": 7,
+        }
+        data = json.dumps(doc).encode("utf-8")
+
+        for chunk_size in (1, 2, 7, 64, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(_members(data, chunk_size), doc)
+
+    def test_streamed_array_is_lazy(self):
+        data = b'{"raw_data": [{"a": 1}, {"a": 2}, oops]}'
+        items = None
+        for key, value in iter_object_members(io.BytesIO(data), "raw_data", chunk_size=4):
+            items = value
+            self.assertEqual(next(items), {"a": 1})
+            self.assertEqual(next(items), {"a": 2})
+            with self.assertRaises(json.JSONDecodeError):
+                next(items)
+            break
+        self.assertIsNotNone(items)
+
+    def test_malformed_input_raises_decode_error(self):
+        for data in (b'{"raw_data": [1, 2', b'{"a": 1} trailing', b"[1]", b'{"raw_data": [1 2]}', b'{"raw_data": 5}'):
+            with self.subTest(data=data), self.assertRaises(json.JSONDecodeError):
+                _members(data, 3)
+
+    def test_empty_object_and_array(self):
+        self.assertEqual(_members(b" {} ", 2), {})
+        self.assertEqual(_members(b'{"raw_data": [ ]}', 2), {"raw_data": []})
+
+
+class NdjsonDecoderTests(unittest.TestCase):
+    def test_decodes_lines_split_at_any_chunk_boundary(self):
+        rows = [{"caption": "é" * i, "n": i} for i in range(20)]
+        data = ("\n".join(json.dumps(row, ensure_ascii=False) for row in rows) + "\n\n").encode("utf-8")
+
+        for chunk_size in (1, 3, 64, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                decoder = NdjsonDecoder()
+                decoded = []
+                for start in range(0, len(data), chunk_size):
+                    decoded.extend(decoder.feed(data[start : start + chunk_size]))
+                decoded.extend(decoder.close())
+                self.assertEqual([value for _, value in decoded], rows)
+                self.assertEqual([line for line, _ in decoded], list(range(1, 21)))
+
+    def test_last_line_needs_no_newline_and_errors_carry_line_numbers(self):
+        decoder = NdjsonDecoder()
+        self.assertEqual(decoder.feed(b'{"a": 1}\n\n{"a"'), [(1, {"a": 1})])
+        self.assertEqual(decoder.feed(b': 2}'), [])
+        self.assertEqual(decoder.close(), [(3, {"a": 2})])
+
+        decoder = NdjsonDecoder()
+        with self.assertRaises(NdjsonError) as caught:
+            decoder.feed(b'{"a": 1}\n\n{oops}\n')
+        self.assertEqual(caught.exception.line, 3)
+
+        decoder = NdjsonDecoder(max_line_bytes=8)
+        with self.assertRaises(NdjsonError):
+            decoder.feed(b'{"caption": "far too long')
+
+
+if __name__ == "__main__":
+    unittest.main()
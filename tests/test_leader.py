@@ -0,0 +1,30 @@
+import os
+import tempfile
+import unittest
+
+from api.services.leader import LeaderLock, fcntl
+
+
+@unittest.skipIf(fcntl is None, "leader election needs fcntl")
+class LeaderLockTests(unittest.TestCase):
+    def test_one_holder_at_a_time_and_takeover_after_release(self):
+        path = os.path.join(tempfile.mkdtemp(prefix="leader-"), "leader.lock")
+        # Separate open file descriptions contend for flock exactly like separate processes.
+        first, second = LeaderLock(path), LeaderLock(path)
+        self.addCleanup(first.release)
+        self.addCleanup(second.release)
+
+        self.assertTrue(first.try_acquire())
+        self.assertTrue(first.try_acquire())
+        self.assertFalse(second.try_acquire())
+        self.assertFalse(second.is_leader)
+
+        first.release()
+        self.assertTrue(second.try_acquire())
+        self.assertTrue(second.is_leader)
+        with open(path) as handle:
+            self.assertEqual(handle.read().strip(), str(os.getpid()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import api.main as main_module
+from api.models import DatasetObject, StatusEnum
+from api.services.event_bus import EventBus
+from api.services.registry import DatasetRegistry
+
+
+class ConditionalGetTests(unittest.TestCase):
+    def setUp(self):
+        registry_patcher = patch.object(main_module, "dataset_registry", DatasetRegistry(":memory:"))
+        registry_patcher.start()
+        self.addCleanup(registry_patcher.stop)
+        bus_patcher = patch.object(main_module, "event_bus", EventBus(history_size=100))
+        bus_patcher.start()
+        self.addCleanup(bus_patcher.stop)
+        for dataset_id in ("demo", "other"):
+            main_module.dataset_registry[f"{dataset_id}:v1"] = DatasetObject(
+                dataset_id=dataset_id, version="v1", source_id="src", status=StatusEnum.PASS
+            )
+        self.client = TestClient(main_module.app)
+
+    def _revalidate(self, path):
+        first = self.client.get(path)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+        second = self.client.get(path, headers={"If-None-Match": etag})
+        return etag, second
+
+    def test_unchanged_reads_return_304_without_body(self):
+        for path in ("/datasets/", "/datasets/stats", "/datasets/demo", "/datasets/demo/v/v1"):
+            with self.subTest(path=path):
+                etag, second = self._revalidate(path)
+                self.assertEqual(second.status_code, 304)
+                self.assertEqual(second.content, b"")
+                self.assertEqual(second.headers["ETag"], etag)
+
+    def test_status_change_invalidates_global_and_dataset_tags(self):
+        list_tag, _ = self._revalidate("/datasets/")
+        demo_tag, _ = self._revalidate("/datasets/demo")
+        other_tag, _ = self._revalidate("/datasets/other")
+
+        response = self.client.post("/datasets/demo/v/v1/manual-override", params={"override_status": "WARN"})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get("/datasets/", headers={"If-None-Match": list_tag}).status_code, 200)
+        self.assertEqual(self.client.get("/datasets/demo", headers={"If-None-Match": demo_tag}).status_code, 200)
+        self.assertEqual(self.client.get("/datasets/other", headers={"If-None-Match": other_tag}).status_code, 304)
+
+    def test_304_skips_vector_store_reads(self):
+        with patch.object(main_module.pipeline.vdb, "get_samples", return_value=(["img"], ["cap"])) as get_samples:
+            etag, second = self._revalidate("/datasets/demo/v/v1/samples")
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(get_samples.call_count, 1)
+
+    def test_if_none_match_accepts_lists_wildcard_and_strong_form(self):
+        etag = main_module.dataset_registry.etag()
+        self.assertTrue(main_module.etag_matches(f'"stale", {etag}', etag))
+        self.assertTrue(main_module.etag_matches(etag[2:], etag))
+        self.assertTrue(main_module.etag_matches("*", etag))
+        self.assertFalse(main_module.etag_matches('W/"stale"', etag))
+        self.assertFalse(main_module.etag_matches(None, etag))
+
+
+if __name__ == "__main__":
+    unittest.main()
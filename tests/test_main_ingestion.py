@@ -0,0 +1,232 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import api.main as main_module
+from api.models import L1Report, StatusEnum
+from api.services.admission import AdmissionController
+from api.services.audit_scheduler import AuditScheduler
+from api.services.blob_store import BlobStore
+from api.services.event_bus import EventBus
+from api.services.ingestion_queue import IngestionQueue
+from api.services.raw_store import RawDataStore
+from api.services.registry import DatasetRegistry
+
+
+PAYLOAD = {
+    "dataset": {"dataset_id": "demo", "version": "v1", "source_id": "src-1"},
+    "raw_data": [
+        {"image_url": f"https://example.com/img{i}.jpg", "caption": f"caption {i}", "source_id": "src-1"}
+        for i in range(3)
+    ],
+}
+
+
+class IngestionEndpointTests(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.mkdtemp(prefix="ingestion-")
+        self.queue = IngestionQueue(
+            run_job=main_module.run_ingestion_job,
+            on_change=main_module.handle_ingestion_job_change,
+            db_path=f"{workdir}/jobs.db",
+            workers=1,
+            max_attempts=1,
+        )
+        for name, value in (
+            ("dataset_registry", DatasetRegistry(":memory:")),
+            ("event_bus", EventBus(history_size=100)),
+            ("raw_store", RawDataStore(BlobStore(workdir))),
+            ("ingestion_queue", self.queue),
+            ("admission", AdmissionController(self.queue)),
+            ("audit_scheduler", AuditScheduler(run_audit=main_module.run_scheduled_l2_audit, db_path=f"{workdir}/jobs.db")),
+        ):
+            patcher = patch.object(main_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Stop workers before the patches are undone, so late job callbacks never reach the real services.
+        self.addCleanup(self.queue.stop, 5)
+
+        self.ingested = []
+        self.rules = []
+        patcher = patch.object(main_module.pipeline, "process_ingestion", self._fake_ingestion)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(main_module.app)
+
+    async def _fake_ingestion(self, dataset_id, version, raw_data, parent_version=None, on_progress=None, rules=None):
+        rows = list(raw_data)
+        self.ingested.append((dataset_id, version, rows))
+        self.rules.append(rules)
+        if rows and rows[0]["caption"] == "explode":
+            raise ValueError("raw_data[0] is unusable")
+        on_progress("upserted", rows_fetched=len(rows), rows_embedded=len(rows), rows_upserted=len(rows))
+        return L1Report(
+            schema_passed=True,
+            volume_actual=len(rows),
+            volume_expected=10,
+            freshness_delay_sec=0,
+            l1_status=StatusEnum.BLOCK,
+        )
+
+    def _create(self, payload=PAYLOAD):
+        response = self.client.post("/datasets/", json=payload)
+        self.assertEqual(response.status_code, 200)
+        return response.headers["Location"].rsplit("/", 1)[-1]
+
+    def test_create_queues_job_that_ingests_stored_rows(self):
+        job_id = self._create()
+        self.assertEqual(self.client.get(f"/ingestion-jobs/{job_id}").json()["status"], "QUEUED")
+
+        self.queue.start()
+        job = self.queue.wait(job_id, timeout=5)
+
+        self.assertEqual(job.status, "SUCCEEDED")
+        self.assertEqual(job.rows_total, 3)
+        self.assertEqual(job.rows_upserted, 3)
+        self.assertEqual(self.ingested[0][2], PAYLOAD["raw_data"])
+        dataset = self.client.get("/datasets/demo/v/v1").json()
+        self.assertEqual(dataset["l1_report"]["volume_actual"], 3)
+        # The report is published without a separate validate-l1 call.
+        self.assertEqual((dataset["status"], dataset["status_source"]), ("BLOCK", "L1"))
+        self.assertEqual(self.rules[0].min_rows, 10)
+
+    def test_per_dataset_l1_rules_are_used_by_ingestion(self):
+        self.assertEqual(self.client.get("/datasets/demo/l1-rules").json()["min_rows"], 10)
+        response = self.client.put("/datasets/demo/l1-rules", json={"min_rows": 2, "max_source_share": 0.5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.put("/datasets/demo/l1-rules", json={"max_source_share": 2}).status_code, 422)
+
+        self.queue.start()
+        self.queue.wait(self._create(), timeout=5)
+        self.assertEqual((self.rules[0].min_rows, self.rules[0].max_source_share), (2, 0.5))
+
+        self.assertEqual(self.client.delete("/datasets/demo/l1-rules").json()["min_rows"], 10)
+        self.assertIsNone(main_module.dataset_registry.l1_rules("demo"))
+
+    def test_reingest_reruns_pipeline_from_stored_raw_data(self):
+        self.queue.start()
+        self.queue.wait(self._create(), timeout=5)
+
+        response = self.client.post("/datasets/demo/v/v1/reingest")
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        self.assertEqual(body["job"]["trigger"], "REINGEST")
+        self.assertEqual(body["dataset"]["status"], "VALIDATING")
+
+        self.assertEqual(self.queue.wait(body["job"]["job_id"], timeout=5).status, "SUCCEEDED")
+        self.assertEqual(len(self.ingested), 2)
+        self.assertEqual(self.ingested[1][2], self.ingested[0][2])
+
+    def test_reingest_without_stored_raw_data_is_rejected(self):
+        self._create()
+        main_module.raw_store.delete("demo", "v1")
+        self.queue.cancel(self.queue.active_job("demo", "v1").job_id)
+
+        self.assertEqual(self.client.post("/datasets/demo/v/v1/reingest").status_code, 409)
+        self.assertEqual(self.client.post("/datasets/missing/v/v1/reingest").status_code, 404)
+
+    def test_failed_ingestion_blocks_dataset(self):
+        payload = {**PAYLOAD, "raw_data": [{**PAYLOAD["raw_data"][0], "caption": "explode"}]}
+        job_id = self._create(payload)
+        self.queue.start()
+
+        self.assertEqual(self.queue.wait(job_id, timeout=5).status, "FAILED")
+        dataset = self.client.get("/datasets/demo/v/v1").json()
+        self.assertEqual(dataset["status"], "BLOCK")
+        self.assertIn("Ingestion failed", dataset["status_history"][-1]["reason"])
+
+    def _upload(self, lines, version="v2", **params):
+        body = "".join(f"{line}\n" for line in lines).encode("utf-8")
+        return self.client.post(
+            f"/datasets/demo/v/{version}/rows",
+            params={"source_id": "src-1", **params},
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    def test_ndjson_upload_creates_version_and_ingests_rows(self):
+        self.queue.start()
+        lines = [json.dumps(row) for row in PAYLOAD["raw_data"]]
+        response = self._upload(lines[:2] + [""] + lines[2:], lineage_parent_version="v1", tags=["a", "b"])
+
+        self.assertEqual(response.status_code, 202, response.text)
+        body = response.json()
+        self.assertEqual(body["rows_received"], 3)
+        self.assertEqual(body["job"]["trigger"], "UPLOAD")
+        self.assertEqual(body["dataset"]["tags"], ["a", "b"])
+        self.assertEqual(response.headers["Location"], f"/ingestion-jobs/{body['job']['job_id']}")
+
+        job = self.queue.wait(body["job"]["job_id"], timeout=5)
+        self.assertEqual(job.status, "SUCCEEDED")
+        self.assertEqual(job.rows_total, 3)
+        self.assertEqual(self.ingested[0][:2], ("demo", "v2"))
+        self.assertEqual(self.ingested[0][2], PAYLOAD["raw_data"])
+        self.assertEqual(self._upload(lines).status_code, 400)
+
+    def test_invalid_ndjson_row_aborts_the_upload(self):
+        self.queue.start()
+        lines = [json.dumps(PAYLOAD["raw_data"][0]), json.dumps({"caption": "no url"})]
+        response = self._upload(lines)
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["detail"][0]["loc"][:2], ["body", 2])
+        job = self.queue.active_job("demo", "v2") or self.queue.store.recent(1)[0]
+        job = self.queue.wait(job.job_id, timeout=5)
+        self.assertIn(job.status, ("CANCELLED", "FAILED"))
+        dataset = self.client.get("/datasets/demo/v/v2").json()
+        self.assertEqual(dataset["status"], "BLOCK")
+        self.assertFalse(main_module.raw_store.exists("demo", "v2"))
+
+        self.assertEqual(self._upload(["{not json"], version="v3").json()["detail"][0]["loc"], ["body", 1])
+
+    def test_import_ingests_a_local_manifest_in_place(self):
+        root = tempfile.mkdtemp(prefix="import-")
+        manifest_path = f"{root}/rows.jsonl"
+        with open(manifest_path, "w", encoding="utf-8") as handle:
+            for i in range(3):
+                handle.write(json.dumps({"image_url": f"images/{i}.jpg", "caption": f"caption {i}"}) + "\n")
+        patcher = patch.object(main_module.pipeline.embedder, "local_roots", [root])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        payload = {"dataset": {"dataset_id": "demo", "version": "v3", "source_id": "src-9"}, "manifest": {"path": manifest_path}}
+
+        response = self.client.post("/datasets/import", json=payload)
+        self.assertEqual(response.status_code, 200, response.text)
+        job_id = response.headers["Location"].rsplit("/", 1)[-1]
+        self.queue.start()
+        job = self.queue.wait(job_id, timeout=5)
+
+        self.assertEqual((job.status, job.trigger, job.rows_total), ("SUCCEEDED", "IMPORT", 3))
+        self.assertEqual(
+            self.ingested[0][2][1],
+            {"image_url": os.path.join(os.path.realpath(root), "images", "1.jpg"), "caption": "caption 1", "source_id": "src-9"},
+        )
+        # Only the reference is stored, and re-ingestion reads the file again.
+        self.assertFalse(os.path.exists(main_module.raw_store.path("demo", "v3")))
+        reingest = self.client.post("/datasets/demo/v/v3/reingest").json()
+        self.assertEqual(reingest["job"]["rows_total"], 3)
+
+        self.assertEqual(self.client.post("/datasets/import", json=payload).status_code, 400)
+        outside = {**payload, "dataset": {**payload["dataset"], "version": "v4"}, "manifest": {"path": "/etc/passwd"}}
+        response = self.client.post("/datasets/import", json=outside)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("outside LOCAL_SOURCE_ROOTS", response.json()["detail"])
+        self.assertNotIn("demo:v4", main_module.dataset_registry)
+
+    def test_cancel_endpoint(self):
+        job_id = self._create()
+
+        response = self.client.post(f"/ingestion-jobs/{job_id}/cancel")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "CANCELLED")
+        dataset = self.client.get("/datasets/demo/v/v1").json()
+        self.assertEqual((dataset["status"], dataset["status_source"]), ("BLOCK", "SYSTEM"))
+        self.assertEqual(self.client.post("/ingestion-jobs/missing/cancel").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import api.main as main_module
+from api.models import DatasetObject, L1Report, StatusEnum, StatusHistoryItem
+from api.services.event_bus import EventBus
+from api.services.registry import DatasetRegistry
+
+
+class ProjectionAndHistoryTests(unittest.TestCase):
+    def setUp(self):
+        registry_patcher = patch.object(main_module, "dataset_registry", DatasetRegistry(":memory:", history_limit=5))
+        registry_patcher.start()
+        self.addCleanup(registry_patcher.stop)
+        bus_patcher = patch.object(main_module, "event_bus", EventBus(history_size=100))
+        bus_patcher.start()
+        self.addCleanup(bus_patcher.stop)
+        ds = DatasetObject(
+            dataset_id="demo",
+            version="v1",
+            source_id="src",
+            l1_report=L1Report(schema_passed=True, volume_actual=3, volume_expected=3, freshness_delay_sec=0),
+        )
+        main_module.dataset_registry["demo:v1"] = ds
+        for n in range(12):
+            main_module.apply_status(ds, StatusEnum.WARN if n % 2 else StatusEnum.PASS, "MANUAL", reason=f"change {n}")
+        self.client = TestClient(main_module.app)
+
+    def test_full_view_is_unchanged_but_history_is_bounded(self):
+        version = self.client.get("/datasets/demo/v/v1").json()
+        self.assertIn("l1_report", version)
+        self.assertEqual(len(version["status_history"]), 5)
+        self.assertEqual(version["status_history_archived"], 7)
+        self.assertEqual(version["status_history"][-1]["reason"], "change 11")
+
+    def test_summary_view_and_field_projection(self):
+        summary = self.client.get("/datasets/demo", params={"view": "summary"}).json()
+        self.assertEqual(len(summary), 1)
+        self.assertNotIn("status_history", summary[0])
+        self.assertNotIn("l1_report", summary[0])
+        self.assertEqual(summary[0]["status"], "WARN")
+
+        picked = self.client.get("/datasets/demo/v/v1", params={"fields": "status, created_at"}).json()
+        self.assertEqual(set(picked), {"dataset_id", "version", "status", "created_at"})
+
+        response = self.client.get("/datasets/demo", params={"fields": "status,nope"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/datasets/demo", params={"view": "tiny"}).status_code, 400)
+
+    def test_projection_shrinks_the_payload_and_keeps_the_etag(self):
+        full = self.client.get("/datasets/demo")
+        summary = self.client.get("/datasets/demo", params={"view": "summary"})
+        self.assertLess(len(summary.content), len(full.content) / 3)
+        self.assertEqual(summary.headers["ETag"], full.headers["ETag"])
+        again = self.client.get("/datasets/demo", params={"view": "summary"}, headers={"If-None-Match": summary.headers["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+    def test_history_pages_cover_archived_items_newest_first(self):
+        reasons = []
+        offset = 0
+        while True:
+            page = self.client.get("/datasets/demo/v/v1/history", params={"offset": offset, "limit": 4}).json()
+            self.assertEqual(page["total"], 12)
+            if not page["items"]:
+                break
+            reasons.extend(item["reason"] for item in page["items"])
+            offset += 4
+        self.assertEqual(reasons, [f"change {n}" for n in range(11, -1, -1)])
+
+        self.assertEqual(self.client.get("/datasets/demo/v/v2/history").status_code, 404)
+        self.assertEqual(self.client.get("/datasets/demo/v/v1/history", params={"limit": 0}).status_code, 400)
+
+    def test_dashboard_endpoints_serialize_the_same_json(self):
+        listed = self.client.get("/datasets/")
+        self.assertEqual(listed.headers["content-type"], "application/json")
+        self.assertEqual(listed.json()[0]["latest_version"], "v1")
+        stats = json.loads(self.client.get("/datasets/stats").content)
+        self.assertEqual(stats["by_status"]["WARN"], 1)
+        self.assertEqual(stats["recent_activity"][0]["source"], "MANUAL")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,42 @@
+import asyncio
+import tempfile
 import unittest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
 import api.main as main_module
+from api.services.admission import AdmissionController
+from api.services.blob_store import BlobStore
+from api.services.event_bus import EventBus
+from api.services.ingestion_queue import IngestionQueue
+from api.services.raw_store import RawDataStore
+from api.services.registry import DatasetRegistry
 
 
 class StatusHistoryTests(unittest.TestCase):
     def setUp(self):
-        main_module.dataset_registry.clear()
+        registry_patcher = patch.object(main_module, "dataset_registry", DatasetRegistry(":memory:"))
+        registry_patcher.start()
+        self.addCleanup(registry_patcher.stop)
+        bus_patcher = patch.object(main_module, "event_bus", EventBus(history_size=100))
+        bus_patcher.start()
+        self.addCleanup(bus_patcher.stop)
+        # Keep L1 PASS from queueing background audits against the real scheduler state.
+        patcher = patch.object(main_module, "schedule_l2_if_eligible")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Ingestion jobs are queued but never run: no workers are started.
+        workdir = tempfile.mkdtemp(prefix="status-history-")
+        queue = IngestionQueue(run_job=main_module.run_ingestion_job, db_path=f"{workdir}/jobs.db")
+        for name, value in (
+            ("raw_store", RawDataStore(BlobStore(workdir))),
+            ("ingestion_queue", queue),
+            ("admission", AdmissionController(queue)),
+        ):
+            patcher = patch.object(main_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
         self.client = TestClient(main_module.app)
 
     def _create_dataset(self):
@@ -22,8 +50,7 @@ class StatusHistoryTests(unittest.TestCase):
                 {"image_url": "https://example.com/img1.jpg", "caption": "caption 1", "source_id": "src-1"}
             ],
         }
-        with patch.object(main_module, "start_ingestion_task", new=AsyncMock()):
-            response = self.client.post("/datasets/", json=payload)
+        response = self.client.post("/datasets/", json=payload)
         self.assertEqual(response.status_code, 200)
         return response.json()
 
@@ -76,6 +103,57 @@ class StatusHistoryTests(unittest.TestCase):
         self.assertEqual(history[-1]["source"], "L2")
         self.assertEqual(history[-1]["reason"], "Need human review")
 
+    def test_stats_route_is_not_shadowed_and_counts_transitions(self):
+        self._create_dataset()
+        response = self.client.get("/datasets/stats")
+
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()
+        self.assertEqual(stats["total"], 1)
+        self.assertEqual(stats["by_status"]["VALIDATING"], 1)
+        self.assertEqual(stats["recent_activity"][0]["dataset_id"], "demo")
+        self.assertEqual(stats["recent_activity"][0]["status"], "VALIDATING")
+
+    def test_get_single_version(self):
+        self._create_dataset()
+
+        self.assertEqual(self.client.get("/datasets/demo/v/v2").json()["status"], "VALIDATING")
+        self.assertEqual(self.client.get("/datasets/demo/v/v9").status_code, 404)
+
+    def test_status_transitions_are_streamed_and_resumable(self):
+        class FakeRequest:
+            async def is_disconnected(self):
+                return True
+
+        async def read_frames(dataset_id, last_event_id):
+            # The fake client is already disconnected, so the stream ends after the replay.
+            subscription, replay, reset = main_module.event_bus.subscribe(dataset_id, last_event_id)
+            stream = main_module.status_event_stream(FakeRequest(), subscription, replay, reset, heartbeat_sec=0.01)
+            return [frame async for frame in stream]
+
+        self._create_dataset()
+        live_frames = []
+
+        async def live():
+            subscription, replay, reset = main_module.event_bus.subscribe(dataset_id="demo")
+            stream = main_module.status_event_stream(FakeRequest(), subscription, replay, reset, heartbeat_sec=0.01)
+            self.assertEqual(await stream.__anext__(), "retry: 3000\n\n")
+            ds = main_module.dataset_registry.get("demo:v2")
+            main_module.apply_status(ds, main_module.StatusEnum.PASS, "MANUAL", reason="ok")
+            live_frames.append(await stream.__anext__())
+            await stream.aclose()
+
+        asyncio.run(live())
+        self.assertIn("event: status", live_frames[0])
+        self.assertIn('"status":"PASS"', live_frames[0])
+        self.assertEqual(main_module.event_bus.subscriber_count(), 0)
+
+        resumed = asyncio.run(read_frames(dataset_id="demo", last_event_id=1))
+        self.assertEqual(len([f for f in resumed if f.startswith("id: ")]), 1)
+        self.assertIn('"status":"PASS"', resumed[1])
+        other = asyncio.run(read_frames(dataset_id="other", last_event_id=0))
+        self.assertEqual(other, ["retry: 3000\n\n"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,21 +1,54 @@
+import asyncio
+import os
+import tempfile
 import unittest
 from unittest.mock import AsyncMock, patch
 
+import httpx
 from fastapi.testclient import TestClient
 
 import api.main as main_module
-from api.models import DatasetObject, L2Reasoning, ReasoningTrace, StatusEnum
+from api.models import DatasetObject, JobStatusEnum, L1Report, L2Reasoning, ReasoningTrace, StatusEnum
+from api.services.audit_scheduler import AuditScheduler
+from api.services.registry import DatasetRegistry
+
+
+def trigger_and_wait(path: str):
+    """POST a trigger and wait for the queued audit job to finish."""
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(path)
+            if response.status_code != 202:
+                return response, None
+            job = await main_module.audit_scheduler.wait(response.json()["job_id"], timeout=5)
+            return response, job
+
+    return asyncio.run(scenario())
 
 
 class TriggerL2Tests(unittest.TestCase):
     def setUp(self):
-        main_module.dataset_registry.clear()
+        registry_patcher = patch.object(main_module, "dataset_registry", DatasetRegistry(":memory:"))
+        registry_patcher.start()
+        self.addCleanup(registry_patcher.stop)
         main_module.dataset_registry["demo:v2"] = DatasetObject(
             dataset_id="demo",
             version="v2",
             source_id="src-1",
             status=StatusEnum.VALIDATING,
         )
+        scheduler = AuditScheduler(
+            run_audit=main_module.run_scheduled_l2_audit,
+            scan=main_module.schedule_eligible_l2_audits,
+            db_path=os.path.join(tempfile.mkdtemp(prefix="l2-queue-"), "jobs.db"),
+            rate_per_minute=0,
+            scan_interval_sec=0,
+        )
+        patcher = patch.object(main_module, "audit_scheduler", scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.client = TestClient(main_module.app)
 
     @staticmethod
@@ -49,10 +82,14 @@ class TriggerL2Tests(unittest.TestCase):
         ]
         with patch.object(main_module.pipeline.vdb, "get_mean_vector", side_effect=[[1.0, 0.0], [0.0, 1.0]]):
             with patch.object(main_module.pipeline.vdb, "get_outlier_samples", return_value=outlier_samples):
-                with patch.object(main_module.gemini_svc, "audit_dataset", new=audit_mock):
-                    response = self.client.post("/datasets/demo/v/v2/trigger-l2")
+                with patch.object(main_module.clustering_svc, "representative_samples", return_value=None):
+                    with patch.object(main_module.gemini_svc, "audit_dataset", new=audit_mock):
+                        response, job = trigger_and_wait("/datasets/demo/v/v2/trigger-l2")
 
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], JobStatusEnum.QUEUED)
+        self.assertEqual(job.status, JobStatusEnum.SUCCEEDED)
+        self.assertEqual(job.result_status, StatusEnum.WARN)
         drift_stats, sample_images, sample_captions = audit_mock.await_args.args
         outlier_context = audit_mock.await_args.kwargs["outlier_context"]
         self.assertAlmostEqual(drift_stats["cosine_mean_shift"], 1.0)
@@ -61,14 +98,95 @@ class TriggerL2Tests(unittest.TestCase):
         self.assertEqual(outlier_context, outlier_samples)
         self.assertEqual(main_module.dataset_registry["demo:v2"].status, StatusEnum.WARN)
 
+    def test_trigger_l2_prefers_cluster_representatives(self):
+        audit_mock = AsyncMock(return_value=self._audit_result())
+        outlier_samples = [{"image_url": f"img-{i}", "caption": f"cap-{i}", "outlier_score": 0.9} for i in range(3)]
+        representatives = {
+            "clusters": [{"cluster_id": 1, "size": 40, "share": 0.4, "baseline_shift": 0.3}],
+            "samples": [
+                {"image_url": f"medoid-{i}", "caption": f"medoid-cap-{i}", "cluster_id": 1, "cluster_size": 40}
+                for i in range(3)
+            ],
+            "total_clusters": 3,
+            "total_points": 100,
+        }
+        with patch.object(main_module.pipeline.vdb, "get_mean_vector", side_effect=[[1.0, 0.0], [0.0, 1.0]]):
+            with patch.object(main_module.pipeline.vdb, "get_outlier_samples", return_value=outlier_samples):
+                with patch.object(main_module.clustering_svc, "representative_samples", return_value=representatives):
+                    with patch.object(main_module.gemini_svc, "audit_dataset", new=audit_mock):
+                        _, job = trigger_and_wait("/datasets/demo/v/v2/trigger-l2")
+
+        self.assertEqual(job.status, JobStatusEnum.SUCCEEDED)
+        _, sample_images, _ = audit_mock.await_args.args
+        self.assertEqual(sample_images, ["medoid-0", "medoid-1", "medoid-2"])
+        self.assertEqual(audit_mock.await_args.kwargs["cluster_context"], representatives["clusters"])
+
+    def test_concurrent_triggers_share_one_job(self):
+        calls = []
+
+        async def slow_audit(*args, **kwargs):
+            calls.append(kwargs.get("force_refresh"))
+            await asyncio.sleep(0.05)
+            return self._audit_result()
+
+        outlier_samples = [{"image_url": f"img-{i}", "caption": f"cap-{i}", "outlier_score": 0.5} for i in range(3)]
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main_module.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(
+                    client.post("/datasets/demo/v/v2/trigger-l2"),
+                    client.post("/datasets/demo/v/v2/trigger-l2"),
+                    client.post("/datasets/demo/v/v2/trigger-l2"),
+                )
+                job_id = responses[0].json()["job_id"]
+                await main_module.audit_scheduler.wait(job_id, timeout=5)
+                polled = await client.get(f"/l2-jobs/{job_id}")
+                return responses, polled
+
+        with patch.object(main_module.pipeline.vdb, "get_mean_vector", return_value=[1.0, 0.0]):
+            with patch.object(main_module.pipeline.vdb, "get_outlier_samples", return_value=outlier_samples):
+                with patch.object(main_module.clustering_svc, "representative_samples", return_value=None):
+                    with patch.object(main_module.gemini_svc, "audit_dataset", new=slow_audit):
+                        responses, polled = asyncio.run(scenario())
+
+        self.assertEqual([r.status_code for r in responses], [202, 202, 202])
+        self.assertEqual(len({r.json()["job_id"] for r in responses}), 1)
+        self.assertEqual(calls, [False])
+        self.assertEqual(polled.json()["status"], JobStatusEnum.SUCCEEDED)
+        self.assertFalse(main_module.l2_single_flight.in_flight(("demo", "v2", False)))
+
+    def test_l1_pass_schedules_automatic_audit(self):
+        report = L1Report(
+            schema_passed=True,
+            volume_actual=10,
+            volume_expected=10,
+            freshness_delay_sec=0,
+            l1_status=StatusEnum.PASS,
+        )
+        with patch.object(main_module.pipeline.vdb, "get_mean_vector", return_value=None):
+            with patch.object(main_module.audit_scheduler, "ensure_started"):
+                response = self.client.patch("/datasets/demo/v/v2/validate-l1", json=report.model_dump())
+                again = self.client.patch("/datasets/demo/v/v2/validate-l1", json=report.model_dump())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(again.status_code, 200)
+        queued = main_module.audit_scheduler.queued_jobs()
+        self.assertEqual([(job.dataset_id, job.version, job.trigger) for job in queued], [("demo", "v2", "AUTO")])
+
+    def test_unknown_job_returns_404(self):
+        response = self.client.get("/l2-jobs/missing")
+        self.assertEqual(response.status_code, 404)
+
     def test_trigger_l2_rejects_non_v2(self):
         response = self.client.post("/datasets/demo/v/v1/trigger-l2")
         self.assertEqual(response.status_code, 400)
 
     def test_trigger_l2_requires_both_versions_in_qdrant(self):
         with patch.object(main_module.pipeline.vdb, "get_mean_vector", side_effect=[None, [0.0, 1.0]]):
-            response = self.client.post("/datasets/demo/v/v2/trigger-l2")
-        self.assertEqual(response.status_code, 400)
+            _, job = trigger_and_wait("/datasets/demo/v/v2/trigger-l2")
+        self.assertEqual(job.status, JobStatusEnum.FAILED)
+        self.assertIn("Missing vector data", job.error)
 
     def test_trigger_l2_returns_404_when_dataset_missing(self):
         response = self.client.post("/datasets/unknown/v/v2/trigger-l2")
@@ -81,8 +199,9 @@ class TriggerL2Tests(unittest.TestCase):
                 "get_outlier_samples",
                 return_value=[{"image_url": "img", "caption": "cap", "outlier_score": 0.7}],
             ):
-                response = self.client.post("/datasets/demo/v/v2/trigger-l2")
-        self.assertEqual(response.status_code, 400)
+                _, job = trigger_and_wait("/datasets/demo/v/v2/trigger-l2")
+        self.assertEqual(job.status, JobStatusEnum.FAILED)
+        self.assertIn("at least 3 outlier samples", job.error)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import httpx
+
+try:
+    import fcntl  # noqa: F401
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKERS = 3
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _payload(dataset_id: str) -> dict:
+    return {
+        "dataset": {"dataset_id": dataset_id, "version": "v1", "source_id": "src-1"},
+        "raw_data": [{"image_url": "https://example.com/a.jpg", "caption": "caption", "source_id": "src-1"}],
+    }
+
+
+@unittest.skipIf(fcntl is None, "leader election needs fcntl")
+class MultiProcessDeploymentTests(unittest.TestCase):
+    """Several API processes sharing one data directory, as with ``uvicorn --workers N``.
+
+    Each process listens on its own port so a test can pick which one serves a request. The
+    vector DB is unreachable, so every ingestion fails fast on its single attempt and the owner
+    records an L1 BLOCK: enough to watch a job travel from one process to another.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data_dir = tempfile.mkdtemp(prefix="multiprocess-")
+        env = {
+            **os.environ,
+            "PYTHONPATH": REPO_ROOT,
+            "ALIGNOPS_DATA_DIR": cls.data_dir,
+            "WEB_CONCURRENCY": str(WORKERS),
+            "QDRANT_URL": "http://127.0.0.1:9",
+            "INGEST_MAX_ATTEMPTS": "1",
+            "JOB_POLL_INTERVAL_SEC": "0.1",
+            "EVENT_LOG_POLL_SEC": "0.05",
+            "EVENT_STREAM_HEARTBEAT_SEC": "0.5",
+            "LEADER_RETRY_SEC": "0.2",
+        }
+        cls.ports = [_free_port() for _ in range(WORKERS)]
+        cls.processes = [
+            subprocess.Popen(
+                # WEB_CONCURRENCY would make each uvicorn fork its own workers; these are the workers.
+                [sys.executable, "-m", "uvicorn", "api.main:app", "--workers", "1", "--port", str(port), "--log-level", "warning"],
+                cwd=REPO_ROOT,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            for port in cls.ports
+        ]
+        deadline = time.monotonic() + 90
+        for port in cls.ports:
+            while True:
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}/ingestion-jobs", timeout=1).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if time.monotonic() > deadline:
+                        cls.tearDownClass()
+                        raise RuntimeError("API workers did not start")
+                    time.sleep(0.2)
+
+    @classmethod
+    def tearDownClass(cls):
+        for process in cls.processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+        for process in cls.processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(cls.data_dir, ignore_errors=True)
+
+    def _url(self, worker: int, path: str) -> str:
+        return f"http://127.0.0.1:{self.ports[worker]}{path}"
+
+    def _live_workers(self):
+        return [i for i, process in enumerate(self.processes) if process.poll() is None]
+
+    def _create(self, worker: int, dataset_id: str) -> str:
+        response = httpx.post(self._url(worker, "/datasets/"), json=_payload(dataset_id), timeout=10)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.headers["Location"]
+
+    def _wait_for_job(self, worker: int, location: str) -> dict:
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            job = httpx.get(self._url(worker, location), timeout=5).json()
+            if job["status"] in ("SUCCEEDED", "FAILED", "CANCELLED"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"job {location} did not finish")
+
+    def test_version_created_on_one_worker_is_visible_on_all(self):
+        live = self._live_workers()
+        job = self._wait_for_job(live[-1], self._create(live[0], "mp-visible"))
+        self.assertEqual(job["status"], "FAILED")
+        # The owner records the BLOCK right after finishing the job.
+        deadline = time.monotonic() + 10
+        while httpx.get(self._url(live[0], "/datasets/mp-visible/v/v1"), timeout=5).json()["status"] != "BLOCK":
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+
+        tags = set()
+        for worker in live:
+            response = httpx.get(self._url(worker, "/datasets/mp-visible/v/v1"), timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["status"], "BLOCK")
+            tags.add(response.headers["ETag"])
+            listed = httpx.get(self._url(worker, "/datasets/"), timeout=5).json()
+            self.assertIn("mp-visible", [row["dataset_id"] for row in listed])
+        # Validators come from the shared change log, so a 304 from one worker holds on the others.
+        self.assertEqual(len(tags), 1)
+
+    def test_status_changes_reach_event_streams_on_other_workers(self):
+        live = self._live_workers()
+        received = []
+        connected = threading.Event()
+
+        def listen():
+            with httpx.stream("GET", self._url(live[-1], "/events?dataset_id=mp-events"), timeout=10) as response:
+                connected.set()
+                event_type = None
+                deadline = time.monotonic() + 20
+                for line in response.iter_lines():
+                    if line.startswith("event: "):
+                        event_type = line[len("event: "):]
+                    elif line.startswith("data: ") and event_type == "status":
+                        received.append(json.loads(line[len("data: "):]))
+                        if received[-1]["status"] == "BLOCK":
+                            return
+                    if time.monotonic() > deadline:
+                        return
+
+        listener = threading.Thread(target=listen, daemon=True)
+        listener.start()
+        self.assertTrue(connected.wait(10))
+        self._create(live[0], "mp-events")
+        listener.join(25)
+
+        # VALIDATING was published by the creating worker, BLOCK by whichever worker ran the job.
+        self.assertEqual([event["status"] for event in received], ["VALIDATING", "BLOCK"])
+        self.assertEqual(received[-1]["source"], "L1")
+
+    def test_jobs_run_once_on_a_single_owner_which_fails_over(self):
+        locations = [self._create(worker, f"mp-jobs-{worker}") for worker in range(WORKERS)]
+        jobs = [self._wait_for_job((i + 1) % WORKERS, location) for i, location in enumerate(locations)]
+
+        self.assertEqual({job["attempts"] for job in jobs}, {1})
+        owners = {job["owner"] for job in jobs}
+        self.assertEqual(len(owners), 1)
+        leader_pid = int(owners.pop().rsplit(":", 1)[1])
+        pids = [process.pid for process in self.processes]
+        self.assertIn(leader_pid, pids)
+
+        # Stop the leader; a standby takes the lock and runs the next job.
+        leader = self.processes[pids.index(leader_pid)]
+        leader.send_signal(signal.SIGTERM)
+        leader.wait(timeout=15)
+        survivor = self._live_workers()[0]
+        job = self._wait_for_job(survivor, self._create(survivor, "mp-failover"))
+        self.assertEqual(job["attempts"], 1)
+        new_leader_pid = int(job["owner"].rsplit(":", 1)[1])
+        self.assertNotEqual(new_leader_pid, leader_pid)
+        self.assertIn(new_leader_pid, [pids[i] for i in self._live_workers()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+
+from api.models import L1Rules
+from api.services.ingestor import IngestorService
+from api.services.pipeline import DataPipeline
+
+
+def _rows(count):
+    return ({"image_url": f"img-{i}", "caption": f"cap-{i}", "source_id": "src"} for i in range(count))
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.calls = []
+
+    def init_collection(self):
+        pass
+
+    def delete_version(self, dataset_id, version):
+        self.calls.append(("delete", version))
+
+    async def upsert_dataset(self, dataset_id, version, items, start_index=0):
+        self.calls.append(("upsert", start_index, len(items)))
+
+    def find_near_duplicates(self, dataset_id, version, embeddings, start_index=0, **kwargs):
+        self.calls.append(("duplicates", start_index, len(embeddings)))
+        return []
+
+
+class FakeEmbedder:
+    def generate_embeddings_with_metadata(self, image_urls, captions):
+        return [{"embedding": [1.0, 0.0], "image_fetch_status": "OK", "fallback_used": False} for _ in image_urls]
+
+
+class DataPipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = DataPipeline.__new__(DataPipeline)
+        self.pipeline.vdb = FakeVectorDB()
+        self.pipeline.embedder = FakeEmbedder()
+        self.pipeline.ingestor = IngestorService()
+        self.pipeline.near_duplicate_threshold = 0.97
+        self.pipeline.batch_size = 256
+
+    def test_streams_rows_in_batches_with_cumulative_progress(self):
+        progress = []
+
+        report = asyncio.run(
+            self.pipeline.process_ingestion(
+                "ds",
+                "v1",
+                _rows(5),
+                batch_size=2,
+                on_progress=lambda stage, **counts: progress.append((stage, counts)),
+                rules=L1Rules(min_rows=5),
+            )
+        )
+
+        self.assertEqual(
+            self.pipeline.vdb.calls,
+            [
+                ("delete", "v1"),
+                ("upsert", 0, 2),
+                ("duplicates", 0, 2),
+                ("upsert", 2, 2),
+                ("duplicates", 2, 2),
+                ("upsert", 4, 1),
+                ("duplicates", 4, 1),
+            ],
+        )
+        self.assertEqual([stage for stage, _ in progress[:3]], ["fetched", "embedded", "upserted"])
+        self.assertEqual(progress[-1][1]["rows_upserted"], 5)
+        # Evaluated batch by batch in the same pass.
+        self.assertEqual((report.volume_actual, report.volume_expected, report.l1_status), (5, 5, "PASS"))
+
+    def test_progress_callback_can_stop_ingestion_between_batches(self):
+        def stop_after_first_batch(stage, **counts):
+            if counts["rows_upserted"] >= 2:
+                raise InterruptedError("stop")
+
+        with self.assertRaises(InterruptedError):
+            asyncio.run(
+                self.pipeline.process_ingestion("ds", "v1", _rows(6), batch_size=2, on_progress=stop_after_first_batch)
+            )
+        self.assertEqual([call for call in self.pipeline.vdb.calls if call[0] == "upsert"], [("upsert", 0, 2)])
+
+    def test_missing_fields_report_absolute_row_index(self):
+        rows = list(_rows(3))
+        del rows[2]["caption"]
+
+        with self.assertRaisesRegex(ValueError, r"raw_data\[2\] is missing required fields: caption"):
+            asyncio.run(self.pipeline.process_ingestion("ds", "v1", rows, batch_size=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from types import SimpleNamespace
+
+from api.services.projection import ProjectionService
+from api.services.vector_db import QdrantService
+
+
+class FakeVectorDB:
+    _extract_vector = staticmethod(QdrantService._extract_vector)
+
+    def __init__(self, points_by_version):
+        self.points_by_version = points_by_version
+        self.scans = []
+
+    def iter_points(self, dataset_id, version, with_payload=True, page_size=256):
+        self.scans.append(version)
+        for i, vector in enumerate(self.points_by_version.get(version, [])):
+            yield SimpleNamespace(
+                vector=vector,
+                payload={"row_index": i, "image_url": f"{version}-{i}", "caption": f"cap-{i}"},
+            )
+
+
+def _cluster(center, count, spread=0.01):
+    return [[center[0] + spread * i, center[1] - spread * i, center[2]] for i in range(count)]
+
+
+class ProjectionServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.vdb = FakeVectorDB(
+            {
+                "v1": _cluster([1.0, 0.0, 0.0], 20),
+                "v2": _cluster([0.0, 1.0, 0.0], 19) + [[0.0, 0.0, 1.0]],
+            }
+        )
+        self.service = ProjectionService(self.vdb, point_budget=100)
+
+    def test_project_separates_versions_and_flags_outlier(self):
+        result = self.service.project("demo", "v1", "v2", outlier_limit=1)
+
+        self.assertEqual(result["total_points"], {"v1": 20, "v2": 20})
+        v1_x = [p["x"] for p in result["points"] if p["version"] == "v1"]
+        v2_x = [p["x"] for p in result["points"] if p["version"] == "v2" and not p["is_outlier"]]
+        self.assertTrue(max(v1_x) < min(v2_x) or min(v1_x) > max(v2_x))
+
+        outliers = [p for p in result["points"] if p["is_outlier"]]
+        self.assertEqual([p["image_url"] for p in outliers], ["v2-19"])
+
+    def test_project_respects_point_budget(self):
+        result = self.service.project("demo", "v1", "v2", max_points=10)
+
+        self.assertEqual(result["point_budget"], 10)
+        self.assertEqual(len(result["points"]), 10)
+
+    def test_projection_is_cached_until_invalidated(self):
+        self.service.project("demo", "v1", "v2")
+        self.service.project("demo", "v1", "v2", max_points=4)
+        self.assertEqual(self.vdb.scans, ["v1", "v2"])
+
+        self.service.invalidate("demo")
+        self.service.project("demo", "v1", "v2")
+        self.assertEqual(self.vdb.scans, ["v1", "v2", "v1", "v2"])
+
+    def test_project_returns_none_without_vectors(self):
+        self.assertIsNone(self.service.project("demo", "v1", "v3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from api.services.prompt_builder import PromptBuilder, response_schema
+
+
+class PromptBuilderTests(unittest.TestCase):
+    def test_build_encodes_context_as_compact_table(self):
+        builder = PromptBuilder(token_budget=1000)
+        prompt = builder.build(
+            {"cosine_mean_shift": 0.123456789},
+            ["img-1"],
+            ["cap-1"],
+            outlier_context=[{"image_url": "img-1", "caption": "cap-1", "outlier_score": 0.987654321}],
+        )
+
+        self.assertIn('DRIFT {"cosine_mean_shift":0.1235}', prompt.text)
+        self.assertIn("image_url|caption|outlier_score", prompt.text)
+        self.assertIn("img-1|cap-1|0.988", prompt.text)
+        self.assertNotIn("0.987654321", prompt.text)
+
+    def test_build_deduplicates_samples(self):
+        builder = PromptBuilder(token_budget=1000)
+        prompt = builder.build(
+            {"cosine_mean_shift": 0.1},
+            ["img-1", "img-1", "img-2"],
+            ["A cat", " a  CAT", "A dog"],
+        )
+
+        self.assertEqual(prompt.samples_included, 2)
+        self.assertEqual(prompt.duplicates_removed, 1)
+
+    def test_build_respects_token_budget(self):
+        builder = PromptBuilder(token_budget=60)
+        images = [f"https://example.com/{i}.jpg" for i in range(50)]
+        captions = [f"caption number {i} " * 5 for i in range(50)]
+
+        prompt = builder.build({"cosine_mean_shift": 0.1}, images, captions)
+
+        self.assertGreaterEqual(prompt.samples_included, 1)
+        self.assertGreater(prompt.samples_dropped, 0)
+        self.assertLessEqual(prompt.estimated_tokens, 60 + builder.estimate_tokens("(99 lower-ranked samples omitted for budget)"))
+        self.assertIn("omitted for budget", prompt.text)
+
+    def test_response_schema_is_cached_and_omits_server_fields(self):
+        schema = response_schema()
+
+        self.assertIs(schema, response_schema())
+        self.assertNotIn("cache_hit", schema["properties"])
+        self.assertNotIn("cached_at", schema["properties"])
+        self.assertIn("reasoning_trace", schema["properties"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from api.models import ManifestSource
+from api.services.blob_store import BlobStore
+from api.services.raw_store import RawDataStore, UploadAborted
+
+
+def _row(i: int) -> dict:
+    return {"image_url": f"https://example.com/{i}.jpg", "caption": f"caption {i}", "source_id": "src"}
+
+
+class RawDataStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = RawDataStore(BlobStore(tempfile.mkdtemp(prefix="raw-")), poll_interval_sec=0.01)
+
+    def test_reader_follows_an_upload_in_progress(self):
+        upload = self.store.open_upload("demo", "v1")
+        upload.write([_row(0), _row(1)])
+        rows = self.store.iter_rows("demo", "v1")
+
+        # Rows already written are readable before the upload ends.
+        self.assertEqual([next(rows), next(rows)], [_row(0), _row(1)])
+
+        def finish():
+            # A line split across flushes must come back whole.
+            upload._handle.write('{"image_url": "https://example.com/2.jpg", ')
+            upload._handle.flush()
+            upload._handle.write('"caption": "caption 2", "source_id": "src"}\n')
+            upload.write([_row(3)])
+            upload.finish()
+
+        writer = threading.Timer(0.05, finish)
+        writer.start()
+        self.assertEqual(list(rows), [_row(2), _row(3)])
+        writer.join()
+        self.assertEqual(list(self.store.iter_rows("demo", "v1")), [_row(i) for i in range(4)])
+        self.assertTrue(self.store.exists("demo", "v1"))
+
+    def test_aborted_or_stalled_uploads_end_the_reader(self):
+        upload = self.store.open_upload("demo", "v1")
+        upload.write([_row(0)])
+        rows = self.store.iter_rows("demo", "v1")
+        self.assertEqual(next(rows), _row(0))
+        upload.abort()
+        with self.assertRaises(UploadAborted):
+            next(rows)
+        self.assertFalse(self.store.exists("demo", "v1"))
+
+        stalled = RawDataStore(self.store.blob_store, poll_interval_sec=0.01, upload_stall_timeout_sec=0.05)
+        stalled.open_upload("demo", "v2").write([_row(0)])
+        with self.assertRaises(UploadAborted):
+            list(stalled.iter_rows("demo", "v2"))
+
+    def test_committed_files_replace_an_upload(self):
+        self.store.open_upload("demo", "v1").abort()
+        self.store.save("demo", "v1", [_row(0)])
+
+        self.assertTrue(self.store.exists("demo", "v1"))
+        self.assertEqual(list(self.store.iter_rows("demo", "v1")), [_row(0)])
+        self.store.delete("demo", "v1")
+        self.assertFalse(os.listdir(os.path.dirname(self.store.path("demo", "v1"))))
+
+    def test_manifest_reference_replaces_stored_rows(self):
+        self.store.save("demo", "v1", [_row(0)])
+        manifest = ManifestSource(path="/mnt/datasets/rows.parquet", image_root="/mnt/datasets/images")
+
+        self.store.save_manifest("demo", "v1", manifest)
+        self.assertEqual(self.store.manifest("demo", "v1"), manifest)
+        self.assertTrue(self.store.exists("demo", "v1"))
+        self.assertFalse(os.path.exists(self.store.path("demo", "v1")))
+
+        self.store.save("demo", "v1", [_row(1)])
+        self.assertIsNone(self.store.manifest("demo", "v1"))
+        self.store.save_manifest("demo", "v2", manifest)
+        self.store.delete("demo", "v2")
+        self.assertFalse(self.store.exists("demo", "v2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
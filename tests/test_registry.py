@@ -0,0 +1,219 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from api.models import DatasetObject, StatusEnum, StatusHistoryItem
+from api.services.registry import DatasetRegistry
+
+
+def _dataset(dataset_id: str, version: str, minutes: int, status: StatusEnum = StatusEnum.PASS) -> DatasetObject:
+    return DatasetObject(
+        dataset_id=dataset_id,
+        version=version,
+        source_id="src",
+        status=status,
+        created_at=datetime(2026, 2, 7, tzinfo=timezone.utc) + timedelta(minutes=minutes),
+    )
+
+
+class DatasetRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(prefix="registry-"), "registry.db")
+        self.registry = DatasetRegistry(self.db_path)
+
+    def tearDown(self):
+        self.registry.close()
+
+    def test_behaves_like_the_dict_it_replaces(self):
+        ds = _dataset("demo", "v1", 0)
+        self.registry["demo:v1"] = ds
+
+        self.assertIn("demo:v1", self.registry)
+        self.assertNotIn("demo:v2", self.registry)
+        self.assertIs(self.registry.get("demo:v1"), ds)
+        self.assertIsNone(self.registry.get("demo:v2"))
+        self.assertEqual(len(self.registry), 1)
+        with self.assertRaises(KeyError):
+            self.registry["demo:v2"] = ds
+
+    def test_saved_changes_survive_reopen_and_load_lazily(self):
+        ds = _dataset("demo", "v1", 0, status=StatusEnum.VALIDATING)
+        self.registry.save(ds)
+        ds.status = StatusEnum.BLOCK
+        ds.status_source = "L1"
+        self.registry.save(ds)
+        self.registry.close()
+
+        reopened = DatasetRegistry(self.db_path)
+        self.assertEqual(reopened._objects, {})
+        loaded = reopened["demo:v1"]
+        self.assertEqual(loaded.status, StatusEnum.BLOCK)
+        self.assertEqual(loaded.status_source, "L1")
+        self.assertIs(reopened["demo:v1"], loaded)
+        reopened.close()
+
+    def test_list_queries_use_indexed_columns(self):
+        self.registry.save(_dataset("a", "v1", 0))
+        self.registry.save(_dataset("a", "v2", 10, status=StatusEnum.WARN))
+        self.registry.save(_dataset("b", "v1", 5, status=StatusEnum.BLOCK))
+
+        self.assertEqual([d.version for d in self.registry.list_versions("a")], ["v1", "v2"])
+        latest = {row["dataset_id"]: row for row in self.registry.latest_versions()}
+        self.assertEqual(latest["a"]["latest_version"], "v2")
+        self.assertEqual(latest["a"]["status"], "WARN")
+        self.assertEqual(latest["a"]["total_versions"], 2)
+        self.assertEqual(latest["b"]["total_versions"], 1)
+        self.assertEqual(self.registry.status_counts(), {"PASS": 1, "WARN": 1, "BLOCK": 1})
+        self.assertEqual([r["dataset_id"] + ":" + r["version"] for r in self.registry.recent(2)], ["a:v2", "b:v1"])
+        self.assertEqual([d.dataset_id for d in self.registry.find(status=StatusEnum.BLOCK)], ["b"])
+
+    def test_aggregates_follow_status_transitions(self):
+        v1 = _dataset("a", "v1", 0, status=StatusEnum.VALIDATING)
+        self.registry.save(v1)
+        self.assertEqual(self.registry.status_counts(), {"VALIDATING": 1})
+
+        v1.status = StatusEnum.PASS
+        self.registry.record_transition(v1, StatusHistoryItem(status=StatusEnum.PASS, source="L1"))
+        v2 = _dataset("a", "v2", 10, status=StatusEnum.VALIDATING)
+        self.registry.record_transition(v2, StatusHistoryItem(status=StatusEnum.VALIDATING, source="SYSTEM"))
+
+        self.assertEqual(self.registry.status_counts(), {"PASS": 1, "VALIDATING": 1})
+        (summary,) = self.registry.latest_versions()
+        self.assertEqual((summary["latest_version"], summary["status"], summary["total_versions"]), ("v2", "VALIDATING", 2))
+        recent = self.registry.recent(10)
+        self.assertEqual([(r["version"], r["status"], r["source"]) for r in recent[:2]], [("v2", "VALIDATING", "SYSTEM"), ("v1", "PASS", "L1")])
+
+        del self.registry["a:v2"]
+        (summary,) = self.registry.latest_versions()
+        self.assertEqual((summary["latest_version"], summary["total_versions"]), ("v1", 1))
+        self.assertEqual(self.registry.status_counts(), {"PASS": 1})
+
+    def test_recent_activity_is_bounded(self):
+        registry = DatasetRegistry(":memory:", recent_limit=3)
+        ds = _dataset("a", "v1", 0)
+        for status in (StatusEnum.VALIDATING, StatusEnum.PASS, StatusEnum.WARN, StatusEnum.BLOCK):
+            ds.status = status
+            registry.record_transition(ds, StatusHistoryItem(status=status, source="SYSTEM"))
+
+        self.assertEqual([r["status"] for r in registry.recent(10)], ["BLOCK", "WARN", "PASS"])
+
+    def test_aggregates_rebuild_from_columns_on_cold_start(self):
+        self.registry.save(_dataset("a", "v1", 0))
+        self.registry.save(_dataset("a", "v2", 10, status=StatusEnum.WARN))
+        self.registry.save(_dataset("b", "v1", 5))
+        incremental = sorted(self.registry.latest_versions(), key=lambda r: r["dataset_id"])
+        self.registry.close()
+
+        reopened = DatasetRegistry(self.db_path)
+        self.assertEqual(sorted(reopened.latest_versions(), key=lambda r: r["dataset_id"]), incremental)
+        self.assertEqual(reopened.status_counts(), {"PASS": 2, "WARN": 1})
+        self.assertEqual(reopened._objects, {})
+        reopened.close()
+
+    def test_query_plans_hit_indexes(self):
+        self.registry.save(_dataset("a", "v1", 0))
+        conn = self.registry._connection()
+
+        def plan(sql, params=()):
+            return " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall())
+
+        self.assertIn("idx_datasets_dataset_created", plan("SELECT doc FROM datasets WHERE dataset_id = ? ORDER BY created_ts", ("a",)))
+        self.assertIn("idx_datasets_status", plan("SELECT doc FROM datasets WHERE status = ?", ("PASS",)))
+        self.assertIn("idx_datasets_created", plan("SELECT key FROM datasets ORDER BY created_ts DESC LIMIT 10"))
+
+    def test_uses_wal_journal(self):
+        self.registry.save(_dataset("a", "v1", 0))
+        mode = self.registry._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_change_counters_track_global_and_per_dataset_writes(self):
+        self.registry.save(_dataset("a", "v1", 0))
+        global_tag, a_tag = self.registry.etag(), self.registry.etag("a")
+        self.registry.save(_dataset("b", "v1", 1))
+
+        self.assertNotEqual(self.registry.etag(), global_tag)
+        self.assertEqual(self.registry.etag("a"), a_tag)
+        self.assertGreater(self.registry.revision(), self.registry.revision("a"))
+
+        del self.registry["a:v1"]
+        self.assertNotEqual(self.registry.etag("a"), a_tag)
+        self.assertEqual(self.registry.revision("a"), self.registry.revision())
+
+        # Counters live in the database, so another process (or a restart) issues the same validators.
+        reopened = DatasetRegistry(self.db_path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.etag("b"), self.registry.etag("b"))
+
+    def test_writes_from_another_process_are_picked_up_on_read(self):
+        other = DatasetRegistry(self.db_path)
+        self.addCleanup(other.close)
+        ds = _dataset("a", "v1", 0, status=StatusEnum.VALIDATING)
+        self.registry.save(ds)
+        self.assertEqual(self.registry.status_counts(), {"VALIDATING": 1})
+        self.assertEqual(other.status_counts(), {"VALIDATING": 1})
+
+        mine = other["a:v1"]
+        mine.status = StatusEnum.BLOCK
+        mine.status_source = "L1"
+        other.record_transition(mine, StatusHistoryItem(status=StatusEnum.BLOCK, source="L1"))
+        other.save(_dataset("b", "v1", 5))
+
+        # The stale object is replaced and the aggregates and counters catch up.
+        self.assertIsNot(self.registry["a:v1"], ds)
+        self.assertEqual(self.registry["a:v1"].status, StatusEnum.BLOCK)
+        self.assertEqual(self.registry.status_counts(), {"BLOCK": 1, "PASS": 1})
+        self.assertEqual((self.registry.recent(1)[0]["status"], self.registry.recent(1)[0]["source"]), ("BLOCK", "L1"))
+        self.assertEqual(self.registry.etag("a"), other.etag("a"))
+
+        del other["b:v1"]
+        self.assertNotIn("b:v1", self.registry)
+        self.assertEqual([row["dataset_id"] for row in self.registry.latest_versions()], ["a"])
+
+    def test_reader_behind_a_pruned_change_log_reloads(self):
+        writer = DatasetRegistry(self.db_path, change_log_limit=5)
+        self.addCleanup(writer.close)
+        self.registry.save(_dataset("a", "v1", 0))
+        self.assertEqual(self.registry.status_counts(), {"PASS": 1})
+
+        ds = _dataset("b", "v1", 1, status=StatusEnum.WARN)
+        while writer.revision() < 1000:
+            writer.save(ds)
+        self.assertLess(len(writer._execute("SELECT revision FROM registry_changes")), 10)
+
+        self.assertEqual(self.registry.status_counts(), {"PASS": 1, "WARN": 1})
+        self.assertEqual(self.registry.revision("b"), writer.revision("b"))
+
+    def test_history_beyond_the_inline_limit_is_archived_and_paged(self):
+        registry = DatasetRegistry(self.db_path, history_limit=3)
+        self.addCleanup(registry.close)
+        ds = _dataset("demo", "v1", 0)
+        for n in range(8):
+            item = StatusHistoryItem(status=StatusEnum.WARN, source="MANUAL", reason=f"change {n}")
+            ds.status_history.append(item)
+            registry.record_transition(ds, item)
+
+        self.assertEqual([item.reason for item in ds.status_history], ["change 5", "change 6", "change 7"])
+        self.assertEqual(ds.status_history_archived, 5)
+
+        total, page = registry.status_history("demo:v1", offset=2, limit=4)
+        self.assertEqual(total, 8)
+        self.assertEqual([item.reason for item in page], ["change 5", "change 4", "change 3", "change 2"])
+        total, page = registry.status_history("demo:v1", offset=6, limit=10)
+        self.assertEqual([item.reason for item in page], ["change 1", "change 0"])
+        self.assertEqual(registry.status_history("demo:v1", offset=8), (8, []))
+        self.assertIsNone(registry.status_history("demo:v2"))
+
+        registry.close()
+        reopened = DatasetRegistry(self.db_path, history_limit=3)
+        self.addCleanup(reopened.close)
+        self.assertEqual(len(reopened["demo:v1"].status_history), 3)
+        total, page = reopened.status_history("demo:v1", limit=8)
+        self.assertEqual([item.reason for item in page], [f"change {n}" for n in range(7, -1, -1)])
+
+        del reopened["demo:v1"]
+        self.assertEqual(reopened._execute("SELECT COUNT(*) FROM status_history_archive")[0][0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from api.models import ManifestSource
+from api.services.sources import ManifestError, ManifestReader, local_image_path, resolve_local_path
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+
+class ManifestReaderTests(unittest.TestCase):
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp(prefix="manifests-"))
+        os.makedirs(os.path.join(self.root, "images"))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _reader(self, name: str, **fields) -> ManifestReader:
+        return ManifestReader(ManifestSource(path=self._path(name), **fields), default_source_id="default", roots=[self.root])
+
+    def test_jsonl_rows_resolve_local_images_and_default_source(self):
+        with open(self._path("rows.jsonl"), "w", encoding="utf-8") as handle:
+            handle.write(json.dumps({"image_url": "images/a.jpg", "caption": "a", "source_id": "cam-1", "extra": 1}) + "\n")
+            handle.write("\n")
+            handle.write(json.dumps({"image_url": "file:///mnt/b.jpg", "caption": "b"}) + "\n")
+            handle.write(json.dumps({"image_url": "https://example.com/c.jpg", "caption": "c"}))
+
+        reader = self._reader("rows.jsonl")
+
+        self.assertEqual(reader.format, "jsonl")
+        self.assertEqual(reader.count_rows(), 3)
+        self.assertEqual(
+            list(reader),
+            [
+                {"image_url": self._path("images/a.jpg"), "caption": "a", "source_id": "cam-1"},
+                {"image_url": "/mnt/b.jpg", "caption": "b", "source_id": "default"},
+                {"image_url": "https://example.com/c.jpg", "caption": "c", "source_id": "default"},
+            ],
+        )
+
+    def test_csv_rows_use_configured_columns_and_image_root(self):
+        with open(self._path("rows.csv"), "w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["file", "text"])
+            writer.writerow(["a.jpg", "first, with comma"])
+            writer.writerow(["b.jpg", "second\nline"])
+
+        reader = self._reader("rows.csv", image_column="file", caption_column="text", image_root=self._path("images"))
+
+        self.assertEqual(reader.count_rows(), 2)
+        self.assertEqual(
+            [(row["image_url"], row["caption"]) for row in reader],
+            [(self._path("images/a.jpg"), "first, with comma"), (self._path("images/b.jpg"), "second\nline")],
+        )
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_rows_are_read_in_batches(self):
+        table = pyarrow.table({"image_url": [f"{i}.jpg" for i in range(5)], "caption": [f"c{i}" for i in range(5)]})
+        pq.write_table(table, self._path("rows.parquet"))
+
+        reader = ManifestReader(
+            ManifestSource(path=self._path("rows.parquet")), default_source_id="default", roots=[self.root], chunk_rows=2
+        )
+
+        self.assertEqual(reader.count_rows(), 5)
+        self.assertEqual([row["caption"] for row in reader], [f"c{i}" for i in range(5)])
+
+    def test_invalid_manifests_are_rejected(self):
+        with open(self._path("rows.txt"), "w", encoding="utf-8") as handle:
+            handle.write("{}\n")
+        with open(self._path("bad.jsonl"), "w", encoding="utf-8") as handle:
+            handle.write('{"caption": "ok"}\n[1, 2]\n')
+
+        with self.assertRaisesRegex(ManifestError, "infer the format"):
+            self._reader("rows.txt")
+        self.assertEqual(self._reader("rows.txt", format="jsonl").count_rows(), 1)
+        with self.assertRaisesRegex(ManifestError, "does not exist"):
+            self._reader("missing.jsonl")
+        with self.assertRaisesRegex(ManifestError, "bad.jsonl:2"):
+            list(self._reader("bad.jsonl"))
+
+    def test_manifest_must_lie_under_the_allowed_roots(self):
+        manifest = ManifestSource(path=os.path.join(self.root, "..", "rows.jsonl"))
+        with self.assertRaisesRegex(ManifestError, "outside"):
+            ManifestReader(manifest, roots=[self.root])
+        with self.assertRaisesRegex(ManifestError, "disabled"):
+            ManifestReader(manifest, roots=[])
+
+
+class LocalPathTests(unittest.TestCase):
+    def test_local_image_path(self):
+        self.assertEqual(local_image_path("file:///data/a%20b.jpg"), "/data/a b.jpg")
+        self.assertEqual(local_image_path("/data/a.jpg"), "/data/a.jpg")
+        self.assertEqual(local_image_path("images/a.jpg"), "images/a.jpg")
+        self.assertIsNone(local_image_path("https://example.com/a.jpg"))
+        self.assertIsNone(local_image_path("file://otherhost/a.jpg"))
+
+    def test_resolve_local_path_follows_symlinks_out_of_the_roots(self):
+        root = os.path.realpath(tempfile.mkdtemp(prefix="roots-"))
+        outside = os.path.realpath(tempfile.mkdtemp(prefix="outside-"))
+        os.symlink(outside, os.path.join(root, "link"))
+
+        self.assertEqual(resolve_local_path(os.path.join(root, "a.jpg"), [root]), os.path.join(root, "a.jpg"))
+        self.assertIsNone(resolve_local_path(os.path.join(root, "link", "a.jpg"), [root]))
+        self.assertIsNone(resolve_local_path(root + "-sibling/a.jpg", [root]))
+
+
+if __name__ == "__main__":
+    unittest.main()
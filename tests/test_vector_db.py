@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import unittest
 from types import SimpleNamespace
 from unittest.mock import Mock
@@ -122,6 +125,48 @@ class QdrantServiceTests(unittest.TestCase):
         self.assertEqual(len(outliers), 1)
         self.assertEqual(outliers[0]["image_url"], "ok")
 
+    def test_find_near_duplicates_skips_self_and_later_rows(self):
+        service = QdrantService()
+        service.client = Mock()
+        service.client.collection_exists.return_value = True
+        service.client.query_batch_points.return_value = [
+            SimpleNamespace(points=[SimpleNamespace(payload={"version": "v2", "row_index": 0}, score=1.0)]),
+            SimpleNamespace(
+                points=[
+                    SimpleNamespace(payload={"version": "v2", "row_index": 1}, score=1.0),
+                    SimpleNamespace(payload={"version": "v2", "row_index": 0}, score=0.99),
+                    SimpleNamespace(payload={"version": "v1", "row_index": 4}, score=0.98),
+                ]
+            ),
+        ]
+
+        matches = service.find_near_duplicates(
+            "demo", "v2", [[1.0, 0.0], [0.99, 0.01]], parent_version="v1", threshold=0.95
+        )
+
+        self.assertEqual(
+            [(m["row_index"], m["match_version"], m["match_row_index"]) for m in matches],
+            [(1, "v2", 0), (1, "v1", 4)],
+        )
+        _, kwargs = service.client.query_batch_points.call_args
+        self.assertEqual(len(kwargs["requests"]), 2)
+        self.assertEqual(kwargs["requests"][0].score_threshold, 0.95)
+
+    def test_point_ids_are_the_same_in_every_process(self):
+        script = "from api.services.vector_db import QdrantService; print(QdrantService._point_id('demo', 'v1', 7))"
+        ids = {
+            subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                env={**os.environ, "PYTHONHASHSEED": seed},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            for seed in ("1", "2")
+        }
+        self.assertEqual(ids, {str(QdrantService._point_id("demo", "v1", 7))})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -6,7 +6,13 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Label } from "@/components/ui/label";
 import { useState } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { listAllDatasets, manualOverride, triggerReingestion, triggerL2Audit } from "@/lib/api-client";
+import {
+  listAllDatasets,
+  manualOverride,
+  triggerReingestion,
+  triggerL2Audit,
+  waitForL2AuditJob,
+} from "@/lib/api-client";
 import { Loader2, CheckCircle, XCircle, AlertTriangle } from "lucide-react";
 import { toast } from "sonner";
 import type { StatusEnum } from "@/lib/types";
@@ -66,7 +72,7 @@ export default function ControlPlanePage() {
     mutationFn: ({ datasetId, version }: { datasetId: string; version: string }) =>
       triggerReingestion(datasetId, version),
     onSuccess: (data, variables) => {
-      toast.success(`Re-ingestion triggered for ${variables.datasetId} ${variables.version}`);
+      toast.success(`Re-ingestion queued for ${variables.datasetId} ${variables.version}`);
       queryClient.invalidateQueries({ queryKey: ["datasets"] });
       queryClient.invalidateQueries({ queryKey: ["dataset-versions", variables.datasetId] });
       
@@ -75,7 +81,7 @@ export default function ControlPlanePage() {
           action: "Re-ingest Dataset",
           timestamp: new Date().toISOString(),
           status: "success",
-          message: `Re-ingestion triggered for ${variables.datasetId} ${variables.version}`,
+          message: `Re-ingestion job ${data.job.job_id} queued for ${variables.datasetId} ${variables.version}`,
         },
         ...actionHistory,
       ]);
@@ -86,10 +92,18 @@ export default function ControlPlanePage() {
   });
 
   const l2AuditMutation = useMutation({
-    mutationFn: ({ datasetId, version }: { datasetId: string; version: string }) =>
-      triggerL2Audit(datasetId, version),
+    mutationFn: async ({ datasetId, version }: { datasetId: string; version: string }) => {
+      const queued = await triggerL2Audit(datasetId, version);
+      toast.info(`L2 Audit queued for ${datasetId} ${version}`);
+      const job = await waitForL2AuditJob(queued.job_id);
+      if (job.status === "FAILED") {
+        throw new Error(job.error || "L2 Audit failed");
+      }
+      return job;
+    },
     onSuccess: (data, variables) => {
-      toast.success(`L2 Audit completed for ${variables.datasetId} ${variables.version}`);
+      const cached = data.cache_hit ? " (cached result)" : "";
+      toast.success(`L2 Audit completed for ${variables.datasetId} ${variables.version}${cached}`);
       queryClient.invalidateQueries({ queryKey: ["datasets"] });
       queryClient.invalidateQueries({ queryKey: ["dataset-versions", variables.datasetId] });
       
@@ -103,8 +117,10 @@ export default function ControlPlanePage() {
         ...actionHistory,
       ]);
     },
-    onError: (error: any) => {
+    onError: (error: any, variables) => {
       toast.error(`L2 Audit failed: ${error.message}`);
+      queryClient.invalidateQueries({ queryKey: ["datasets"] });
+      queryClient.invalidateQueries({ queryKey: ["dataset-versions", variables.datasetId] });
     },
   });
 
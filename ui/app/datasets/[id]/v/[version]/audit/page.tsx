@@ -134,12 +134,12 @@ export default function AuditPage({
       ) : (
         <div className="space-y-6">
           {/* Vector Visualization - Full Width */}
-          {outlierSamples && outlierSamples.length > 0 && (
-            <VectorVisualization 
-              outliers={outlierSamples} 
-              cosineDrift={cosineMeanShift} 
-            />
-          )}
+          <VectorVisualization
+            datasetId={id}
+            version={version}
+            baselineVersion={versionData?.lineage_parent_version || "v1"}
+            cosineDrift={cosineMeanShift}
+          />
 
           {/* Two-column layout */}
           <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
@@ -195,6 +195,14 @@ export default function AuditPage({
                     <span className="text-slate-500">Model:</span>
                     <span className="font-medium">{l2.model_name}</span>
                   </div>
+                  {l2.cache_hit && (
+                    <div className="flex justify-between">
+                      <span className="text-slate-500">Result:</span>
+                      <span className="font-medium">
+                        Cached{l2.cached_at ? ` (${new Date(l2.cached_at).toLocaleString()})` : ""}
+                      </span>
+                    </div>
+                  )}
                   <div className="flex justify-between">
                     <span className="text-slate-500">Confidence:</span>
                     <span className="font-medium font-variant-tabular">
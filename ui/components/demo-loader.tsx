@@ -121,8 +121,8 @@ export function DemoLoader({ onComplete }: DemoLoaderProps) {
 
       setProgress(85);
 
-      // Step 5: Trigger L2 Audit
-      setCurrentStep("Running Gemini semantic analysis...");
+      // Step 5: Trigger L2 Audit (queued in the background; the L1 PASS above may already have queued it)
+      setCurrentStep("Queueing Gemini semantic analysis...");
       await fetch(`${apiUrl}/datasets/demo_vlm_dataset/v/v2/trigger-l2`, {
         method: "POST",
       }).catch(() => {
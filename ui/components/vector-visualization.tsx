@@ -1,58 +1,47 @@
 "use client";
 
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
+import { Skeleton } from "@/components/ui/skeleton";
 import { ScatterChart, Scatter, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Legend, ZAxis } from "recharts";
-import type { OutlierSample } from "@/lib/types";
+import { useQuery } from "@tanstack/react-query";
+import { getVectorProjection } from "@/lib/api-client";
+import type { ProjectionPoint } from "@/lib/types";
 import { useState } from "react";
 import { ImageLightbox } from "./image-lightbox";
 
 interface VectorVisualizationProps {
-  outliers: OutlierSample[];
+  datasetId: string;
+  version: string;
+  baselineVersion?: string;
   cosineDrift: number;
+  maxPoints?: number;
 }
 
-export function VectorVisualization({ outliers, cosineDrift }: VectorVisualizationProps) {
-  const [selectedSample, setSelectedSample] = useState<OutlierSample | null>(null);
+export function VectorVisualization({
+  datasetId,
+  version,
+  baselineVersion = "v1",
+  cosineDrift,
+  maxPoints,
+}: VectorVisualizationProps) {
+  const [selectedSample, setSelectedSample] = useState<ProjectionPoint | null>(null);
 
-  // Generate synthetic v1 and v2 cluster data for visualization
-  // In reality, these would come from actual vector embeddings
-  const generateClusterData = () => {
-    // V1 cluster (nature - center around [0.3, 0.7])
-    const v1Data = Array.from({ length: 15 }, (_, i) => ({
-      x: 0.3 + (Math.random() - 0.5) * 0.3,
-      y: 0.7 + (Math.random() - 0.5) * 0.3,
-      z: 50,
-      version: "v1",
-      label: "Nature",
-      type: "baseline",
-    }));
+  // Server-side PCA projection of sampled embeddings (capped by the API point budget)
+  const { data: projection, isLoading } = useQuery({
+    queryKey: ["projection", datasetId, version, baselineVersion, maxPoints],
+    queryFn: () => getVectorProjection(datasetId, version, baselineVersion, maxPoints),
+    enabled: !!datasetId && !!version,
+    staleTime: 60_000,
+  });
 
-    // V2 cluster (urban - center around [0.7, 0.3])
-    const v2Data = Array.from({ length: 12 }, (_, i) => ({
-      x: 0.7 + (Math.random() - 0.5) * 0.3,
-      y: 0.3 + (Math.random() - 0.5) * 0.3,
-      z: 50,
-      version: "v2",
-      label: "Urban",
-      type: "normal",
-    }));
-
-    // Outlier points (mismatched captions - in between clusters)
-    const outlierData = outliers.slice(0, 5).map((outlier, i) => ({
-      x: 0.5 + (Math.random() - 0.5) * 0.2,
-      y: 0.5 + (Math.random() - 0.5) * 0.2,
-      z: 100,
-      version: "v2",
-      label: "Outlier",
-      type: "outlier",
-      outlier: outlier,
-      caption: outlier.caption.substring(0, 30) + "...",
-    }));
-
-    return [...v1Data, ...v2Data, ...outlierData];
-  };
-
-  const data = generateClusterData();
+  const data = (projection?.points ?? []).map((point) => ({
+    ...point,
+    z: point.is_outlier ? 100 : 50,
+    label: point.is_outlier ? "Outlier" : point.version === baselineVersion ? "Baseline" : "Current",
+    type: point.is_outlier ? "outlier" : point.version === baselineVersion ? "baseline" : "normal",
+    caption: point.caption && point.caption.length > 30 ? point.caption.substring(0, 30) + "..." : point.caption,
+    sample: point,
+  }));
 
   const CustomTooltip = ({ active, payload }: any) => {
     if (active && payload && payload.length) {
@@ -74,8 +63,8 @@ export function VectorVisualization({ outliers, cosineDrift }: VectorVisualizati
   };
 
   const handleClick = (data: any) => {
-    if (data && data.outlier) {
-      setSelectedSample(data.outlier);
+    if (data && data.sample) {
+      setSelectedSample(data.sample);
     }
   };
 
@@ -85,7 +74,7 @@ export function VectorVisualization({ outliers, cosineDrift }: VectorVisualizati
         <CardHeader>
           <CardTitle>Vector Space Visualization</CardTitle>
           <CardDescription>
-            2D projection of image embeddings showing semantic drift between versions
+            2D PCA projection of sampled embeddings showing semantic drift between versions
             {cosineDrift > 0 && (
               <span className="ml-2 text-brand-coral font-medium">
                 (Drift: {cosineDrift.toFixed(3)})
@@ -98,82 +87,92 @@ export function VectorVisualization({ outliers, cosineDrift }: VectorVisualizati
             <div className="flex items-center gap-6 text-sm">
               <div className="flex items-center gap-2">
                 <div className="w-3 h-3 rounded-full bg-brand-sage"></div>
-                <span>v1 Baseline (Nature)</span>
+                <span>{baselineVersion} Baseline</span>
               </div>
               <div className="flex items-center gap-2">
                 <div className="w-3 h-3 rounded-full bg-brand-sky"></div>
-                <span>v2 Normal (Urban)</span>
+                <span>{version} Normal</span>
               </div>
               <div className="flex items-center gap-2">
                 <div className="w-3 h-3 rounded-full bg-brand-coral"></div>
-                <span>v2 Outliers (Mismatched)</span>
+                <span>{version} Outliers</span>
               </div>
+              {projection && (
+                <span className="ml-auto text-xs text-slate-500">
+                  {projection.points.length} of{" "}
+                  {Object.values(projection.total_points).reduce((sum, n) => sum + n, 0)} points
+                </span>
+              )}
             </div>
 
-            <ResponsiveContainer width="100%" height={400}>
-              <ScatterChart margin={{ top: 20, right: 20, bottom: 20, left: 20 }}>
-                <CartesianGrid strokeDasharray="3 3" stroke="#e2e8f0" />
-                <XAxis
-                  type="number"
-                  dataKey="x"
-                  name="Dimension 1"
-                  domain={[0, 1]}
-                  tick={{ fontSize: 12 }}
-                  stroke="#64748b"
-                />
-                <YAxis
-                  type="number"
-                  dataKey="y"
-                  name="Dimension 2"
-                  domain={[0, 1]}
-                  tick={{ fontSize: 12 }}
-                  stroke="#64748b"
-                />
-                <ZAxis type="number" dataKey="z" range={[50, 150]} />
-                <Tooltip content={<CustomTooltip />} />
-                <Legend
-                  verticalAlign="top"
-                  height={36}
-                  iconType="circle"
-                  wrapperStyle={{ fontSize: "12px" }}
-                />
-                
-                {/* V1 Baseline */}
-                <Scatter
-                  name="v1 Baseline"
-                  data={data.filter(d => d.version === "v1")}
-                  fill="#A5C89E"
-                  fillOpacity={0.6}
-                  shape="circle"
-                />
-                
-                {/* V2 Normal */}
-                <Scatter
-                  name="v2 Normal"
-                  data={data.filter(d => d.version === "v2" && d.type === "normal")}
-                  fill="#9CCFFF"
-                  fillOpacity={0.6}
-                  shape="circle"
-                />
-                
-                {/* V2 Outliers */}
-                <Scatter
-                  name="v2 Outliers"
-                  data={data.filter(d => d.type === "outlier")}
-                  fill="#FB9B8F"
-                  fillOpacity={0.8}
-                  shape="diamond"
-                  onClick={handleClick}
-                  style={{ cursor: "pointer" }}
-                />
-              </ScatterChart>
-            </ResponsiveContainer>
+            {isLoading ? (
+              <Skeleton className="h-[400px]" />
+            ) : (
+              <ResponsiveContainer width="100%" height={400}>
+                <ScatterChart margin={{ top: 20, right: 20, bottom: 20, left: 20 }}>
+                  <CartesianGrid strokeDasharray="3 3" stroke="#e2e8f0" />
+                  <XAxis
+                    type="number"
+                    dataKey="x"
+                    name="PC 1"
+                    domain={["auto", "auto"]}
+                    tick={{ fontSize: 12 }}
+                    stroke="#64748b"
+                  />
+                  <YAxis
+                    type="number"
+                    dataKey="y"
+                    name="PC 2"
+                    domain={["auto", "auto"]}
+                    tick={{ fontSize: 12 }}
+                    stroke="#64748b"
+                  />
+                  <ZAxis type="number" dataKey="z" range={[50, 150]} />
+                  <Tooltip content={<CustomTooltip />} />
+                  <Legend
+                    verticalAlign="top"
+                    height={36}
+                    iconType="circle"
+                    wrapperStyle={{ fontSize: "12px" }}
+                  />
+                  
+                  {/* V1 Baseline */}
+                  <Scatter
+                    name={`${baselineVersion} Baseline`}
+                    data={data.filter(d => d.type === "baseline")}
+                    fill="#A5C89E"
+                    fillOpacity={0.6}
+                    shape="circle"
+                  />
+                  
+                  {/* V2 Normal */}
+                  <Scatter
+                    name={`${version} Normal`}
+                    data={data.filter(d => d.type === "normal")}
+                    fill="#9CCFFF"
+                    fillOpacity={0.6}
+                    shape="circle"
+                  />
+                  
+                  {/* V2 Outliers */}
+                  <Scatter
+                    name={`${version} Outliers`}
+                    data={data.filter(d => d.type === "outlier")}
+                    fill="#FB9B8F"
+                    fillOpacity={0.8}
+                    shape="diamond"
+                    onClick={handleClick}
+                    style={{ cursor: "pointer" }}
+                  />
+                </ScatterChart>
+              </ResponsiveContainer>
+            )}
 
             <div className="bg-brand-cream/30 border border-brand-cream rounded-lg p-4">
               <p className="text-sm text-slate-700">
-                <strong>Interpretation:</strong> V1 (green) clusters around nature scenes, while V2 (blue) clusters around urban scenes.
-                Outlier samples (red diamonds) are mismatched - urban images with nature captions, flagged by Gemini.
-                Click on outliers to view details.
+                <strong>Interpretation:</strong> The baseline (green) and current version (blue) are projected onto the
+                same two principal components, so separated clusters indicate semantic drift. Outlier samples (red
+                diamonds) are furthest from both version means. Click on outliers to view details.
               </p>
             </div>
           </div>
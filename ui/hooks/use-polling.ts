@@ -1,5 +1,9 @@
 /**
- * Custom hook for real-time polling of dataset status
+ * Custom hooks for real-time dataset status.
+ *
+ * Updates are pushed over the API's event stream (see use-status-stream.ts); each event
+ * invalidates the affected query. Interval polling only runs while the stream is not
+ * connected (e.g. API without /events, or a proxy that buffers SSE).
  * 
  * Usage:
  * ```tsx
@@ -14,11 +18,13 @@
 import { useEffect, useRef } from 'react';
 import { useQuery, useQueryClient, QueryKey } from '@tanstack/react-query';
 import { toast } from 'sonner';
-import type { DatasetObject, StatusEnum } from '@/lib/types';
+import type { DatasetObject, DatasetSummary, StatusEnum } from '@/lib/types';
+import type { StreamEvent } from '@/lib/event-stream';
+import { useStatusStream } from './use-status-stream';
 
 export interface PollingOptions {
   enabled?: boolean;
-  interval?: number; // milliseconds
+  interval?: number; // fallback polling interval in milliseconds, used while the event stream is down
   stopOnStatus?: StatusEnum[];
   onStatusChange?: (newStatus: StatusEnum, dataset: DatasetObject) => void;
 }
@@ -41,9 +47,19 @@ export function useDatasetPolling(
   const opts = { ...DEFAULT_OPTIONS, ...options };
   const queryClient = useQueryClient();
   const previousStatusRef = useRef<StatusEnum | null>(null);
+  const queryKey = ['dataset', datasetId, version] as QueryKey;
+
+  const { connected } = useStatusStream(
+    (event: StreamEvent) => {
+      if (event.type === 'reset' || event.data.version === version) {
+        queryClient.invalidateQueries({ queryKey });
+      }
+    },
+    { datasetId: datasetId ?? undefined, enabled: opts.enabled && !!datasetId && !!version }
+  );
 
   const query = useQuery({
-    queryKey: ['dataset', datasetId, version] as QueryKey,
+    queryKey,
     queryFn: async () => {
       if (!datasetId || !version) return null;
       
@@ -61,14 +77,14 @@ export function useDatasetPolling(
     refetchInterval: (query) => {
       const data = query.state.data;
       
-      // Stop polling if we hit a terminal status
-      if (data && opts.stopOnStatus.includes(data.status)) {
+      // Pushed updates make polling unnecessary; stop as well once we hit a terminal status
+      if (connected || (data && opts.stopOnStatus.includes(data.status))) {
         return false;
       }
       
       return opts.interval;
     },
-    refetchIntervalInBackground: true, // Continue polling even when tab is not focused
+    refetchIntervalInBackground: false,
   });
 
   // Detect status changes and trigger callback
@@ -100,7 +116,7 @@ export function useDatasetPolling(
   }, [query.data, datasetId, version, opts]);
 
   const stopPolling = () => {
-    queryClient.cancelQueries({ queryKey: ['dataset', datasetId, version] });
+    queryClient.cancelQueries({ queryKey });
   };
 
   return {
@@ -109,6 +125,7 @@ export function useDatasetPolling(
     isError: query.isError,
     error: query.error,
     isPolling: query.isRefetching,
+    isStreaming: connected,
     refetch: query.refetch,
     stopPolling,
   };
@@ -121,6 +138,16 @@ export function useAllDatasetsPolling(
   options: Omit<PollingOptions, 'stopOnStatus'> = {}
 ) {
   const opts = { ...DEFAULT_OPTIONS, ...options };
+  const queryClient = useQueryClient();
+
+  const { connected } = useStatusStream(
+    (event: StreamEvent) => {
+      if (event.type === 'status' || event.type === 'reset') {
+        queryClient.invalidateQueries({ queryKey: ['datasets', 'all'] });
+      }
+    },
+    { enabled: opts.enabled }
+  );
 
   const query = useQuery({
     queryKey: ['datasets', 'all'] as QueryKey,
@@ -133,11 +160,11 @@ export function useAllDatasetsPolling(
         throw new Error(`Failed to fetch datasets: ${response.statusText}`);
       }
       
-      return response.json() as Promise<DatasetObject[]>;
+      return response.json() as Promise<DatasetSummary[]>;
     },
     enabled: opts.enabled,
-    refetchInterval: opts.interval,
-    refetchIntervalInBackground: true,
+    refetchInterval: connected ? false : opts.interval,
+    refetchIntervalInBackground: false,
   });
 
   return {
@@ -146,6 +173,7 @@ export function useAllDatasetsPolling(
     isError: query.isError,
     error: query.error,
     isPolling: query.isRefetching,
+    isStreaming: connected,
     refetch: query.refetch,
   };
 }
@@ -155,6 +183,16 @@ export function useAllDatasetsPolling(
  */
 export function useDatasetStatsPolling(options: Omit<PollingOptions, 'stopOnStatus'> = {}) {
   const opts = { ...DEFAULT_OPTIONS, ...options };
+  const queryClient = useQueryClient();
+
+  const { connected } = useStatusStream(
+    (event: StreamEvent) => {
+      if (event.type === 'status' || event.type === 'reset') {
+        queryClient.invalidateQueries({ queryKey: ['datasets', 'stats'] });
+      }
+    },
+    { enabled: opts.enabled }
+  );
 
   const query = useQuery({
     queryKey: ['datasets', 'stats'] as QueryKey,
@@ -175,12 +213,13 @@ export function useDatasetStatsPolling(options: Omit<PollingOptions, 'stopOnStat
           dataset_id: string;
           version: string;
           status: StatusEnum;
+          source?: string;
           timestamp: string;
         }>;
       };
     },
     enabled: opts.enabled,
-    refetchInterval: opts.interval,
+    refetchInterval: connected ? false : opts.interval,
     refetchIntervalInBackground: false, // Don't poll stats in background
   });
 
@@ -190,6 +229,7 @@ export function useDatasetStatsPolling(options: Omit<PollingOptions, 'stopOnStat
     isError: query.isError,
     error: query.error,
     isPolling: query.isRefetching,
+    isStreaming: connected,
     refetch: query.refetch,
   };
 }
@@ -0,0 +1,44 @@
+/**
+ * Subscribe to the API's Server-Sent Events stream of status transitions,
+ * ingestion progress and L2 audit job updates.
+ *
+ * Usage:
+ * ```tsx
+ * const { connected } = useStatusStream((event) => {
+ *   if (event.type === 'status') queryClient.invalidateQueries({ queryKey: ['datasets'] });
+ * }, { datasetId });
+ * ```
+ *
+ * Omit `datasetId` to receive events for every dataset. `connected` is false until the
+ * stream is open (and while it reconnects), so callers can fall back to polling.
+ */
+
+import { useEffect, useRef, useState } from 'react';
+import { subscribeToStatusStream, type StreamEvent } from '@/lib/event-stream';
+
+export interface StatusStreamOptions {
+  datasetId?: string;
+  enabled?: boolean;
+}
+
+export function useStatusStream(
+  onEvent: (event: StreamEvent) => void,
+  { datasetId, enabled = true }: StatusStreamOptions = {}
+) {
+  const [connected, setConnected] = useState(false);
+  const onEventRef = useRef(onEvent);
+
+  useEffect(() => {
+    onEventRef.current = onEvent;
+  }, [onEvent]);
+
+  useEffect(() => {
+    if (!enabled) {
+      setConnected(false);
+      return;
+    }
+    return subscribeToStatusStream(datasetId, (event) => onEventRef.current(event), setConnected);
+  }, [datasetId, enabled]);
+
+  return { connected };
+}
@@ -2,7 +2,9 @@ import type {
   DatasetObject,
   DatasetSummary,
   CreateDatasetRequest,
+  IngestionJob,
   L1Report,
+  L2AuditJob,
   L2Reasoning,
 } from "./types";
 import { toast } from "sonner";
@@ -95,13 +97,33 @@ export async function updateL2Audit(
 
 export async function triggerL2Audit(
   datasetId: string,
-  version: string
-): Promise<DatasetObject> {
-  return fetchApi<DatasetObject>(`/datasets/${datasetId}/v/${version}/trigger-l2`, {
+  version: string,
+  forceRefresh: boolean = false
+): Promise<L2AuditJob> {
+  const query = forceRefresh ? "?force_refresh=true" : "";
+  return fetchApi<L2AuditJob>(`/datasets/${datasetId}/v/${version}/trigger-l2${query}`, {
     method: "POST",
   });
 }
 
+export async function getL2AuditJob(jobId: string): Promise<L2AuditJob> {
+  return fetchApi<L2AuditJob>(`/l2-jobs/${jobId}`);
+}
+
+// Polls a queued L2 audit until it succeeds or fails.
+export async function waitForL2AuditJob(
+  jobId: string,
+  intervalMs: number = 2000
+): Promise<L2AuditJob> {
+  for (;;) {
+    const job = await getL2AuditJob(jobId);
+    if (job.status === "SUCCEEDED" || job.status === "FAILED") {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 // New API functions for enhanced features
 export async function getOutlierSamples(
   datasetId: string,
@@ -113,6 +135,18 @@ export async function getOutlierSamples(
   );
 }
 
+export async function getVectorProjection(
+  datasetId: string,
+  version: string,
+  baseline: string = "v1",
+  maxPoints?: number
+): Promise<import("./types").VectorProjection> {
+  const budget = maxPoints ? `&max_points=${maxPoints}` : "";
+  return fetchApi<import("./types").VectorProjection>(
+    `/datasets/${datasetId}/v/${version}/projection?baseline=${baseline}${budget}`
+  );
+}
+
 export async function getSamples(
   datasetId: string,
   version: string,
@@ -139,11 +173,28 @@ export async function manualOverride(
   });
 }
 
+export interface ReingestResponse {
+  message: string;
+  dataset: DatasetObject;
+  job: IngestionJob;
+}
+
+// Queues a re-run of the ingestion pipeline from the version's stored raw data.
 export async function triggerReingestion(
   datasetId: string,
   version: string
-): Promise<void> {
-  return fetchApi<void>(`/datasets/${datasetId}/v/${version}/reingest`, {
+): Promise<ReingestResponse> {
+  return fetchApi<ReingestResponse>(`/datasets/${datasetId}/v/${version}/reingest`, {
+    method: "POST",
+  });
+}
+
+export async function getIngestionJob(jobId: string): Promise<IngestionJob> {
+  return fetchApi<IngestionJob>(`/ingestion-jobs/${jobId}`);
+}
+
+export async function cancelIngestionJob(jobId: string): Promise<IngestionJob> {
+  return fetchApi<IngestionJob>(`/ingestion-jobs/${jobId}/cancel`, {
     method: "POST",
   });
 }
@@ -0,0 +1,118 @@
+import type { IngestionJob, L2AuditJob, StatusEnum, StatusSource } from "./types";
+
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+
+export interface StatusEventData {
+  dataset_id: string;
+  version: string;
+  status: StatusEnum;
+  source: StatusSource;
+  reason?: string | null;
+  timestamp: string;
+}
+
+export type StreamEvent =
+  | { type: "status"; data: StatusEventData }
+  | { type: "ingestion"; data: IngestionJob }
+  | { type: "l2_job"; data: L2AuditJob }
+  // Events were missed and cannot be replayed; refetch everything.
+  | { type: "reset"; data: Record<string, never> };
+
+type EventListener = (event: StreamEvent) => void;
+type ConnectionListener = (connected: boolean) => void;
+
+const EVENT_TYPES: StreamEvent["type"][] = ["status", "ingestion", "l2_job", "reset"];
+
+/**
+ * One shared EventSource per subscription scope (all datasets, or a single dataset),
+ * reference-counted across the hooks that use it.
+ */
+class StatusStream {
+  private source: EventSource | null = null;
+  private listeners = new Set<EventListener>();
+  private connectionListeners = new Set<ConnectionListener>();
+  private lastEventId: string | null = null;
+  private connected = false;
+
+  constructor(private readonly key: string, private readonly datasetId?: string) {}
+
+  subscribe(listener: EventListener, onConnection: ConnectionListener): () => void {
+    this.listeners.add(listener);
+    this.connectionListeners.add(onConnection);
+    onConnection(this.connected);
+    if (!this.source) {
+      this.open();
+    }
+
+    return () => {
+      this.listeners.delete(listener);
+      this.connectionListeners.delete(onConnection);
+      if (this.listeners.size === 0) {
+        this.close();
+      }
+    };
+  }
+
+  private open() {
+    if (typeof window === "undefined" || typeof EventSource === "undefined") {
+      return;
+    }
+
+    const params = new URLSearchParams();
+    if (this.datasetId) params.set("dataset_id", this.datasetId);
+    // EventSource sends Last-Event-ID on its own reconnects; this covers re-opening after close().
+    if (this.lastEventId) params.set("last_event_id", this.lastEventId);
+    const query = params.toString();
+
+    const source = new EventSource(`${API_BASE_URL}/events${query ? `?${query}` : ""}`);
+    source.onopen = () => this.setConnected(true);
+    source.onerror = () => this.setConnected(false);
+
+    for (const type of EVENT_TYPES) {
+      source.addEventListener(type, (message) => {
+        const event = message as MessageEvent<string>;
+        if (event.lastEventId) {
+          this.lastEventId = event.lastEventId;
+        }
+        let data: unknown;
+        try {
+          data = JSON.parse(event.data);
+        } catch {
+          return;
+        }
+        this.listeners.forEach((listener) => listener({ type, data } as StreamEvent));
+      });
+    }
+
+    this.source = source;
+  }
+
+  private close() {
+    this.source?.close();
+    this.source = null;
+    this.setConnected(false);
+    streams.delete(this.key);
+  }
+
+  private setConnected(connected: boolean) {
+    if (this.connected === connected) return;
+    this.connected = connected;
+    this.connectionListeners.forEach((listener) => listener(connected));
+  }
+}
+
+const streams = new Map<string, StatusStream>();
+
+export function subscribeToStatusStream(
+  datasetId: string | undefined,
+  listener: EventListener,
+  onConnection: ConnectionListener
+): () => void {
+  const key = datasetId ?? "*";
+  let stream = streams.get(key);
+  if (!stream) {
+    stream = new StatusStream(key, datasetId);
+    streams.set(key, stream);
+  }
+  return stream.subscribe(listener, onConnection);
+}
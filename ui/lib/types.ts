@@ -36,6 +36,50 @@ export interface L2Reasoning {
   flagged_samples: string[];
   confidence_score: number;
   l2_status: StatusEnum;
+  cache_hit?: boolean;
+  cached_at?: string;
+}
+
+export type L2JobStatus = "QUEUED" | "RUNNING" | "SUCCEEDED" | "FAILED";
+
+export interface L2AuditJob {
+  job_id: string;
+  dataset_id: string;
+  version: string;
+  status: L2JobStatus;
+  trigger: "MANUAL" | "AUTO";
+  force_refresh: boolean;
+  version_created_at?: string;
+  drift?: number;
+  enqueued_at: string;
+  started_at?: string;
+  finished_at?: string;
+  attempts: number;
+  error?: string;
+  result_status?: StatusEnum;
+  cache_hit?: boolean;
+}
+
+export type IngestionJobStatus = L2JobStatus | "CANCELLED";
+
+export interface IngestionJob {
+  job_id: string;
+  dataset_id: string;
+  version: string;
+  status: IngestionJobStatus;
+  trigger: "CREATE" | "REINGEST" | "UPLOAD" | "IMPORT";
+  rows_total?: number;
+  rows_fetched: number;
+  rows_embedded: number;
+  rows_upserted: number;
+  enqueued_at: string;
+  started_at?: string;
+  finished_at?: string;
+  attempts: number;
+  next_attempt_at?: string;
+  cancel_requested: boolean;
+  error?: string;
+  l1_status?: StatusEnum;
 }
 
 export interface StatusHistoryItem {
@@ -52,6 +96,7 @@ export interface DatasetObject {
   status: StatusEnum;
   status_source?: StatusSource;
   status_history: StatusHistoryItem[];
+  status_history_archived?: number;
   l1_report?: L1Report;
   l2_reasoning?: L2Reasoning;
   source_id: string;
@@ -88,6 +133,32 @@ export interface OutlierSample {
   outlier_score: number;
 }
 
+export interface ProjectionPoint {
+  x: number;
+  y: number;
+  version: string;
+  row_index?: number;
+  image_url: string;
+  caption: string;
+  source_id?: string;
+  fallback_used: boolean;
+  is_outlier: boolean;
+  outlier_score?: number;
+  dist_to_v1_mean?: number;
+  dist_to_v2_mean?: number;
+}
+
+export interface VectorProjection {
+  dataset_id: string;
+  method: string;
+  baseline_version: string;
+  version: string;
+  explained_variance_ratio: number[];
+  point_budget: number;
+  total_points: Record<string, number>;
+  points: ProjectionPoint[];
+}
+
 export interface SampleWithMetadata {
   image_url: string;
   caption: string;
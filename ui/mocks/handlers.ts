@@ -1,9 +1,11 @@
 import { http, HttpResponse } from "msw";
-import type { DatasetObject, DatasetSummary } from "@/lib/types";
+import type { DatasetObject, DatasetSummary, L2AuditJob } from "@/lib/types";
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
 // Mock data store
+const mockJobs: Record<string, L2AuditJob> = {};
+
 const mockDatasets: Record<string, DatasetObject[]> = {
   "sdv-vision": [
     {
@@ -265,7 +267,35 @@ export const handlers = [
       );
     }
     
-    return HttpResponse.json(dataset);
+    const now = new Date().toISOString();
+    const job: L2AuditJob = {
+      job_id: `mock-${datasetId}-${version}`,
+      dataset_id: dataset.dataset_id,
+      version: dataset.version,
+      status: "SUCCEEDED",
+      trigger: "MANUAL",
+      force_refresh: false,
+      enqueued_at: now,
+      started_at: now,
+      finished_at: now,
+      attempts: 1,
+      result_status: dataset.status,
+      cache_hit: false,
+    };
+    mockJobs[job.job_id] = job;
+    return HttpResponse.json(job, { status: 202 });
+  }),
+
+  // L2 audit job status
+  http.get(`${API_BASE_URL}/l2-jobs/:jobId`, ({ params }) => {
+    const job = mockJobs[params.jobId as string];
+    if (!job) {
+      return new HttpResponse(
+        JSON.stringify({ detail: "L2 audit job not found" }),
+        { status: 404 }
+      );
+    }
+    return HttpResponse.json(job);
   }),
 ];
 